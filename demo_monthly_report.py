@@ -4,9 +4,7 @@ Freee MCP Scalar - 月次推移表作成デモンストレーション
 実際のAPIを呼び出すとどのような結果が得られるかを示すシミュレーション
 """
 
-import pandas as pd
-import json
-from datetime import datetime
+from freee_mcp_client.trend import pivot_trial_balances
 
 def simulate_freee_api_calls():
     """実際のfreee APIが返すであろうデータをシミュレート"""
@@ -137,36 +135,13 @@ def create_monthly_trend_report():
     print("   ✓ データ統合・分析中...")
     print()
     
-    # 月次推移表の作成
-    months = ["2025-01", "2025-02", "2025-03", "2025-04", "2025-05"]
+    # 月次推移表の作成（勘定科目 × 月 の行列に一度で集計）
     month_labels = ["1月", "2月", "3月", "4月", "5月"]
+    matrix = pivot_trial_balances(monthly_data, account_items=account_items['account_items'])
     
-    # データフレーム作成用のデータ準備
-    data_for_df = {}
-    
-    # 各勘定科目のデータを整理
-    for account in account_items['account_items']:
-        account_name = account['name']
-        account_id = account['id']
-        
-        monthly_amounts = []
-        for month in months:
-            # その月のその勘定科目の金額を取得
-            amount = 0
-            for balance in monthly_data[month]['trial_pl']['balances']:
-                if balance['account_item_id'] == account_id:
-                    # 売上は貸方、その他は借方
-                    if account_id == 4000:  # 売上高
-                        amount = balance.get('credit_amount', 0)
-                    else:
-                        amount = balance.get('debit_amount', 0)
-                    break
-            monthly_amounts.append(amount)
-        
-        data_for_df[account_name] = monthly_amounts
-    
-    # DataFrameに変換
-    df = pd.DataFrame(data_for_df, index=month_labels)
+    # 収益科目は貸方、費用科目は借方をプラスとして集計済み
+    df = matrix.to_dataframe().round().astype(int)
+    df.index = month_labels
     
     print("📈 勘定科目別月次推移表")
     print("=" * 100)
@@ -210,11 +185,9 @@ def create_monthly_trend_report():
     print("📈 成長率トレンド:")
     
     # 月次成長率計算
-    for i in range(1, len(month_labels)):
-        prev_revenue = revenue_data.iloc[i-1]
-        curr_revenue = revenue_data.iloc[i]
-        growth_rate = (curr_revenue - prev_revenue) / prev_revenue * 100
-        print(f"• {month_labels[i]}: {growth_rate:+.1f}% (前月比)")
+    revenue_mom = matrix.mom()[matrix.account_ids.index(4000)] * 100
+    for label, growth_rate in zip(month_labels[1:], revenue_mom[1:]):
+        print(f"• {label}: {growth_rate:+.1f}% (前月比)")
     
     print()
     print("⚠️  注意点:")
@@ -225,9 +198,8 @@ def create_monthly_trend_report():
         print(f"• 給与手当が4月から増加 (¥{salary_data.iloc[0]:,} → ¥{salary_data.iloc[-1]:,})")
     
     # 売上原価率の計算
-    cogs_data = df.loc[:, '売上原価']
-    cogs_rate_jan = cogs_data.iloc[0] / revenue_data.iloc[0] * 100
-    cogs_rate_may = cogs_data.iloc[-1] / revenue_data.iloc[-1] * 100
+    cogs_rate = matrix.ratio('売上原価', '売上高') * 100
+    cogs_rate_jan, cogs_rate_may = cogs_rate[0], cogs_rate[-1]
     print(f"• 売上原価率: {cogs_rate_jan:.1f}% (1月) → {cogs_rate_may:.1f}% (5月)")
     
     return df
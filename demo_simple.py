@@ -4,6 +4,18 @@ Freee MCP Scalar - 月次推移表作成デモンストレーション
 pandasを使わないシンプル版
 """
 
+try:
+    # 前月比・原価率の配列演算に使う（numpy がなければ同じ計算を素のPythonで行う）
+    from freee_mcp_client.trend import TrendMatrix
+except ImportError:
+    TrendMatrix = None
+
+
+def month_label(period):
+    """'2025-01' → '1月'"""
+    return f"{int(period[5:7])}月"
+
+
 def simulate_freee_mcp_execution():
     """Freee MCP Scalarの実行をシミュレート"""
     
@@ -25,7 +37,7 @@ def simulate_freee_mcp_execution():
     
     # シミュレートされたfreeeデータ
     monthly_data = {
-        "1月": {
+        "2025-01": {
             "売上高": 12500000,
             "売上原価": 7500000,
             "地代家賃": 500000,
@@ -35,7 +47,7 @@ def simulate_freee_mcp_execution():
             "消耗品費": 25000,
             "広告宣伝費": 150000
         },
-        "2月": {
+        "2025-02": {
             "売上高": 13200000,
             "売上原価": 7920000,
             "地代家賃": 500000,
@@ -45,7 +57,7 @@ def simulate_freee_mcp_execution():
             "消耗品費": 30000,
             "広告宣伝費": 180000
         },
-        "3月": {
+        "2025-03": {
             "売上高": 11800000,
             "売上原価": 7080000,
             "地代家賃": 500000,
@@ -55,7 +67,7 @@ def simulate_freee_mcp_execution():
             "消耗品費": 22000,
             "広告宣伝費": 160000
         },
-        "4月": {
+        "2025-04": {
             "売上高": 14100000,
             "売上原価": 8460000,
             "地代家賃": 500000,
@@ -65,7 +77,7 @@ def simulate_freee_mcp_execution():
             "消耗品費": 35000,
             "広告宣伝費": 200000
         },
-        "5月": {
+        "2025-05": {
             "売上高": 13700000,
             "売上原価": 8220000,
             "地代家賃": 500000,
@@ -94,11 +106,11 @@ def simulate_freee_mcp_execution():
     for account in accounts:
         print("│{:14}│{:>11,}│{:>11,}│{:>11,}│{:>11,}│{:>11,}│".format(
             account,
-            monthly_data["1月"][account],
-            monthly_data["2月"][account], 
-            monthly_data["3月"][account],
-            monthly_data["4月"][account],
-            monthly_data["5月"][account]
+            monthly_data["2025-01"][account],
+            monthly_data["2025-02"][account], 
+            monthly_data["2025-03"][account],
+            monthly_data["2025-04"][account],
+            monthly_data["2025-05"][account]
         ))
     
     print("└" + "─" * 14 + "┴" + "─" * 12 + "┴" + "─" * 12 + "┴" + "─" * 12 + "┴" + "─" * 12 + "┴" + "─" * 12 + "┘")
@@ -107,8 +119,8 @@ def simulate_freee_mcp_execution():
     print("💡 主要な分析:")
     
     # 売上分析
-    jan_revenue = monthly_data["1月"]["売上高"]
-    may_revenue = monthly_data["5月"]["売上高"]
+    jan_revenue = monthly_data["2025-01"]["売上高"]
+    may_revenue = monthly_data["2025-05"]["売上高"]
     revenue_change = (may_revenue - jan_revenue) / jan_revenue * 100
     print(f"• 売上高: {revenue_change:+.1f}% (1月→5月)")
     
@@ -116,15 +128,15 @@ def simulate_freee_mcp_execution():
     revenues = {month: data["売上高"] for month, data in monthly_data.items()}
     max_month = max(revenues, key=revenues.get)
     min_month = min(revenues, key=revenues.get)
-    print(f"• 売上最高月: {max_month} (¥{revenues[max_month]:,})")
-    print(f"• 売上最低月: {min_month} (¥{revenues[min_month]:,})")
+    print(f"• 売上最高月: {month_label(max_month)} (¥{revenues[max_month]:,})")
+    print(f"• 売上最低月: {month_label(min_month)} (¥{revenues[min_month]:,})")
     
     # 固定費
-    print(f"• 地代家賃: 全期間安定 (¥{monthly_data['1月']['地代家賃']:,}/月)")
+    print(f"• 地代家賃: 全期間安定 (¥{monthly_data['2025-01']['地代家賃']:,}/月)")
     
     # 給与変化
-    jan_salary = monthly_data["1月"]["給与手当"]
-    apr_salary = monthly_data["4月"]["給与手当"]
+    jan_salary = monthly_data["2025-01"]["給与手当"]
+    apr_salary = monthly_data["2025-04"]["給与手当"]
     if apr_salary > jan_salary:
         salary_increase = apr_salary - jan_salary
         print(f"• 給与手当: 4月から増加 (+¥{salary_increase:,})")
@@ -132,27 +144,31 @@ def simulate_freee_mcp_execution():
     # 旅費分析
     travels = {month: data["旅費交通費"] for month, data in monthly_data.items()}
     max_travel_month = max(travels, key=travels.get)
-    print(f"• 旅費交通費: {max_travel_month}が最大 (¥{travels[max_travel_month]:,})")
+    print(f"• 旅費交通費: {month_label(max_travel_month)}が最大 (¥{travels[max_travel_month]:,})")
     
     print()
     print("📈 成長率トレンド (前月比):")
     
-    months = ["1月", "2月", "3月", "4月", "5月"]
-    for i in range(1, len(months)):
-        prev_month = months[i-1]
-        curr_month = months[i]
-        prev_revenue = monthly_data[prev_month]["売上高"]
-        curr_revenue = monthly_data[curr_month]["売上高"]
-        growth_rate = (curr_revenue - prev_revenue) / prev_revenue * 100
-        print(f"• {curr_month}: {growth_rate:+.1f}%")
+    periods = list(monthly_data)
+    if TrendMatrix is not None:
+        # 勘定科目 × 月 の行列にして前月比・原価率を配列演算で計算
+        matrix = TrendMatrix.from_mapping(monthly_data, accounts)
+        revenue_mom = (matrix.mom()[matrix.account_names.index("売上高")] * 100).tolist()
+        cogs_rate = (matrix.ratio("売上原価", "売上高") * 100).tolist()
+    else:
+        revenues = [monthly_data[period]["売上高"] for period in periods]
+        revenue_mom = [None] + [
+            (current - previous) / previous * 100 for previous, current in zip(revenues, revenues[1:])
+        ]
+        cogs_rate = [monthly_data[period]["売上原価"] / monthly_data[period]["売上高"] * 100 for period in periods]
+
+    for period, growth_rate in zip(periods[1:], revenue_mom[1:]):
+        print(f"• {month_label(period)}: {growth_rate:+.1f}%")
     
     print()
     print("🔍 売上原価率:")
-    for month in months:
-        revenue = monthly_data[month]["売上高"]
-        cogs = monthly_data[month]["売上原価"]
-        cogs_rate = cogs / revenue * 100
-        print(f"• {month}: {cogs_rate:.1f}%")
+    for period, rate in zip(periods, cogs_rate):
+        print(f"• {month_label(period)}: {rate:.1f}%")
     
     print()
     print("📁 利用可能なエクスポート形式:")
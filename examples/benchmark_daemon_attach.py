@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+コールドスタートとデーモン接続の比較ベンチマーク
+
+事前にデーモンを起動しておく:
+    npm run build
+    npm run daemon &
+
+実行:
+    python examples/benchmark_daemon_attach.py --iterations 5 --tool get_companies
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from freee_mcp_client import FreeeMCPClient, MCPError
+from freee_mcp_client.protocol import default_socket_path
+
+
+def measure(make_client, tool, arguments, iterations):
+    """Return per-phase timings (seconds) for connect+initialize and one tool call"""
+    connect_times, call_times = [], []
+    for _ in range(iterations):
+        client = make_client()
+        started = time.perf_counter()
+        client.session.start()
+        connected = time.perf_counter()
+        try:
+            client.call_tool(tool, arguments)
+        finally:
+            finished = time.perf_counter()
+            client.close()
+        connect_times.append(connected - started)
+        call_times.append(finished - connected)
+    return connect_times, call_times
+
+
+def report(label, connect_times, call_times):
+    total = [a + b for a, b in zip(connect_times, call_times)]
+    print(f"{label:<12} connect+initialize: {statistics.median(connect_times) * 1000:9.1f} ms   "
+          f"first call: {statistics.median(call_times) * 1000:9.1f} ms   "
+          f"total: {statistics.median(total) * 1000:9.1f} ms (median of {len(total)})")
+    return statistics.median(total)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold start vs. daemon attach benchmark')
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--tool', default='get_companies')
+    parser.add_argument('--company-id', help='company_id argument for company scoped tools')
+    parser.add_argument('--socket', default=default_socket_path())
+    args = parser.parse_args()
+
+    arguments = {'company_id': args.company_id} if args.company_id else {}
+
+    print(f"🔬 {args.tool} x {args.iterations}")
+    print("=" * 60)
+
+    try:
+        cold = report('cold start', *measure(FreeeMCPClient, args.tool, arguments, args.iterations))
+        warm = report('daemon', *measure(lambda: FreeeMCPClient.attach(args.socket),
+                                         args.tool, arguments, args.iterations))
+    except MCPError as e:
+        print(f"❌ ベンチマーク失敗: {e}")
+        print(f"   デーモンが {args.socket} で起動しているか確認してください")
+        return 1
+
+    print("=" * 60)
+    print(f"⚡ デーモン接続はコールドスタートの {cold / warm:.1f} 倍高速")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
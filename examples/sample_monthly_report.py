@@ -4,61 +4,23 @@
 実際のFreeeデータではなく、MCPの使用方法を示すテンプレート
 """
 
-import subprocess
-import json
 import os
+import sys
+import atexit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from freee_mcp_client import FreeeMCPClient, MCPError
+
+# サーバーはスクリプト全体で一度だけ起動し、終了時に停止する
+_client = FreeeMCPClient()
+atexit.register(_client.close)
 
 def call_mcp_tool(tool_name, params=None):
     """MCPツールを呼び出すヘルパー関数"""
-    request = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "tools/call",
-        "params": {
-            "name": tool_name,
-            "arguments": params or {}
-        }
-    }
-    
     try:
-        # 環境変数を設定
-        env = os.environ.copy()
-        with open('.env', 'r') as f:
-            for line in f:
-                if line.strip() and not line.startswith('#'):
-                    key, value = line.strip().split('=', 1)
-                    env[key] = value
-        
-        # MCPサーバーとのプロセス通信
-        process = subprocess.Popen(
-            ['npx', 'tsx', 'src/index.ts'],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            env=env
-        )
-        
-        # JSON-RPCリクエストを送信
-        request_json = json.dumps(request) + '\n'
-        stdout, stderr = process.communicate(input=request_json, timeout=30)
-        
-        if stderr:
-            print(f"MCP Server Log: {stderr.strip()}")
-        
-        # レスポンスを解析
-        try:
-            response = json.loads(stdout.strip())
-            if 'result' in response:
-                content = response['result'].get('content', [])
-                if content and content[0].get('type') == 'text':
-                    return json.loads(content[0]['text'])
-            return response.get('result')
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON解析エラー: {e}")
-            return None
-            
-    except Exception as e:
+        return _client.call_tool(tool_name, params)
+    except MCPError as e:
         print(f"❌ MCP通信エラー: {e}")
         return None
 
@@ -0,0 +1,25 @@
+"""
+Freee MCP Server 用 Python クライアント
+
+一度だけサーバーを起動して initialize を行い、以降のツール呼び出しは
+同じセッション上で連番IDのリクエストとして送信する。
+asyncio版 (AsyncFreeeMCPClient) は複数のリクエストを同時に送信できる。
+"""
+
+from .aio import AsyncFreeeMCPClient, AsyncMCPSession
+from .client import FreeeMCPClient
+from .env import load_env
+from .errors import MCPConnectionError, MCPError, MCPTimeoutError, MCPToolError
+from .session import MCPSession
+
+__all__ = [
+    'FreeeMCPClient',
+    'MCPSession',
+    'AsyncFreeeMCPClient',
+    'AsyncMCPSession',
+    'MCPError',
+    'MCPConnectionError',
+    'MCPTimeoutError',
+    'MCPToolError',
+    'load_env',
+]
@@ -0,0 +1,370 @@
+"""
+非同期MCPクライアント（asyncio版）
+1本のstdio接続（またはデーモンのUnixソケット接続）上で複数の tools/call を同時に送信し、
+レスポンスはJSON-RPC IDで呼び出し元に振り分ける
+"""
+
+import asyncio
+import collections
+import itertools
+import os
+
+from . import protocol
+from .env import load_env
+from .errors import MCPConnectionError, MCPTimeoutError
+
+# 大きな試算表レスポンスでも1行で受け取れるようにする
+STREAM_LIMIT = 64 * 1024 * 1024
+
+
+class AsyncMCPSession:
+    """Pipelined MCP session: many requests in flight on one connection"""
+
+    def __init__(self, server_path=protocol.PROJECT_ROOT, command=None, env_file='.env',
+                 env=None, timeout=30, stderr_lines=200, socket_path=None):
+        self.server_path = server_path
+        self.socket_path = socket_path
+        self.command = command or protocol.default_server_command(server_path)
+        self.env_file = env_file
+        self.env = env
+        self.timeout = timeout
+        self.server_info = None
+        self.server_capabilities = None
+
+        self._process = None
+        self._reader = None
+        self._writer = None
+        self._tasks = []
+        self._pending = {}
+        self._ids = itertools.count(1)
+        self._write_lock = asyncio.Lock()
+        self._stderr = collections.deque(maxlen=stderr_lines)
+        self._closed_error = None
+
+    # ライフサイクル
+
+    async def start(self):
+        """Spawn the server (or attach to the daemon) and perform the initialize handshake"""
+        if self._writer is not None:
+            return self
+
+        if self.socket_path:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.socket_path, limit=STREAM_LIMIT)
+            except OSError as e:
+                raise MCPConnectionError(f'Failed to connect to MCP daemon at {self.socket_path}: {e}') from e
+            await self._attach(reader, writer)
+            return self
+
+        env = self.env if self.env is not None else load_env(self._env_path())
+        try:
+            self._process = await asyncio.create_subprocess_exec(
+                *self.command,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=self.server_path,
+                env=env,
+                limit=STREAM_LIMIT,
+            )
+        except OSError as e:
+            raise MCPConnectionError(f'Failed to start MCP server: {e}') from e
+
+        self._tasks.append(asyncio.ensure_future(self._drain_stderr(self._process.stderr)))
+        await self._attach(self._process.stdout, self._process.stdin)
+        return self
+
+    async def close(self, timeout=5):
+        """Fail pending calls, close the connection and wait for the server to exit"""
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            try:
+                writer.close()
+                if hasattr(writer, 'wait_closed'):
+                    await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+        process, self._process = self._process, None
+        if process is not None:
+            try:
+                await asyncio.wait_for(process.wait(), timeout)
+            except asyncio.TimeoutError:
+                process.terminate()
+                try:
+                    await asyncio.wait_for(process.wait(), timeout)
+                except asyncio.TimeoutError:
+                    process.kill()
+                    await process.wait()
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._fail_pending(MCPConnectionError('Session closed'))
+
+    @property
+    def in_flight(self):
+        """Number of requests currently waiting for a response"""
+        return len(self._pending)
+
+    @property
+    def stderr_output(self):
+        """Recent server log lines (stderr)"""
+        return '\n'.join(self._stderr)
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    # JSON-RPC
+
+    async def request(self, method, params=None, timeout=None):
+        """Send a request and await its response; cancels server-side work on timeout"""
+        if self._writer is None:
+            raise self._closed_error or MCPConnectionError('Session is not started')
+
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+
+        try:
+            await self._send(protocol.make_request(request_id, method, params))
+            message = await asyncio.wait_for(future, timeout or self.timeout)
+        except asyncio.TimeoutError:
+            await self._cancel_remote(request_id, 'timeout')
+            raise MCPTimeoutError(f'No response for request {request_id} ({method}) within {timeout or self.timeout}s') from None
+        except asyncio.CancelledError:
+            await asyncio.shield(self._cancel_remote(request_id, 'cancelled by client'))
+            raise
+        finally:
+            self._pending.pop(request_id, None)
+
+        return protocol.unwrap_response(message)
+
+    async def notify(self, method, params=None):
+        """Send a notification (no response expected)"""
+        await self._send(protocol.make_notification(method, params))
+
+    async def call_tool(self, name, arguments=None, timeout=None):
+        """Call an MCP tool and return the parsed payload"""
+        result = await self.request('tools/call', {'name': name, 'arguments': arguments or {}}, timeout)
+        return protocol.parse_tool_result(result)
+
+    async def list_tools(self):
+        """Return the tool definitions advertised by the server"""
+        return (await self.request('tools/list')).get('tools', [])
+
+    async def read_resource(self, uri, timeout=None):
+        """Read a resource (e.g. a stored large tool result) and return the parsed payload"""
+        return protocol.parse_resource_result(await self.request('resources/read', {'uri': uri}, timeout))
+
+    async def list_resources(self):
+        """Return the resources currently offered by the server"""
+        return (await self.request('resources/list')).get('resources', [])
+
+    # Private methods
+
+    def _env_path(self):
+        return self.env_file if os.path.isabs(self.env_file) else os.path.join(self.server_path, self.env_file)
+
+    async def _attach(self, reader, writer):
+        """Start the response router on a reader/writer pair and initialize"""
+        self._reader = reader
+        self._writer = writer
+        self._closed_error = None
+        self._tasks.append(asyncio.ensure_future(self._route_responses(reader)))
+
+        try:
+            result = await self.request('initialize', protocol.initialize_params())
+        except Exception:
+            await self.close()
+            raise
+        self.server_info = result.get('serverInfo')
+        self.server_capabilities = result.get('capabilities')
+        await self.notify('notifications/initialized')
+
+    async def _send(self, line):
+        writer = self._writer
+        if writer is None:
+            raise self._closed_error or MCPConnectionError('Session is not started')
+        async with self._write_lock:
+            try:
+                writer.write(line.encode('utf-8'))
+                await writer.drain()
+            except (ConnectionError, OSError) as e:
+                raise MCPConnectionError(f'Failed to send request: {e}') from e
+
+    async def _cancel_remote(self, request_id, reason):
+        try:
+            await self.notify('notifications/cancelled', {'requestId': request_id, 'reason': reason})
+        except MCPConnectionError:
+            pass
+
+    async def _route_responses(self, reader):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                text = line.decode('utf-8', errors='replace')
+                message = protocol.parse_message(text)
+                if message is None:
+                    if text.strip():
+                        self._stderr.append(text.rstrip())
+                    continue
+                if 'method' in message:
+                    # サーバーからの通知（進捗など）は現状読み捨てる
+                    continue
+                future = self._pending.get(message.get('id'))
+                if future is not None and not future.done():
+                    future.set_result(message)
+        except (ConnectionError, OSError, ValueError) as e:
+            self._stderr.append(f'connection error: {e}')
+
+        error = MCPConnectionError('MCP server closed the connection'
+                                   + (f' (last log: {self._stderr[-1]})' if self._stderr else ''))
+        self._closed_error = error
+        self._fail_pending(error)
+
+    async def _drain_stderr(self, stream):
+        while True:
+            line = await stream.readline()
+            if not line:
+                break
+            self._stderr.append(line.decode('utf-8', errors='replace').rstrip())
+
+    def _fail_pending(self, error):
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+
+class AsyncFreeeMCPClient:
+    """asyncio client with gather-style fan-out over one MCP session
+
+    Usage:
+        async with AsyncFreeeMCPClient() as client:
+            months = [('2025-01-01', '2025-01-31'), ('2025-02-01', '2025-02-28')]
+            pls = await client.call_many(
+                ('get_trial_pl', {'company_id': cid, 'start_date': s, 'end_date': e})
+                for s, e in months
+            )
+    """
+
+    def __init__(self, mcp_server_path=protocol.PROJECT_ROOT, session=None, **session_options):
+        self.session = session or AsyncMCPSession(server_path=mcp_server_path, **session_options)
+
+    @classmethod
+    def attach(cls, socket_path=None, **session_options):
+        """Connect to a running daemon instead of spawning a server"""
+        return cls(socket_path=socket_path or protocol.default_socket_path(), **session_options)
+
+    async def __aenter__(self):
+        await self.session.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """Shut down the session"""
+        await self.session.close()
+
+    async def call_tool(self, tool_name, arguments=None, timeout=None):
+        """Call an MCP tool and return the parsed result
+
+        Same as FreeeMCPClient.call_tool: large results are requested inline and
+        split responses are followed via _page.next_cursor.
+        """
+        arguments = protocol.tool_arguments(arguments)
+        result = await self.session.call_tool(tool_name, arguments, timeout)
+        if not protocol.follows_pages(arguments):
+            return result
+
+        pages = [result]
+        while protocol.next_cursor(pages[-1]):
+            pages.append(await self.session.call_tool(tool_name, {'cursor': protocol.next_cursor(pages[-1])}, timeout))
+        return protocol.join_pages(pages)
+
+    async def read_resource(self, uri, timeout=None):
+        """Read a stored tool result by URI (section and ?offset=&limit= row ranges allowed)"""
+        return await self.session.read_resource(uri, timeout)
+
+    async def call_many(self, calls, limit=None, timeout=None, return_exceptions=False):
+        """Run (tool_name, arguments) pairs concurrently; results keep input order
+
+        limit caps the number of requests in flight (None = all at once).
+        """
+        calls = list(calls)
+        semaphore = asyncio.Semaphore(limit) if limit else None
+
+        async def run(name, arguments):
+            if semaphore is None:
+                return await self.call_tool(name, arguments, timeout)
+            async with semaphore:
+                return await self.call_tool(name, arguments, timeout)
+
+        return await asyncio.gather(
+            *(run(name, arguments) for name, arguments in calls),
+            return_exceptions=return_exceptions,
+        )
+
+    async def get_companies(self):
+        """Get list of companies"""
+        return await self.call_tool('get_companies')
+
+    async def get_account_items(self, company_id, base_date=None):
+        """Get account items for a company"""
+        args = {'company_id': str(company_id)}
+        if base_date:
+            args['base_date'] = base_date
+        return await self.call_tool('get_account_items', args)
+
+    async def get_partners(self, company_id, keyword=None, limit=None):
+        """Get partners for a company"""
+        args = {'company_id': str(company_id)}
+        if keyword:
+            args['keyword'] = keyword
+        if limit:
+            args['limit'] = limit
+        return await self.call_tool('get_partners', args)
+
+    async def get_trial_pl(self, company_id, start_date, end_date, breakdown_display_type=None):
+        """Get P&L trial balance"""
+        return await self.call_tool('get_trial_pl', _trial_args(company_id, start_date, end_date, breakdown_display_type))
+
+    async def get_trial_bs(self, company_id, start_date, end_date, breakdown_display_type=None):
+        """Get B/S trial balance"""
+        return await self.call_tool('get_trial_bs', _trial_args(company_id, start_date, end_date, breakdown_display_type))
+
+    async def get_monthly_trial_balances(self, company_id, months, breakdown_display_type=None, limit=None):
+        """Fetch PL and BS for every (start_date, end_date) month concurrently
+
+        Returns a list of {'start_date', 'end_date', 'pl', 'bs'} in the given order.
+        """
+        months = list(months)
+        calls = []
+        for start_date, end_date in months:
+            args = _trial_args(company_id, start_date, end_date, breakdown_display_type)
+            calls.append(('get_trial_pl', args))
+            calls.append(('get_trial_bs', args))
+
+        results = await self.call_many(calls, limit=limit)
+        return [
+            {'start_date': start_date, 'end_date': end_date, 'pl': results[2 * i], 'bs': results[2 * i + 1]}
+            for i, (start_date, end_date) in enumerate(months)
+        ]
+
+
+def _trial_args(company_id, start_date, end_date, breakdown_display_type):
+    args = {
+        'company_id': str(company_id),
+        'start_date': start_date,
+        'end_date': end_date,
+    }
+    if breakdown_display_type:
+        args['breakdown_display_type'] = breakdown_display_type
+    return args
@@ -0,0 +1,106 @@
+"""
+Freee MCP ツール呼び出しクライアント（同期版）
+"""
+
+from . import protocol
+from .session import MCPSession
+
+
+class FreeeMCPClient:
+    """Convenience wrapper around one long-lived MCPSession
+
+    Usage:
+        with FreeeMCPClient() as client:
+            companies = client.get_companies()
+            items = client.get_account_items(companies['companies'][0]['id'])
+    """
+
+    def __init__(self, mcp_server_path=protocol.PROJECT_ROOT, session=None, **session_options):
+        self.session = session or MCPSession(server_path=mcp_server_path, **session_options)
+
+    @classmethod
+    def attach(cls, socket_path=None, **session_options):
+        """Connect to a running daemon instead of spawning a server"""
+        return cls(socket_path=socket_path or protocol.default_socket_path(), **session_options)
+
+    def __enter__(self):
+        self.session.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Shut down the server process"""
+        self.session.close()
+
+    def call_tool(self, tool_name, arguments=None, timeout=None):
+        """Call an MCP tool and return the parsed result (starts the session lazily)
+
+        Large results are requested inline (no resource URI) and split responses are
+        followed via _page.next_cursor, so the full result is returned. Pass
+        inline=False, page_size or cursor in arguments to get the raw response.
+        """
+        self.session.start()
+        arguments = protocol.tool_arguments(arguments)
+        result = self.session.call_tool(tool_name, arguments, timeout)
+        if not protocol.follows_pages(arguments):
+            return result
+
+        pages = [result]
+        while protocol.next_cursor(pages[-1]):
+            pages.append(self.session.call_tool(tool_name, {'cursor': protocol.next_cursor(pages[-1])}, timeout))
+        return protocol.join_pages(pages)
+
+    def read_resource(self, uri, timeout=None):
+        """Read a stored tool result by URI (section and ?offset=&limit= row ranges allowed)"""
+        self.session.start()
+        return self.session.read_resource(uri, timeout)
+
+    def get_companies(self):
+        """Get list of companies"""
+        return self.call_tool("get_companies")
+
+    def get_account_items(self, company_id, base_date=None):
+        """Get account items for a company"""
+        args = {"company_id": str(company_id)}
+        if base_date:
+            args["base_date"] = base_date
+        return self.call_tool("get_account_items", args)
+
+    def get_partners(self, company_id, keyword=None, limit=None):
+        """Get partners for a company"""
+        args = {"company_id": str(company_id)}
+        if keyword:
+            args["keyword"] = keyword
+        if limit:
+            args["limit"] = limit
+        return self.call_tool("get_partners", args)
+
+    def get_deals(self, company_id, **filters):
+        """Get deals for a company"""
+        args = {"company_id": str(company_id)}
+        args.update({k: v for k, v in filters.items() if v is not None})
+        return self.call_tool("get_deals", args)
+
+    def get_trial_pl(self, company_id, start_date, end_date, breakdown_display_type=None):
+        """Get P&L trial balance"""
+        args = {
+            "company_id": str(company_id),
+            "start_date": start_date,
+            "end_date": end_date
+        }
+        if breakdown_display_type:
+            args["breakdown_display_type"] = breakdown_display_type
+        return self.call_tool("get_trial_pl", args)
+
+    def get_trial_bs(self, company_id, start_date, end_date, breakdown_display_type=None):
+        """Get B/S trial balance"""
+        args = {
+            "company_id": str(company_id),
+            "start_date": start_date,
+            "end_date": end_date
+        }
+        if breakdown_display_type:
+            args["breakdown_display_type"] = breakdown_display_type
+        return self.call_tool("get_trial_bs", args)
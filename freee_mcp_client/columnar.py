@@ -0,0 +1,90 @@
+"""
+エクスポートデータ（Arrow IPC）の読み込み（pyarrow）
+update_freee_data を format='arrow' で実行した出力（*.arrow）をメモリマップで開き、
+CSVのような解析・型変換をせずに列をそのまま配列として読む
+
+    from freee_mcp_client.columnar import partition_paths, read_columns
+
+    paths = partition_paths('data_analysis/exported_data', company_id, 'trial_balance')
+    columns = read_columns(paths, ['開始日', '勘定科目ID', '期末残高'])
+    columns['期末残高']          # numpy.ndarray[int64]
+"""
+
+import json
+import os
+
+import pyarrow as pa
+import pyarrow.ipc
+
+DATASETS = ('trial_balance', 'account_items', 'partners')
+
+
+def open_table(path):
+    """Memory-map exported .arrow file(s) and return them as one pyarrow.Table
+
+    A single path is read without copying; a list of partition paths is
+    concatenated (chunks still reference the mapped files).
+    """
+    if isinstance(path, (list, tuple)):
+        if not path:
+            raise ValueError('No partitions to read')
+        tables = [open_table(p) for p in path]
+        return pa.concat_tables(tables, promote_options='permissive') if len(tables) > 1 else tables[0]
+    with pa.memory_map(os.fspath(path), 'r') as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def read_columns(path, columns=None):
+    """Read columns as numpy arrays
+
+    Numeric and date columns without nulls in a single file are zero-copy views
+    of the mapped file; columns with nulls come back as float/object arrays,
+    category columns as numpy arrays of their string values.
+    """
+    table = open_table(path)
+    names = columns if columns is not None else table.column_names
+    return {name: _to_numpy(table.column(name)) for name in names}
+
+
+def read_dataframe(path, columns=None):
+    """Read an export as a pandas DataFrame (category columns become pandas Categorical)"""
+    table = open_table(path)
+    if columns is not None:
+        table = table.select(columns)
+    return table.to_pandas(date_as_object=False, split_blocks=True, self_destruct=True)
+
+
+def partition_paths(export_dir, company_id, dataset, months=None):
+    """Paths of a dataset's .arrow partitions listed in the company's manifest.json
+
+    dataset is 'trial_balance' (one partition per month, ordered by month) or a
+    master ('account_items', 'partners'). months optionally limits trial_balance
+    to the given 'YYYY-MM' partitions.
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f'dataset must be one of {DATASETS}')
+    company_dir = os.path.join(export_dir, str(company_id))
+    with open(os.path.join(company_dir, 'manifest.json'), encoding='utf-8') as f:
+        partitions = json.load(f)['partitions']
+
+    wanted = None if months is None else {f'{dataset}/{month}' for month in months}
+    paths = [
+        os.path.join(company_dir, entry['file'])
+        for key, entry in sorted(partitions.items())
+        if (key == dataset or key.startswith(f'{dataset}/'))
+        and (wanted is None or key in wanted)
+        and entry['file'].endswith('.arrow')
+    ]
+    if not paths:
+        raise FileNotFoundError(f'No {dataset} .arrow partitions in {company_dir}')
+    return paths
+
+
+# Private helpers
+
+def _to_numpy(column):
+    if pa.types.is_dictionary(column.type):
+        column = column.cast(column.type.value_type)
+    if column.num_chunks == 1:
+        return column.chunk(0).to_numpy(zero_copy_only=False)
+    return column.to_numpy()
@@ -0,0 +1,31 @@
+"""
+.env 読み込みヘルパー
+サーバー起動時の環境変数を一度だけ組み立てる
+"""
+
+import os
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def _parse_env_file(path):
+    """Parse a .env file into a dict (cached per absolute path)"""
+    values = {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#') or '=' not in line:
+                    continue
+                key, value = line.split('=', 1)
+                values[key.strip()] = value.strip().strip('"').strip("'")
+    except FileNotFoundError:
+        pass
+    return values
+
+
+def load_env(env_file='.env', base_env=None):
+    """Return a copy of the process environment merged with the .env file"""
+    env = dict(os.environ if base_env is None else base_env)
+    env.update(_parse_env_file(os.path.abspath(env_file)))
+    return env
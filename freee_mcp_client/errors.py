@@ -0,0 +1,24 @@
+"""
+クライアント例外クラス
+"""
+
+
+class MCPError(Exception):
+    """Base error for the Freee MCP client"""
+
+
+class MCPConnectionError(MCPError):
+    """The server process or connection is not usable"""
+
+
+class MCPTimeoutError(MCPError):
+    """A request did not receive a response in time"""
+
+
+class MCPToolError(MCPError):
+    """The server returned a JSON-RPC error or a tool error result"""
+
+    def __init__(self, message, code=None, data=None):
+        super().__init__(message)
+        self.code = code
+        self.data = data
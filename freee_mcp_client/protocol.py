@@ -0,0 +1,163 @@
+"""
+MCP JSON-RPC メッセージの組み立て・解析
+同期クライアントと非同期クライアントで共有する
+"""
+
+import json
+import os
+
+from .errors import MCPToolError
+
+PROTOCOL_VERSION = '2024-11-05'
+CLIENT_INFO = {'name': 'freee-mcp-client', 'version': '1.0.0'}
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def default_server_command(server_path=PROJECT_ROOT):
+    """Use the built bundle when present, otherwise run the TypeScript sources"""
+    if os.path.exists(os.path.join(server_path, 'dist', 'index.js')):
+        return ['node', 'dist/index.js']
+    return ['npx', 'tsx', 'src/index.ts']
+
+
+def default_socket_path():
+    """Socket path used by `node dist/index.js --daemon` (FREEE_MCP_SOCKET overrides)"""
+    return os.environ.get('FREEE_MCP_SOCKET') or os.path.join(
+        os.path.expanduser('~'), '.config', 'freee-mcp', 'mcp.sock')
+
+
+def make_request(request_id, method, params=None):
+    """Build a JSON-RPC request line"""
+    message = {'jsonrpc': '2.0', 'id': request_id, 'method': method}
+    if params is not None:
+        message['params'] = params
+    return json.dumps(message, ensure_ascii=False) + '\n'
+
+
+def make_notification(method, params=None):
+    """Build a JSON-RPC notification line"""
+    message = {'jsonrpc': '2.0', 'method': method}
+    if params is not None:
+        message['params'] = params
+    return json.dumps(message, ensure_ascii=False) + '\n'
+
+
+def initialize_params():
+    """Parameters for the initialize handshake"""
+    return {
+        'protocolVersion': PROTOCOL_VERSION,
+        'capabilities': {},
+        'clientInfo': CLIENT_INFO,
+    }
+
+
+def parse_message(line):
+    """Parse one line from the server; non JSON-RPC output (logs) returns None"""
+    line = line.strip()
+    if not line.startswith('{'):
+        return None
+    try:
+        message = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(message, dict) or message.get('jsonrpc') != '2.0':
+        return None
+    return message
+
+
+def unwrap_response(message):
+    """Return the result of a response or raise MCPToolError"""
+    if 'error' in message:
+        error = message['error'] or {}
+        raise MCPToolError(error.get('message', 'Unknown error'), error.get('code'), error.get('data'))
+    return message.get('result')
+
+
+def parse_tool_result(result):
+    """Extract the JSON payload from a tools/call result"""
+    if result is None:
+        return None
+
+    content = result.get('content') or []
+    texts = [item.get('text', '') for item in content if item.get('type') == 'text']
+
+    if result.get('isError'):
+        raise MCPToolError(texts[0] if texts else 'Tool execution failed', data=result)
+
+    if not texts:
+        return result
+    if len(texts) == 1:
+        return _loads_or_text(texts[0])
+    return [_loads_or_text(text) for text in texts]
+
+
+def parse_resource_result(result):
+    """Extract the JSON payload from a resources/read result"""
+    contents = (result or {}).get('contents') or []
+    texts = [item.get('text', '') for item in contents if 'text' in item]
+    if not texts:
+        return None
+    if len(texts) == 1:
+        return _loads_or_text(texts[0])
+    return [_loads_or_text(text) for text in texts]
+
+
+def tool_arguments(arguments=None):
+    """Arguments for a client tool call: large results come back inline, not as a resource URI"""
+    args = dict(arguments or {})
+    args.setdefault('inline', True)
+    return args
+
+
+def follows_pages(arguments):
+    """Whether the client should fetch every page itself (not when the caller pages explicitly)"""
+    return 'page_size' not in arguments and 'cursor' not in arguments
+
+
+def next_cursor(result):
+    """_page.next_cursor of a paged or size-split tool result, or None"""
+    if not isinstance(result, dict):
+        return None
+    return (result.get('_page') or {}).get('next_cursor')
+
+
+def join_pages(pages):
+    """Reassemble the full result from the pages returned via _page.next_cursor
+
+    Array pages are concatenated at _page.path; partial_json pages are joined and parsed.
+    """
+    first = pages[0]
+    if len(pages) == 1 and next_cursor(first) is None:
+        return first
+
+    if 'partial_json' in first:
+        return json.loads(''.join(page['partial_json'] for page in pages))
+
+    path = [key for key in first['_page']['path'].split('.') if key]
+    items = []
+    for page in pages:
+        items.extend(_get_at(page, path or ['items']))
+    if not path:
+        return items
+
+    result = {key: value for key, value in first.items() if key != '_page'}
+    node = result
+    for key in path[:-1]:
+        node[key] = dict(node[key])
+        node = node[key]
+    node[path[-1]] = items
+    return result
+
+
+def _get_at(value, path):
+    for key in path:
+        value = value[key]
+    return value
+
+
+def _loads_or_text(text):
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
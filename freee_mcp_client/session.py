@@ -0,0 +1,230 @@
+"""
+常駐型MCPセッション（同期版）
+サーバープロセスを一度だけ起動し（またはデーモンのUnixソケットに接続し）、
+initialize ハンドシェイク後に複数の tools/call を連番IDで送受信する
+"""
+
+import collections
+import itertools
+import os
+import queue
+import socket
+import subprocess
+import threading
+
+from . import protocol
+from .env import load_env
+from .errors import MCPConnectionError, MCPTimeoutError
+
+_EOF = object()
+
+
+class MCPSession:
+    """Long-lived stdio connection to the Freee MCP server"""
+
+    def __init__(self, server_path=protocol.PROJECT_ROOT, command=None, env_file='.env',
+                 env=None, timeout=30, stderr_lines=200, socket_path=None):
+        self.server_path = server_path
+        self.socket_path = socket_path
+        self.command = command or protocol.default_server_command(server_path)
+        self.env_file = env_file
+        self.env = env
+        self.timeout = timeout
+        self.server_info = None
+        self.server_capabilities = None
+
+        self._process = None
+        self._socket = None
+        self._out = None
+        self._messages = queue.Queue()
+        self._ids = itertools.count(1)
+        self._write_lock = threading.Lock()
+        self._call_lock = threading.Lock()
+        self._stderr = collections.deque(maxlen=stderr_lines)
+
+    # ライフサイクル
+
+    def start(self):
+        """Spawn the server (or attach to the daemon) and perform the initialize handshake"""
+        if self._out is not None:
+            return self
+
+        if self.socket_path:
+            self._connect_socket()
+        else:
+            self._spawn_process()
+
+        try:
+            result = self.request('initialize', protocol.initialize_params())
+        except Exception:
+            self.close()
+            raise
+        self.server_info = result.get('serverInfo')
+        self.server_capabilities = result.get('capabilities')
+        self.notify('notifications/initialized')
+        return self
+
+    def _spawn_process(self):
+        env = self.env if self.env is not None else load_env(self._env_path())
+        try:
+            self._process = subprocess.Popen(
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding='utf-8',
+                bufsize=1,
+                cwd=self.server_path,
+                env=env,
+            )
+        except OSError as e:
+            raise MCPConnectionError(f'Failed to start MCP server: {e}') from e
+
+        self._out = self._process.stdin
+        threading.Thread(target=self._read_stdout, args=(self._process.stdout,), daemon=True).start()
+        threading.Thread(target=self._read_stderr, args=(self._process,), daemon=True).start()
+
+    def _connect_socket(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.socket_path)
+        except OSError as e:
+            sock.close()
+            raise MCPConnectionError(f'Failed to connect to MCP daemon at {self.socket_path}: {e}') from e
+
+        self._socket = sock
+        self._out = sock.makefile('w', encoding='utf-8', newline='\n')
+        reader = sock.makefile('r', encoding='utf-8', newline='\n')
+        threading.Thread(target=self._read_stdout, args=(reader,), daemon=True).start()
+
+    def close(self, timeout=5):
+        """Close the connection and wait for a spawned server to exit"""
+        out, self._out = self._out, None
+        sock, self._socket = self._socket, None
+        process, self._process = self._process, None
+
+        if sock is not None:
+            # デーモンは停止せず、この接続だけを閉じる
+            try:
+                out.close()
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+
+        if process is None:
+            return
+
+        try:
+            if process.stdin and not process.stdin.closed:
+                process.stdin.close()
+        except OSError:
+            pass
+
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.terminate()
+            try:
+                process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+    @property
+    def is_running(self):
+        if self._out is None:
+            return False
+        return self._process is None or self._process.poll() is None
+
+    @property
+    def stderr_output(self):
+        """Recent server log lines (stderr)"""
+        return '\n'.join(self._stderr)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # JSON-RPC
+
+    def request(self, method, params=None, timeout=None):
+        """Send a request and block until the matching response arrives"""
+        with self._call_lock:
+            request_id = next(self._ids)
+            self._write(protocol.make_request(request_id, method, params))
+            return protocol.unwrap_response(self._wait_for(request_id, timeout or self.timeout))
+
+    def notify(self, method, params=None):
+        """Send a notification (no response expected)"""
+        self._write(protocol.make_notification(method, params))
+
+    def call_tool(self, name, arguments=None, timeout=None):
+        """Call an MCP tool and return the parsed payload"""
+        result = self.request('tools/call', {'name': name, 'arguments': arguments or {}}, timeout)
+        return protocol.parse_tool_result(result)
+
+    def list_tools(self):
+        """Return the tool definitions advertised by the server"""
+        return self.request('tools/list').get('tools', [])
+
+    def read_resource(self, uri, timeout=None):
+        """Read a resource (e.g. a stored large tool result) and return the parsed payload"""
+        return protocol.parse_resource_result(self.request('resources/read', {'uri': uri}, timeout))
+
+    def list_resources(self):
+        """Return the resources currently offered by the server"""
+        return self.request('resources/list').get('resources', [])
+
+    # Private methods
+
+    def _env_path(self):
+        return self.env_file if os.path.isabs(self.env_file) else os.path.join(self.server_path, self.env_file)
+
+    def _write(self, line):
+        if not self.is_running:
+            raise MCPConnectionError(self._exit_message())
+        with self._write_lock:
+            try:
+                self._out.write(line)
+                self._out.flush()
+            except (BrokenPipeError, OSError) as e:
+                raise MCPConnectionError(f'{self._exit_message()}: {e}') from e
+
+    def _wait_for(self, request_id, timeout):
+        while True:
+            try:
+                message = self._messages.get(timeout=timeout)
+            except queue.Empty:
+                raise MCPTimeoutError(f'No response for request {request_id} within {timeout}s') from None
+
+            if message is _EOF:
+                raise MCPConnectionError(self._exit_message())
+            if message.get('id') == request_id and 'method' not in message:
+                return message
+            # サーバーからの通知や古いレスポンスは読み捨てる
+
+    def _read_stdout(self, stream):
+        try:
+            for line in stream:
+                message = protocol.parse_message(line)
+                if message is not None:
+                    self._messages.put(message)
+                elif line.strip():
+                    self._stderr.append(line.rstrip())
+        except (OSError, ValueError):
+            pass
+        self._messages.put(_EOF)
+
+    def _read_stderr(self, process):
+        for line in process.stderr:
+            self._stderr.append(line.rstrip())
+
+    def _exit_message(self):
+        message = 'MCP server is not running'
+        if self._stderr:
+            message += f' (last log: {self._stderr[-1]})'
+        return message
@@ -0,0 +1,240 @@
+"""
+試算表の月次推移マトリクス（numpy）
+trial_pl / trial_bs の残高行を 勘定科目 × 期間 の行列に一度で集計し、
+前月比・前年同月比・累計・比率を配列演算で求める
+
+    from freee_mcp_client.trend import pivot_trial_balances
+
+    matrix = pivot_trial_balances({'2025-01': pl_jan, '2025-02': pl_feb}, value='net')
+    matrix.mom()                        # 前月比 (勘定科目 × 期間)
+    matrix.ratio('売上原価', '売上高')    # 売上原価率 (期間)
+"""
+
+import re
+
+import numpy as np
+
+# 貸方がプラスになる（収益・負債・純資産）勘定科目カテゴリ
+CREDIT_NORMAL_CATEGORIES = frozenset({
+    'revenue', 'sales', 'non_operating_income', 'extraordinary_income',
+    'liabilities', 'liability', 'equity', 'net_assets',
+    '売上高', '営業外収益', '特別利益',
+    '流動負債', '固定負債', '負債', '純資産', '資本金', '資本剰余金', '利益剰余金',
+})
+
+# mom() / yoy() / cumulative() は期間を年月として扱う
+PERIOD_PATTERN = re.compile(r'^\d{4}-(0[1-9]|1[0-2])$')
+
+VALUE_COLUMNS = ('net', 'closing_balance', 'opening_balance', 'debit_amount', 'credit_amount')
+
+
+class TrendMatrix:
+    """Dense account x period matrix with vectorised trend calculations"""
+
+    def __init__(self, account_ids, account_names, periods, values, categories=None):
+        self.account_ids = list(account_ids)
+        self.account_names = list(account_names)
+        self.categories = list(categories) if categories is not None else [None] * len(self.account_ids)
+        self.periods = list(periods)
+        self.values = values
+        self._index = {}
+        for i, (account_id, name) in enumerate(zip(self.account_ids, self.account_names)):
+            self._index.setdefault(account_id, i)
+            self._index.setdefault(name, i)
+
+    @classmethod
+    def from_mapping(cls, data, accounts=None):
+        """Build from {'YYYY-MM': {account_name: amount}} (already signed amounts)"""
+        periods = list(data)
+        invalid = [period for period in periods if not isinstance(period, str) or not PERIOD_PATTERN.match(period)]
+        if invalid:
+            raise ValueError(f'periods must be YYYY-MM strings, got {invalid!r}')
+        if accounts is None:
+            accounts = list(dict.fromkeys(name for amounts in data.values() for name in amounts))
+        values = np.array(
+            [[data[period].get(name, 0) for period in periods] for name in accounts],
+            dtype=np.float64,
+        ).reshape(len(accounts), len(periods))
+        return cls(accounts, accounts, periods, values)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def row(self, account):
+        """Return the period series of one account (by id or name)"""
+        try:
+            return self.values[self._index[account]]
+        except KeyError:
+            raise KeyError(f'Unknown account: {account}') from None
+
+    def mom(self):
+        """Month-over-month change ratio; NaN where the previous month is 0 or missing"""
+        return _change(self.values, self._previous_index(1))
+
+    def yoy(self):
+        """Year-over-year change ratio against the same month 12 months earlier"""
+        return _change(self.values, self._previous_index(12))
+
+    def cumulative(self, fiscal_start_month=None):
+        """Running total along periods; resets each fiscal year when fiscal_start_month is given"""
+        totals = np.cumsum(self.values, axis=1)
+        if not fiscal_start_month or not self.periods:
+            return totals
+
+        years = np.array([_fiscal_year(period, fiscal_start_month) for period in self.periods])
+        starts = np.flatnonzero(np.r_[True, years[1:] != years[:-1]])
+        # 各会計年度の開始直前までの累計を差し引く
+        offsets = np.zeros_like(totals)
+        for start in starts[1:]:
+            offsets[:, start:] = totals[:, [start - 1]]
+        return totals - offsets
+
+    def ratio(self, numerator, denominator):
+        """numerator / denominator per period (accounts by id or name); NaN where denominator is 0"""
+        return _safe_divide(self.row(numerator), self.row(denominator))
+
+    def share(self, denominator):
+        """Every account divided by one account (e.g. ratio to sales) as a matrix"""
+        return _safe_divide(self.values, self.row(denominator)[np.newaxis, :])
+
+    def totals(self, mask=None):
+        """Column totals over all accounts, or over a boolean account mask"""
+        values = self.values if mask is None else self.values[np.asarray(mask)]
+        return values.sum(axis=0)
+
+    def _previous_index(self, months):
+        """Column index of the calendar month `months` earlier for each period (-1 = not present)"""
+        position = {period: i for i, period in enumerate(self.periods)}
+        return np.array([position.get(_shift_month(period, -months), -1) for period in self.periods],
+                        dtype=np.intp)
+
+    def to_rows(self):
+        """List of {'account_id', 'account_name', <period>: value, ...} dicts"""
+        return [
+            {'account_id': account_id, 'account_name': name,
+             **dict(zip(self.periods, self.values[i].tolist()))}
+            for i, (account_id, name) in enumerate(zip(self.account_ids, self.account_names))
+        ]
+
+    def to_dataframe(self, values=None, by='name'):
+        """pandas DataFrame (periods x accounts) of values or a derived matrix (requires pandas)"""
+        import pandas as pd
+
+        columns = self.account_names if by == 'name' else self.account_ids
+        data = self.values if values is None else values
+        return pd.DataFrame(data.T, index=self.periods, columns=columns)
+
+
+def pivot_balances(rows, value='net', period_key='period', account_items=None):
+    """Pivot balance rows carrying a period key into a TrendMatrix in one pass
+
+    value: 'net' (signed by the account's normal side), 'closing_balance',
+    'opening_balance', 'debit_amount' or 'credit_amount'.
+    account_items: optional get_account_items rows used for order, names and categories.
+    """
+    if value not in VALUE_COLUMNS:
+        raise ValueError(f'value must be one of {VALUE_COLUMNS}')
+
+    account_pos, account_ids, account_names, categories = {}, [], [], []
+    if account_items:
+        for item in account_items:
+            account_pos[item['id']] = len(account_ids)
+            account_ids.append(item['id'])
+            account_names.append(item.get('name', ''))
+            categories.append(item.get('account_category'))
+
+    period_pos = {}
+    row_index, col_index, debit, credit, amount = [], [], [], [], []
+
+    for row in rows:
+        if row.get('total_line') or row.get('account_item_id') is None:
+            continue
+        account_id = row['account_item_id']
+        if account_id not in account_pos:
+            account_pos[account_id] = len(account_ids)
+            account_ids.append(account_id)
+            account_names.append(row.get('account_item_name', ''))
+            categories.append(row.get('account_category_name') or row.get('account_category'))
+        period = row[period_key]
+        if period not in period_pos:
+            period_pos[period] = None
+
+        row_index.append(account_pos[account_id])
+        col_index.append(period)
+        if value == 'net':
+            debit.append(row.get('debit_amount') or 0)
+            credit.append(row.get('credit_amount') or 0)
+        else:
+            amount.append(row.get(value) or 0)
+
+    periods = sorted(period_pos)
+    period_pos = {period: i for i, period in enumerate(periods)}
+
+    rows_arr = np.fromiter(row_index, dtype=np.intp, count=len(row_index))
+    cols_arr = np.fromiter((period_pos[p] for p in col_index), dtype=np.intp, count=len(col_index))
+
+    if value == 'net':
+        sign = np.where([_is_credit_normal(c) for c in categories], -1.0, 1.0)
+        amounts = (np.asarray(debit, dtype=np.float64) - np.asarray(credit, dtype=np.float64)) * sign[rows_arr]
+    else:
+        amounts = np.asarray(amount, dtype=np.float64)
+
+    values = np.zeros((len(account_ids), len(periods)), dtype=np.float64)
+    np.add.at(values, (rows_arr, cols_arr), amounts)
+
+    return TrendMatrix(account_ids, account_names, periods, values, categories)
+
+
+def pivot_trial_balances(responses, value='net', account_items=None):
+    """Pivot {period: trial_pl/trial_bs response or balances list} into a TrendMatrix"""
+    def rows():
+        for period, response in responses.items():
+            for balance in _balances(response):
+                yield {**balance, 'period': period}
+
+    return pivot_balances(rows(), value=value, account_items=account_items)
+
+
+# Private helpers
+
+def _balances(response):
+    if isinstance(response, list):
+        return response
+    report = response.get('trial_pl') or response.get('trial_bs') or response
+    return report.get('balances', [])
+
+
+def _is_credit_normal(category):
+    return category in CREDIT_NORMAL_CATEGORIES
+
+
+def _safe_divide(numerator, denominator):
+    numerator, denominator = np.broadcast_arrays(
+        np.asarray(numerator, dtype=np.float64), np.asarray(denominator, dtype=np.float64))
+    out = np.full(numerator.shape, np.nan)
+    np.divide(numerator, denominator, out=out, where=denominator != 0)
+    return out
+
+
+def _change(values, previous_index):
+    """(current - previous) / |previous| with previous given as a column index per period (-1 = none)"""
+    previous_index = np.asarray(previous_index)
+    valid = previous_index >= 0
+    previous = np.full(values.shape, np.nan)
+    previous[:, valid] = values[:, previous_index[valid]]
+    out = np.full(values.shape, np.nan)
+    np.divide(values - previous, np.abs(previous), out=out,
+              where=~np.isnan(previous) & (previous != 0))
+    return out
+
+
+def _shift_month(period, months):
+    year, month = int(period[:4]), int(period[5:7])
+    total = year * 12 + (month - 1) + months
+    return f'{total // 12:04d}-{total % 12 + 1:02d}'
+
+
+def _fiscal_year(period, fiscal_start_month):
+    year, month = int(period[:4]), int(period[5:7])
+    return year if month >= fiscal_start_month else year - 1
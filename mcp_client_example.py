@@ -4,97 +4,18 @@ Example: How to call Freee MCP Server tools programmatically
 This shows how you can integrate MCP calls into your own applications.
 """
 
-import subprocess
-import json
-import os
-
-class FreeeMCPClient:
-    """Simple client for calling Freee MCP Server tools"""
-    
-    def __init__(self, mcp_server_path="/Users/kanekomasato/freee-mcp-scalar"):
-        self.mcp_server_path = mcp_server_path
-    
-    def call_tool(self, tool_name, arguments=None):
-        """Call an MCP tool and return the parsed result"""
-        
-        request = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "tools/call",
-            "params": {
-                "name": tool_name,
-                "arguments": arguments or {}
-            }
-        }
-        
-        try:
-            # Start the MCP server process
-            process = subprocess.Popen(
-                ['node', 'dist/index.js'],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                cwd=self.mcp_server_path
-            )
-            
-            # Send the request
-            input_data = json.dumps(request) + '\n'
-            stdout, stderr = process.communicate(input=input_data, timeout=30)
-            
-            # Parse the response
-            lines = stdout.strip().split('\n')
-            for line in lines:
-                if line.strip().startswith('{"result":'):
-                    response = json.loads(line)
-                    if 'result' in response and 'content' in response['result']:
-                        # Extract and parse the content
-                        content = response['result']['content'][0]['text']
-                        return json.loads(content)
-            
-            return None
-            
-        except Exception as e:
-            print(f"Error calling MCP tool {tool_name}: {e}")
-            return None
-    
-    def get_companies(self):
-        """Get list of companies"""
-        return self.call_tool("get_companies")
-    
-    def get_account_items(self, company_id, base_date=None):
-        """Get account items for a company"""
-        args = {"company_id": str(company_id)}
-        if base_date:
-            args["base_date"] = base_date
-        return self.call_tool("get_account_items", args)
-    
-    def get_partners(self, company_id, keyword=None, limit=None):
-        """Get partners for a company"""
-        args = {"company_id": str(company_id)}
-        if keyword:
-            args["keyword"] = keyword
-        if limit:
-            args["limit"] = limit
-        return self.call_tool("get_partners", args)
-    
-    def get_trial_pl(self, company_id, start_date, end_date):
-        """Get P&L trial balance"""
-        args = {
-            "company_id": str(company_id),
-            "start_date": start_date,
-            "end_date": end_date
-        }
-        return self.call_tool("get_trial_pl", args)
+from freee_mcp_client import FreeeMCPClient
 
 # Example usage
 def main():
     print("🤖 Freee MCP Client Example")
     print("=" * 40)
     
-    # Create MCP client
-    client = FreeeMCPClient()
-    
+    # Create MCP client (one server process for every call below)
+    with FreeeMCPClient() as client:
+        return run_examples(client)
+
+def run_examples(client):
     # Get companies
     print("📋 Getting companies...")
     companies_data = client.get_companies()
@@ -1,47 +1,95 @@
 import { FreeeConfig, FreeeAPIError, RateLimitError, AuthenticationError } from './types.js';
 import { FreeeAuthManager } from './auth.js';
+import { RequestPriority, RequestScheduler, getSharedScheduler, parseRetryAfter } from './request-scheduler.js';
+import { HttpPool, getSharedHttpPool } from './http-pool.js';
+import { CachedResource, ResponseCache, getSharedResponseCache } from './response-cache.js';
+import { TrialBalanceStatement, TrialBalanceStore, getSharedTrialBalanceStore } from './trial-balance-store.js';
+import { LIST_PAGE_SIZES, ListResource, PaginateOptions } from './pagination.js';
+import { RequestCoalescer, getSharedRequestCoalescer, normalizeRequestKey } from './request-coalescer.js';
+
+export interface FreeeAPIClientOptions {
+  priority?: RequestPriority;
+  maxRetries?: number;
+  scheduler?: RequestScheduler;
+  httpPool?: HttpPool;
+  responseCache?: ResponseCache;
+  trialBalanceStore?: TrialBalanceStore;
+  coalescer?: RequestCoalescer;
+}
+
+/**
+ * マスタデータ取得時のキャッシュ指定
+ */
+export interface CacheOptions {
+  bypassCache?: boolean;
+}
 
 export class FreeeAPIClient {
   private config: FreeeConfig;
   private authManager: FreeeAuthManager;
-  private baseDelay = 1000; // 1秒
-  private maxRetries = 3;
-
-  constructor(config: FreeeConfig) {
+  private scheduler: RequestScheduler;
+  private httpPool: HttpPool;
+  private responseCache: ResponseCache;
+  private trialBalanceStore: TrialBalanceStore;
+  private coalescer: RequestCoalescer;
+  private priority: RequestPriority;
+  private baseDelay = 1000; // 1秒（Retry-Afterがない場合の基準値）
+  private maxRetries: number;
+
+  constructor(config: FreeeConfig, options: FreeeAPIClientOptions = {}) {
     this.config = config;
     this.authManager = new FreeeAuthManager(config);
+    this.scheduler = options.scheduler || getSharedScheduler();
+    this.httpPool = options.httpPool || getSharedHttpPool();
+    this.responseCache = options.responseCache || getSharedResponseCache();
+    this.trialBalanceStore = options.trialBalanceStore || getSharedTrialBalanceStore();
+    this.coalescer = options.coalescer || getSharedRequestCoalescer();
+    this.priority = options.priority || 'interactive';
+    this.maxRetries = options.maxRetries ?? 5;
   }
 
   /**
-   * 認証付きAPIリクエスト（自動リトライ付き）
+   * 認証付きAPIリクエスト（共有スケジューラー・HTTPプール経由、自動リトライ付き）
    */
   async request<T = any>(
     endpoint: string,
     options: RequestInit = {},
     retryCount = 0
   ): Promise<T> {
+    const method = (options.method || 'GET').toUpperCase();
+    const companyId = extractCompanyId(endpoint, options.body);
+    // 既存の取引などを更新・削除する場合は、試算表の無効化範囲を決めるため変更前の発生日を取得しておく
+    const previousIssueDate = method !== 'GET' && retryCount === 0
+      ? await this.lookupIssueDateForWrite(endpoint, companyId)
+      : undefined;
+
     try {
       const accessToken = await this.authManager.getValidAccessToken();
       
-      const response = await fetch(`${this.config.apiUrl}${endpoint}`, {
-        ...options,
-        headers: {
-          'Authorization': `Bearer ${accessToken}`,
-          'Content-Type': 'application/json',
-          ...options.headers,
-        },
-      });
+      const response = await this.scheduler.schedule(
+        () => this.httpPool.fetch(`${this.config.apiUrl}${endpoint}`, {
+          ...options,
+          headers: {
+            'Authorization': `Bearer ${accessToken}`,
+            'Content-Type': 'application/json',
+            ...options.headers,
+          },
+        }),
+        { priority: this.priority, companyId }
+      );
 
-      // レート制限の処理
+      // レート制限の処理（スケジューラー全体を停止してから再投入）
       if (response.status === 429) {
         if (retryCount >= this.maxRetries) {
           throw new RateLimitError('Rate limit exceeded after max retries');
         }
 
-        const delay = this.baseDelay * Math.pow(2, retryCount);
-        console.log(`⏳ Rate limited. Retrying in ${delay}ms...`);
+        const retryAfter = parseRetryAfter(response.headers.get('Retry-After'))
+          ?? this.baseDelay * Math.pow(2, retryCount);
+        const delay = this.scheduler.backoff(retryAfter);
+        await response.body?.cancel().catch(() => undefined);
+        console.error(`⏳ Rate limited. Retrying in ${delay}ms...`);
         
-        await new Promise(resolve => setTimeout(resolve, delay));
         return this.request(endpoint, options, retryCount + 1);
       }
 
@@ -83,13 +131,44 @@ export class FreeeAPIClient {
         'NETWORK_ERROR',
         error
       );
+    } finally {
+      // 書き込みが反映されたかは失敗時も確定できないため、常に関連マスタを無効化
+      if (method !== 'GET' && retryCount === 0) {
+        this.coalescer.detachAll();
+        this.responseCache.invalidateForWrite(endpoint, companyId);
+        await this.invalidateTrialBalancesForWrite(endpoint, options.body, companyId, previousIssueDate);
+      }
     }
   }
 
+  /**
+   * 共有スケジューラー・HTTPプール・各キャッシュ・リクエスト集約の統計情報を取得
+   */
+  getStats() {
+    return {
+      scheduler: this.scheduler.getStats(),
+      http_pool: this.httpPool.getStats(),
+      response_cache: this.responseCache.getStats(),
+      trial_balance_store: this.trialBalanceStore.getStats(),
+      request_coalescer: this.coalescer.getStats()
+    };
+  }
+
   /**
    * GET リクエスト
+   * 同じURL・パラメータのGETが実行中なら、新たに送信せずその結果を共有する
    */
   async get<T = any>(endpoint: string, params?: Record<string, any>): Promise<T> {
+    return this.coalescer.run(
+      normalizeRequestKey('GET', `${this.config.apiUrl}${endpoint}`, params),
+      () => this.sendGet<T>(endpoint, params)
+    );
+  }
+
+  /**
+   * クエリ文字列を付けてGETを送信
+   */
+  private async sendGet<T>(endpoint: string, params?: Record<string, any>): Promise<T> {
     let url = endpoint;
     
     if (params) {
@@ -108,6 +187,104 @@ export class FreeeAPIClient {
     return this.request<T>(url, { method: 'GET' });
   }
 
+  /**
+   * キャッシュ付き GET リクエスト（マスタデータ用）
+   */
+  async getCached<T = any>(
+    resource: CachedResource,
+    endpoint: string,
+    params: Record<string, any> | undefined,
+    options: CacheOptions = {}
+  ): Promise<T> {
+    const key = `${endpoint}?${JSON.stringify(params || {})}`;
+    return this.responseCache.getOrLoad(
+      key,
+      { resource, companyId: params?.company_id },
+      () => this.get<T>(endpoint, params),
+      options
+    );
+  }
+
+  /**
+   * 試算表を取得（1か月ちょうどの締め済み期間はディスクキャッシュを利用）
+   */
+  async getTrialBalance<T = any>(
+    statement: TrialBalanceStatement,
+    companyId: string,
+    params: {
+      start_date: string;
+      end_date: string;
+      breakdown_display_type?: string;
+    },
+    options: CacheOptions = {}
+  ): Promise<T> {
+    const load = () => this.get<T>(`/api/1/reports/trial_${statement}`, { company_id: companyId, ...params });
+    const month = TrialBalanceStore.toSingleMonth(params.start_date, params.end_date);
+    if (!month) return load();
+
+    return this.trialBalanceStore.getOrLoad(
+      companyId,
+      statement,
+      month,
+      params.breakdown_display_type,
+      load,
+      options
+    );
+  }
+
+  /**
+   * 締め済み月の試算表キャッシュを削除
+   */
+  async invalidateTrialBalanceCache(companyId: string, year?: number, month?: number): Promise<number> {
+    return this.trialBalanceStore.invalidate(companyId, year, month);
+  }
+
+  /**
+   * 過去日付の取引・振替伝票・請求書を登録・更新・削除したら、その月以降の保存済み試算表を削除
+   * 既存のレコードは変更前と変更後の早い方の発生日から削除し、変更前の発生日が分からなければ事業所の全期間を削除
+   */
+  private async invalidateTrialBalancesForWrite(
+    endpoint: string,
+    body: BodyInit | null | undefined,
+    companyId: string | undefined,
+    previousIssueDate: string | undefined
+  ): Promise<void> {
+    const target = parseTrialBalanceWrite(endpoint);
+    if (!companyId || !target) return;
+
+    let issueDate: unknown;
+    if (typeof body === 'string') {
+      try {
+        issueDate = JSON.parse(body)?.issue_date;
+      } catch {
+        // JSON以外のボディ
+      }
+    }
+
+    const dates = [previousIssueDate, issueDate].filter(isIssueDate).sort();
+    if (target.id && !previousIssueDate) {
+      await this.trialBalanceStore.invalidate(companyId);
+    } else if (dates.length > 0) {
+      await this.trialBalanceStore.invalidateFrom(companyId, dates[0]);
+    }
+  }
+
+  /**
+   * 更新・削除対象のレコードの変更前の発生日を取得（取得できなければ undefined）
+   */
+  private async lookupIssueDateForWrite(endpoint: string, companyId: string | undefined): Promise<string | undefined> {
+    const target = parseTrialBalanceWrite(endpoint);
+    if (!companyId || !target?.id) return undefined;
+
+    try {
+      const response = await this.get(`/api/1/${target.resource}/${target.id}`, { company_id: companyId });
+      const issueDate = response?.[target.resource.replace(/s$/, '')]?.issue_date;
+      return isIssueDate(issueDate) ? issueDate : undefined;
+    } catch {
+      return undefined;
+    }
+  }
+
   /**
    * POST リクエスト
    */
@@ -140,15 +317,15 @@ export class FreeeAPIClient {
   /**
    * 事業所一覧を取得
    */
-  async getCompanies() {
-    return this.get('/api/1/companies');
+  async getCompanies(options: CacheOptions = {}) {
+    return this.getCached('companies', '/api/1/companies', undefined, options);
   }
 
   /**
    * 指定事業所の詳細を取得
    */
-  async getCompany(companyId: string) {
-    return this.get(`/api/1/companies/${companyId}`);
+  async getCompany(companyId: string, options: CacheOptions = {}) {
+    return this.getCached('companies', `/api/1/companies/${companyId}`, { company_id: companyId }, options);
   }
 
   /**
@@ -158,8 +335,8 @@ export class FreeeAPIClient {
     keyword?: string;
     offset?: number;
     limit?: number;
-  }) {
-    return this.get('/api/1/partners', { company_id: companyId, ...params });
+  }, options: CacheOptions = {}) {
+    return this.getCached('partners', '/api/1/partners', { company_id: companyId, ...params }, options);
   }
 
   /**
@@ -167,8 +344,8 @@ export class FreeeAPIClient {
    */
   async getAccountItems(companyId: string, params?: {
     base_date?: string;
-  }) {
-    return this.get('/api/1/account_items', { company_id: companyId, ...params });
+  }, options: CacheOptions = {}) {
+    return this.getCached('account_items', '/api/1/account_items', { company_id: companyId, ...params }, options);
   }
 
   /**
@@ -183,6 +360,8 @@ export class FreeeAPIClient {
     end_due_date?: string;
     type?: 'income' | 'expense';
     status?: string;
+    start_renew_date?: string;
+    end_renew_date?: string;
     offset?: number;
     limit?: number;
   }) {
@@ -287,8 +466,8 @@ export class FreeeAPIClient {
     start_date: string;
     end_date: string;
     breakdown_display_type?: 'partner' | 'item' | 'section' | 'tag';
-  }) {
-    return this.get('/api/1/reports/trial_pl', { company_id: companyId, ...params });
+  }, options: CacheOptions = {}) {
+    return this.getTrialBalance('pl', companyId, params, options);
   }
 
   /**
@@ -298,8 +477,8 @@ export class FreeeAPIClient {
     start_date: string;
     end_date: string;
     breakdown_display_type?: 'partner' | 'item' | 'section' | 'tag';
-  }) {
-    return this.get('/api/1/reports/trial_bs', { company_id: companyId, ...params });
+  }, options: CacheOptions = {}) {
+    return this.getTrialBalance('bs', companyId, params, options);
   }
 
   /**
@@ -319,8 +498,8 @@ export class FreeeAPIClient {
   /**
    * 税区分一覧を取得
    */
-  async getTaxes(companyId: string) {
-    return this.get('/api/1/taxes', { company_id: companyId });
+  async getTaxes(companyId: string, options: CacheOptions = {}) {
+    return this.getCached('taxes', '/api/1/taxes', { company_id: companyId }, options);
   }
 
   /**
@@ -328,8 +507,8 @@ export class FreeeAPIClient {
    */
   async getSegments(companyId: string, params?: {
     segment_tag?: '1' | '2' | '3';
-  }) {
-    return this.get('/api/1/segments', { company_id: companyId, ...params });
+  }, options: CacheOptions = {}) {
+    return this.getCached('segments', '/api/1/segments', { company_id: companyId, ...params }, options);
   }
 
   /**
@@ -339,8 +518,8 @@ export class FreeeAPIClient {
     keyword?: string;
     offset?: number;
     limit?: number;
-  }) {
-    return this.get('/api/1/items', { company_id: companyId, ...params });
+  }, options: CacheOptions = {}) {
+    return this.getCached('items', '/api/1/items', { company_id: companyId, ...params }, options);
   }
 
   /**
@@ -352,4 +531,143 @@ export class FreeeAPIClient {
   }) {
     return this.get('/api/1/banks', params);
   }
-}
\ No newline at end of file
+
+  // ページング（全件取得）
+
+  /**
+   * 一覧APIをページ単位で全件取得する非同期イテレーター
+   * 現在のページを呼び出し側が処理している間に次のページを先読みする
+   */
+  async *paginate<T = any>(
+    resource: ListResource,
+    params: Record<string, any>,
+    options: PaginateOptions = {}
+  ): AsyncGenerator<T[]> {
+    const pageSize = Math.min(options.pageSize ?? LIST_PAGE_SIZES[resource], LIST_PAGE_SIZES[resource]);
+    const maxRows = options.maxRows ?? Infinity;
+
+    const fetchPage = (offset: number) => {
+      const limit = Math.min(pageSize, maxRows - offset);
+      const page = this.get(`/api/1/${resource}`, { ...params, offset, limit })
+        .then(response => ({ rows: (response?.[resource] || []) as T[], limit }));
+      // 呼び出し側が前のページを処理している間に先読みが失敗しても unhandledRejection にしない
+      // （失敗は元の promise を await した時点で呼び出し側に伝わる）
+      page.catch(() => undefined);
+      return page;
+    };
+
+    let fetched = 0;
+    let next: Promise<{ rows: T[]; limit: number }> | null = fetchPage(0);
+
+    while (next) {
+      const { rows, limit } = await next;
+      fetched += rows.length;
+
+      // 最終ページでなければ、このページを返す前に次のページを要求しておく
+      next = rows.length === limit && fetched < maxRows ? fetchPage(fetched) : null;
+
+      if (rows.length > 0) {
+        yield rows;
+      }
+    }
+  }
+
+  /**
+   * 取引を全件取得（ページ単位）
+   */
+  iterateDeals(companyId: string, params: {
+    partner_id?: string;
+    account_item_id?: string;
+    start_issue_date?: string;
+    end_issue_date?: string;
+    start_due_date?: string;
+    end_due_date?: string;
+    type?: 'income' | 'expense';
+    status?: string;
+    start_renew_date?: string;
+    end_renew_date?: string;
+  } = {}, options: PaginateOptions = {}) {
+    return this.paginate('deals', { company_id: companyId, ...params }, options);
+  }
+
+  /**
+   * 取引先を全件取得（ページ単位）
+   */
+  iteratePartners(companyId: string, params: { keyword?: string } = {}, options: PaginateOptions = {}) {
+    return this.paginate('partners', { company_id: companyId, ...params }, options);
+  }
+
+  /**
+   * 請求書を全件取得（ページ単位）
+   */
+  iterateInvoices(companyId: string, params: {
+    partner_id?: string;
+    issue_date_start?: string;
+    issue_date_end?: string;
+    due_date_start?: string;
+    due_date_end?: string;
+    invoice_status?: string;
+  } = {}, options: PaginateOptions = {}) {
+    return this.paginate('invoices', { company_id: companyId, ...params }, options);
+  }
+
+  /**
+   * 振替伝票を全件取得（ページ単位）
+   */
+  iterateManualJournals(companyId: string, params: {
+    start_issue_date?: string;
+    end_issue_date?: string;
+    entry_side?: 'debit' | 'credit';
+  } = {}, options: PaginateOptions = {}) {
+    return this.paginate('manual_journals', { company_id: companyId, ...params }, options);
+  }
+
+  /**
+   * 品目を全件取得（ページ単位）
+   */
+  iterateItems(companyId: string, params: { keyword?: string } = {}, options: PaginateOptions = {}) {
+    return this.paginate('items', { company_id: companyId, ...params }, options);
+  }
+
+  /**
+   * 経費申請を全件取得（ページ単位）
+   */
+  iterateExpenseApplications(companyId: string, params: {
+    start_application_date?: string;
+    end_application_date?: string;
+    applicant_id?: string;
+    application_status?: string;
+  } = {}, options: PaginateOptions = {}) {
+    return this.paginate('expense_applications', { company_id: companyId, ...params }, options);
+  }
+}
+
+/**
+ * リクエストの対象事業所IDを取得（クエリまたはJSONボディの company_id）
+ */
+/**
+ * 試算表に影響する書き込みの対象（取引・振替伝票・請求書と、更新・削除時のレコードID）
+ */
+function parseTrialBalanceWrite(endpoint: string): { resource: string; id?: string } | undefined {
+  const match = endpoint.match(/^\/api\/1\/(deals|manual_journals|invoices)(?:\/(\d+))?(?:[/?]|$)/);
+  return match ? { resource: match[1], id: match[2] } : undefined;
+}
+
+function isIssueDate(value: unknown): value is string {
+  return typeof value === 'string' && /^\d{4}-\d{2}/.test(value);
+}
+
+function extractCompanyId(endpoint: string, body?: BodyInit | null): string | undefined {
+  const match = endpoint.match(/[?&]company_id=([^&]+)/);
+  if (match) return decodeURIComponent(match[1]);
+
+  if (typeof body === 'string') {
+    try {
+      const parsed = JSON.parse(body);
+      if (parsed?.company_id !== undefined) return String(parsed.company_id);
+    } catch {
+      // JSON以外のボディ
+    }
+  }
+  return undefined;
+}
@@ -0,0 +1,141 @@
+/**
+ * Arrow IPC（ファイル形式）出力
+ * エクスポートを列ごとの型（整数・小数・日付・文字列）付きで書き出し、
+ * Python側でメモリマップしてそのまま配列として読めるようにする（freee_mcp_client/columnar.py）
+ *
+ * 行は列ごとの配列に蓄え、close() で1つのテーブルとして指定されたパスに書き込む。
+ * 書きかけのファイルを見せない置き換えは呼び出し側（DataExporter.writePartition）が一時ファイルとrenameで行う。
+ */
+
+import * as fs from 'fs';
+import type * as Arrow from 'apache-arrow';
+import type { CsvValue } from './csv-writer.js';
+
+/**
+ * 列の型
+ * - int64: 金額・ID（空文字はnull）
+ * - float64: 構成比など
+ * - date: YYYY-MM-DD（date32）
+ * - category: 繰り返しの多い文字列（辞書エンコード）
+ * - utf8: その他の文字列
+ */
+export type ArrowColumnType = 'int64' | 'float64' | 'date' | 'category' | 'utf8';
+
+export interface ExportColumn {
+  name: string;
+  type: ArrowColumnType;
+}
+
+let arrowModule: Promise<typeof Arrow> | null = null;
+
+/**
+ * apache-arrow を読み込む（Arrow形式で出力するときだけ読み込む）
+ */
+function loadArrow(): Promise<typeof Arrow> {
+  if (!arrowModule) {
+    arrowModule = import('apache-arrow').catch((error) => {
+      arrowModule = null;
+      throw new Error(`apache-arrow を読み込めません。npm install を実行してください: ${error}`);
+    });
+  }
+  return arrowModule;
+}
+
+export class ArrowWriter {
+  readonly path: string;
+  private columns: readonly ExportColumn[];
+  private values: CsvValue[][];
+  private rowCount = 0;
+
+  private constructor(filepath: string, columns: readonly ExportColumn[]) {
+    this.path = filepath;
+    this.columns = columns;
+    this.values = columns.map(() => []);
+  }
+
+  /**
+   * 書き込み先を開く
+   */
+  static open(filepath: string, columns: readonly ExportColumn[]): ArrowWriter {
+    return new ArrowWriter(filepath, columns);
+  }
+
+  get rows(): number {
+    return this.rowCount;
+  }
+
+  get failed(): boolean {
+    return false;
+  }
+
+  /**
+   * 1行を追加（列の順序は open() に渡した列定義と同じ）
+   */
+  async writeRow(row: readonly CsvValue[]): Promise<void> {
+    for (let index = 0; index < this.columns.length; index++) {
+      this.values[index].push(row[index]);
+    }
+    this.rowCount++;
+  }
+
+  async writeRows(rows: Iterable<readonly CsvValue[]>): Promise<void> {
+    for (const row of rows) {
+      await this.writeRow(row);
+    }
+  }
+
+  /**
+   * テーブルを組み立ててファイルに書き込む
+   */
+  async close(): Promise<{ path: string; rows: number; bytes: number }> {
+    const arrow = await loadArrow();
+
+    const vectors: Record<string, Arrow.Vector> = {};
+    this.columns.forEach((column, index) => {
+      vectors[column.name] = toVector(arrow, column.type, this.values[index]);
+      this.values[index] = [];
+    });
+    const bytes = arrow.tableToIPC(new arrow.Table(vectors), 'file');
+
+    fs.writeFileSync(this.path, bytes);
+    return { path: this.path, rows: this.rowCount, bytes: bytes.byteLength };
+  }
+
+  async abort(): Promise<void> {
+    this.values = this.columns.map(() => []);
+  }
+}
+
+// Private helpers
+
+function toVector(arrow: typeof Arrow, type: ArrowColumnType, values: CsvValue[]): Arrow.Vector {
+  const isEmpty = (value: CsvValue) => value === null || value === undefined || value === '';
+
+  switch (type) {
+    case 'int64':
+      return arrow.vectorFromArray(
+        values.map(value => isEmpty(value) ? null : BigInt(Math.round(Number(value)))),
+        new arrow.Int64()
+      );
+    case 'float64':
+      return arrow.vectorFromArray(
+        values.map(value => isEmpty(value) ? null : Number(value)),
+        new arrow.Float64()
+      );
+    case 'date':
+      return arrow.vectorFromArray(
+        values.map(value => isEmpty(value) ? null : new Date(`${value}T00:00:00Z`)),
+        new arrow.DateDay()
+      );
+    case 'category':
+      return arrow.vectorFromArray(
+        values.map(value => isEmpty(value) ? null : String(value)),
+        new arrow.Dictionary(new arrow.Utf8(), new arrow.Int32())
+      );
+    case 'utf8':
+      return arrow.vectorFromArray(
+        values.map(value => isEmpty(value) ? null : String(value)),
+        new arrow.Utf8()
+      );
+  }
+}
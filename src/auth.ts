@@ -4,18 +4,40 @@ import { createServer } from 'http';
 import { URL } from 'url';
 import { randomBytes, createHash } from 'crypto';
 import fs from 'fs/promises';
+import { watch, type FSWatcher } from 'fs';
 import path from 'path';
 import os from 'os';
 import { FreeeConfig, Token, TokenSchema, AuthenticationError } from './types.js';
 
+// トークンの有効期限チェック（5分前にリフレッシュ）
+const REFRESH_BUFFER_MS = 5 * 60 * 1000;
+
+/**
+ * トークンファイルごとのメモリキャッシュ
+ * 同じプロセス内の全FreeeAuthManagerで共有する
+ */
+interface TokenCacheState {
+  tokens: Token | null;
+  loaded: boolean;
+  dirty: boolean;
+  watcher: FSWatcher | null;
+  mtimeMs: number | null; // fs.watchが使えない環境ではmtimeで変更を検知
+  refreshPromise: Promise<Token> | null;
+  refreshTimer: NodeJS.Timeout | null;
+}
+
+const tokenCache = new Map<string, TokenCacheState>();
+
 export class FreeeAuthManager {
   private config: FreeeConfig;
   private tokenPath: string;
   private codeVerifier: string | null = null;
+  private backgroundRefresh: boolean;
 
-  constructor(config: FreeeConfig) {
+  constructor(config: FreeeConfig, options: { backgroundRefresh?: boolean } = {}) {
     this.config = config;
     this.tokenPath = path.join(os.homedir(), '.config', 'freee-mcp', 'tokens.json');
+    this.backgroundRefresh = options.backgroundRefresh ?? process.env.FREEE_TOKEN_BACKGROUND_REFRESH === '1';
   }
 
   /**
@@ -68,21 +90,17 @@ export class FreeeAuthManager {
 
   /**
    * 有効なアクセストークンを取得（自動リフレッシュ付き）
+   * トークンはメモリに保持し、ファイルが変更されたときのみ再読み込みする
    */
   async getValidAccessToken(): Promise<string> {
-    let tokens = await this.loadTokens();
+    let tokens = await this.getCachedTokens();
     
     if (!tokens) {
       throw new AuthenticationError('No tokens found. Please authenticate first.');
     }
 
-    // トークンの有効期限チェック（5分前にリフレッシュ）
-    const bufferTime = 5 * 60 * 1000; // 5分
-    const expiresAt = tokens.expires_at || (Date.now() + tokens.expires_in * 1000);
-    
-    if (Date.now() + bufferTime >= expiresAt) {
-      console.log('🔄 Refreshing access token...');
-      tokens = await this.refreshToken(tokens.refresh_token);
+    if (this.needsRefresh(tokens)) {
+      tokens = await this.refreshShared();
     }
 
     return tokens.access_token;
@@ -117,7 +135,7 @@ export class FreeeAuthManager {
     });
 
     await this.saveTokens(tokens);
-    console.log('✅ Token refreshed successfully');
+    console.error('✅ Token refreshed successfully');
     
     return tokens;
   }
@@ -146,6 +164,7 @@ export class FreeeAuthManager {
     }
 
     // ローカルトークンを削除
+    this.resetCache();
     try {
       await fs.unlink(this.tokenPath);
       console.log('✅ Tokens revoked and removed locally');
@@ -156,6 +175,145 @@ export class FreeeAuthManager {
 
   // Private methods
 
+  private cacheState(): TokenCacheState {
+    let state = tokenCache.get(this.tokenPath);
+    if (!state) {
+      state = {
+        tokens: null,
+        loaded: false,
+        dirty: false,
+        watcher: null,
+        mtimeMs: null,
+        refreshPromise: null,
+        refreshTimer: null
+      };
+      tokenCache.set(this.tokenPath, state);
+    }
+    return state;
+  }
+
+  /**
+   * メモリ上のトークンを取得（未読み込み・ファイル変更時のみディスクから読む）
+   */
+  private async getCachedTokens(): Promise<Token | null> {
+    const state = this.cacheState();
+
+    if (state.loaded && !state.dirty && !state.watcher) {
+      // 監視できない環境ではmtimeを比較
+      const mtimeMs = await this.statMtime();
+      if (mtimeMs !== state.mtimeMs) state.dirty = true;
+    }
+
+    if (!state.loaded || state.dirty) {
+      state.dirty = false;
+      state.mtimeMs = await this.statMtime();
+      state.tokens = await this.loadTokens();
+      state.loaded = true;
+      this.watchTokenFile(state);
+      this.scheduleBackgroundRefresh(state);
+    }
+
+    return state.tokens;
+  }
+
+  private needsRefresh(tokens: Token): boolean {
+    const expiresAt = tokens.expires_at || (Date.now() + tokens.expires_in * 1000);
+    return Date.now() + REFRESH_BUFFER_MS >= expiresAt;
+  }
+
+  /**
+   * シングルフライトでトークンをリフレッシュ（同時に待つ全リクエストで結果を共有）
+   */
+  private refreshShared(): Promise<Token> {
+    const state = this.cacheState();
+    if (state.refreshPromise) return state.refreshPromise;
+
+    state.refreshPromise = (async () => {
+      // 別プロセスが既にリフレッシュ済みならそのトークンを使う
+      const onDisk = await this.loadTokens();
+      if (onDisk && !this.needsRefresh(onDisk)) {
+        state.tokens = onDisk;
+        state.loaded = true;
+        return onDisk;
+      }
+
+      const current = onDisk || state.tokens;
+      if (!current) {
+        throw new AuthenticationError('No tokens found. Please authenticate first.');
+      }
+
+      console.error('🔄 Refreshing access token...');
+      return this.refreshToken(current.refresh_token);
+    })().finally(() => {
+      state.refreshPromise = null;
+    });
+
+    return state.refreshPromise;
+  }
+
+  /**
+   * トークンファイルの変更を監視（変更時に次回アクセスで再読み込み）
+   */
+  private watchTokenFile(state: TokenCacheState): void {
+    if (state.watcher) return;
+
+    const fileName = path.basename(this.tokenPath);
+    try {
+      // ファイルの置き換えにも対応するためディレクトリを監視
+      state.watcher = watch(path.dirname(this.tokenPath), (_event, changed) => {
+        if (!changed || changed.toString() === fileName) {
+          state.dirty = true;
+        }
+      });
+      state.watcher.on('error', () => {
+        state.watcher?.close();
+        state.watcher = null;
+      });
+      state.watcher.unref();
+    } catch {
+      state.watcher = null;
+    }
+  }
+
+  /**
+   * 有効期限前にバックグラウンドでリフレッシュ（オプション）
+   */
+  private scheduleBackgroundRefresh(state: TokenCacheState): void {
+    if (!this.backgroundRefresh || !state.tokens) return;
+
+    if (state.refreshTimer) {
+      clearTimeout(state.refreshTimer);
+    }
+
+    const expiresAt = state.tokens.expires_at || (Date.now() + state.tokens.expires_in * 1000);
+    const delay = Math.max(0, expiresAt - REFRESH_BUFFER_MS - Date.now());
+
+    state.refreshTimer = setTimeout(() => {
+      state.refreshTimer = null;
+      this.refreshShared()
+        .then(() => this.scheduleBackgroundRefresh(state))
+        .catch(error => console.error('⚠️ Background token refresh failed:', error.message));
+    }, delay);
+    state.refreshTimer.unref();
+  }
+
+  private async statMtime(): Promise<number | null> {
+    try {
+      return (await fs.stat(this.tokenPath)).mtimeMs;
+    } catch {
+      return null;
+    }
+  }
+
+  private resetCache(): void {
+    const state = tokenCache.get(this.tokenPath);
+    if (!state) return;
+
+    state.watcher?.close();
+    if (state.refreshTimer) clearTimeout(state.refreshTimer);
+    tokenCache.delete(this.tokenPath);
+  }
+
   private generateCodeVerifier(): string {
     return randomBytes(32).toString('base64url');
   }
@@ -309,6 +467,15 @@ export class FreeeAuthManager {
     const dir = path.dirname(this.tokenPath);
     await fs.mkdir(dir, { recursive: true });
     await fs.writeFile(this.tokenPath, JSON.stringify(tokens, null, 2));
+
+    // 書き込んだトークンをそのままメモリに反映
+    const state = this.cacheState();
+    state.tokens = tokens;
+    state.loaded = true;
+    state.dirty = false;
+    state.mtimeMs = await this.statMtime();
+    this.watchTokenFile(state);
+    this.scheduleBackgroundRefresh(state);
   }
 }
 
@@ -0,0 +1,92 @@
+/**
+ * 同時実行数を制限した非同期処理ユーティリティ
+ */
+
+/**
+ * 同時実行数を制限して各要素を処理（結果は入力順、失敗は個別に返す）
+ */
+export async function mapSettledWithConcurrency<T, R>(
+  items: readonly T[],
+  limit: number,
+  fn: (item: T, index: number) => Promise<R>
+): Promise<PromiseSettledResult<R>[]> {
+  const results: PromiseSettledResult<R>[] = new Array(items.length);
+  let nextIndex = 0;
+
+  const worker = async () => {
+    while (nextIndex < items.length) {
+      const index = nextIndex++;
+      try {
+        results[index] = { status: 'fulfilled', value: await fn(items[index], index) };
+      } catch (reason) {
+        results[index] = { status: 'rejected', reason };
+      }
+    }
+  };
+
+  const workerCount = Math.max(1, Math.min(limit, items.length));
+  await Promise.all(Array.from({ length: workerCount }, worker));
+  return results;
+}
+
+/**
+ * 同時実行数を制限して各要素を処理し、失敗した要素のみ再試行
+ * 再試行後も失敗した要素があればエラーを投げる
+ */
+export async function mapWithConcurrencyAndRetry<T, R>(
+  items: readonly T[],
+  fn: (item: T, index: number) => Promise<R>,
+  options: {
+    concurrency?: number;
+    maxRetries?: number;
+    retryDelay?: number;
+    describe?: (item: T) => string;
+  } = {}
+): Promise<R[]> {
+  const concurrency = options.concurrency ?? 4;
+  const maxRetries = options.maxRetries ?? 2;
+  const retryDelay = options.retryDelay ?? 1000;
+
+  const results: R[] = new Array(items.length);
+  let pending = items.map((_, index) => index);
+  let lastErrors = new Map<number, unknown>();
+
+  for (let attempt = 0; attempt <= maxRetries && pending.length > 0; attempt++) {
+    if (attempt > 0) {
+      await new Promise(resolve => setTimeout(resolve, retryDelay * attempt));
+    }
+
+    const settled = await mapSettledWithConcurrency(
+      pending,
+      concurrency,
+      index => fn(items[index], index)
+    );
+
+    const failed: number[] = [];
+    lastErrors = new Map();
+    settled.forEach((outcome, k) => {
+      const index = pending[k];
+      if (outcome.status === 'fulfilled') {
+        results[index] = outcome.value;
+      } else {
+        failed.push(index);
+        lastErrors.set(index, outcome.reason);
+      }
+    });
+    pending = failed;
+  }
+
+  if (pending.length > 0) {
+    const describe = options.describe ?? ((item: T) => String(item));
+    const details = pending
+      .map(index => `${describe(items[index])}: ${errorMessage(lastErrors.get(index))}`)
+      .join(', ');
+    throw new Error(`${pending.length}件の処理が再試行後も失敗しました (${details})`);
+  }
+
+  return results;
+}
+
+function errorMessage(error: unknown): string {
+  return error instanceof Error ? error.message : String(error);
+}
@@ -0,0 +1,135 @@
+/**
+ * ストリーミングCSV出力
+ * 行ごとにRFC 4180形式（必要な値のみダブルクォートで囲み、改行はCRLF）でファイルへ書き込む。
+ * 書き込みストリームのバッファが一杯になれば drain を待つため、行数に関わらずメモリ使用量は一定。
+ */
+
+import * as fs from 'fs';
+import * as zlib from 'zlib';
+import { once } from 'events';
+import { Writable } from 'stream';
+import { finished, pipeline } from 'stream/promises';
+
+export type CsvValue = string | number | boolean | null | undefined;
+
+export interface CsvWriterOptions {
+  gzip?: boolean;        // gzip圧縮して書き込む（ファイル名は呼び出し側で .gz を付ける）
+  bom?: boolean;         // 先頭にUTF-8 BOMを付ける（Excelで開く場合）
+}
+
+// クォートが必要な文字（区切り文字・ダブルクォート・改行）
+const NEEDS_QUOTE = /[",\r\n]/;
+
+/**
+ * 1つの値をCSVのフィールドに変換
+ */
+export function formatCsvField(value: CsvValue): string {
+  if (value === null || value === undefined) return '';
+  const text = String(value);
+  return NEEDS_QUOTE.test(text) ? `"${text.replace(/"/g, '""')}"` : text;
+}
+
+/**
+ * 1行をCSVの行（CRLF付き）に変換
+ */
+export function formatCsvRow(row: readonly CsvValue[]): string {
+  return row.map(formatCsvField).join(',') + '\r\n';
+}
+
+export class CsvWriter {
+  readonly path: string;
+  private input: Writable;
+  private done: Promise<void>;
+  private failure: Error | null = null;
+  private rowCount = 0;
+
+  private constructor(filepath: string, options: CsvWriterOptions) {
+    this.path = filepath;
+    const file = fs.createWriteStream(filepath);
+
+    if (options.gzip) {
+      const gzip = zlib.createGzip();
+      this.input = gzip;
+      this.done = pipeline(gzip, file);
+    } else {
+      this.input = file;
+      this.done = finished(file);
+    }
+    this.done.catch((error) => {
+      this.failure = error;
+    });
+    this.input.on('error', (error) => {
+      this.failure = error;
+    });
+
+    if (options.bom) {
+      this.input.write('\uFEFF');
+    }
+  }
+
+  /**
+   * 書き込み先を開く
+   */
+  static open(filepath: string, options: CsvWriterOptions = {}): CsvWriter {
+    return new CsvWriter(filepath, options);
+  }
+
+  get rows(): number {
+    return this.rowCount;
+  }
+
+  /**
+   * 書き込みエラーが発生したか（呼び出し側でAPIエラーと区別するため）
+   */
+  get failed(): boolean {
+    return this.failure !== null;
+  }
+
+  /**
+   * 1行を書き込む（バッファが一杯なら書き出されるまで待つ）
+   */
+  async writeRow(row: readonly CsvValue[]): Promise<void> {
+    this.throwIfFailed();
+    this.rowCount++;
+    if (!this.input.write(formatCsvRow(row))) {
+      await Promise.race([once(this.input, 'drain'), this.done]);
+      this.throwIfFailed();
+    }
+  }
+
+  /**
+   * 複数行を順に書き込む
+   */
+  async writeRows(rows: Iterable<readonly CsvValue[]>): Promise<void> {
+    for (const row of rows) {
+      await this.writeRow(row);
+    }
+  }
+
+  /**
+   * 書き込みを完了してファイルを閉じる
+   */
+  async close(): Promise<{ path: string; rows: number; bytes: number }> {
+    this.throwIfFailed();
+    this.input.end();
+    await this.done;
+    return { path: this.path, rows: this.rowCount, bytes: fs.statSync(this.path).size };
+  }
+
+  /**
+   * 書き込みを中止し、書きかけのファイルを削除
+   */
+  async abort(): Promise<void> {
+    this.input.destroy();
+    await this.done.catch(() => undefined);
+    fs.rmSync(this.path, { force: true });
+  }
+
+  // Private methods
+
+  private throwIfFailed(): void {
+    if (this.failure) {
+      throw new Error(`CSV書き込みエラー (${this.path}): ${this.failure.message}`);
+    }
+  }
+}
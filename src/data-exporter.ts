@@ -1,9 +1,94 @@
 import { z } from 'zod';
 import { FreeeAPIClient } from './api-client.js';
 import { FreeeConfig } from './types.js';
+import { CsvValue, CsvWriter } from './csv-writer.js';
+import { ArrowWriter, ExportColumn } from './arrow-writer.js';
+import { TaskGraph } from './task-graph.js';
+import { ExportManifest, hashRows } from './export-manifest.js';
+import { mapSettledWithConcurrency } from './concurrency.js';
+import { getMonthRanges } from './periods.js';
 import * as fs from 'fs';
 import * as path from 'path';
 
+// 試算表取得の同時実行数（デフォルト、1ヶ月あたりPL・BSの2リクエスト）
+const DEFAULT_FETCH_CONCURRENCY = 4;
+
+interface ExportOptions {
+  format: 'csv' | 'arrow';
+  gzip: boolean;
+}
+
+type TableWriter = CsvWriter | ArrowWriter;
+
+// 月別試算表パーティションのディレクトリ（事業所ディレクトリ内）
+const TRIAL_BALANCE_DIR = 'trial_balance';
+
+interface PartitionWrite {
+  file: string;       // 事業所ディレクトリからの相対パス
+  written: boolean;   // false: 内容が前回と同じため書き直していない
+}
+
+/**
+ * パーティションの書き込みエラー（APIの取得エラーと区別する）
+ */
+class PartitionWriteError extends Error {}
+
+// 出力ファイルの種類ごとの列定義（CSVのヘッダーとArrowの列名・型）
+const ACCOUNT_ITEM_COLUMNS: ExportColumn[] = [
+  { name: '勘定科目ID', type: 'int64' },
+  { name: '勘定科目名', type: 'utf8' },
+  { name: '勘定科目コード', type: 'utf8' },
+  { name: '大分類', type: 'category' },
+  { name: '大分類2', type: 'category' },
+  { name: '中分類', type: 'category' },
+  { name: '小分類', type: 'category' },
+  { name: '勘定科目カテゴリ', type: 'category' },
+  { name: 'カテゴリID', type: 'int64' },
+  { name: 'グループ名', type: 'category' },
+  { name: '税区分', type: 'int64' },
+  { name: '作成日時', type: 'utf8' },
+  { name: '更新日時', type: 'utf8' }
+];
+
+const PARTNER_COLUMNS: ExportColumn[] = [
+  { name: '取引先ID', type: 'int64' },
+  { name: '取引先名', type: 'utf8' },
+  { name: '取引先コード', type: 'utf8' },
+  { name: '取引先カテゴリ', type: 'int64' },
+  { name: '郵便番号', type: 'utf8' },
+  { name: '住所', type: 'utf8' },
+  { name: '電話番号', type: 'utf8' },
+  { name: 'FAX番号', type: 'utf8' },
+  { name: 'メールアドレス', type: 'utf8' },
+  { name: '代表者名', type: 'utf8' },
+  { name: '敬称', type: 'utf8' },
+  { name: '振込先口座名', type: 'utf8' },
+  { name: '支払条件ID', type: 'int64' },
+  { name: '作成日時', type: 'utf8' },
+  { name: '更新日時', type: 'utf8' }
+];
+
+const TRIAL_BALANCE_COLUMNS: ExportColumn[] = [
+  { name: '開始日', type: 'date' },
+  { name: '終了日', type: 'date' },
+  { name: '勘定科目名', type: 'category' },
+  { name: '勘定科目ID', type: 'int64' },
+  { name: '勘定科目カテゴリ', type: 'category' },
+  { name: '期首残高', type: 'int64' },
+  { name: '借方金額', type: 'int64' },
+  { name: '貸方金額', type: 'int64' },
+  { name: '期末残高', type: 'int64' },
+  { name: '構成比', type: 'float64' },
+  { name: '内訳名', type: 'category' },
+  { name: '内訳ID', type: 'int64' },
+  { name: '内訳期首残高', type: 'int64' },
+  { name: '内訳借方金額', type: 'int64' },
+  { name: '内訳貸方金額', type: 'int64' },
+  { name: '内訳期末残高', type: 'int64' },
+  { name: '内訳構成比', type: 'float64' },
+  { name: '試算表タイプ', type: 'category' }
+];
+
 /**
  * データエクスポート・更新ツール
  * freeeのマスタデータと試算表データを最新状態で保持
@@ -13,12 +98,15 @@ export class DataExporter {
   private exportDataDir: string;
 
   constructor(config: FreeeConfig) {
-    this.apiClient = new FreeeAPIClient(config);
+    // 一括エクスポートは対話的なツール呼び出しより低い優先度で実行
+    this.apiClient = new FreeeAPIClient(config, { priority: 'bulk' });
     this.exportDataDir = path.join(process.cwd(), 'data_analysis', 'exported_data');
   }
 
   /**
    * 全データを更新
+   * 事業所ごとのディレクトリに、マスタと月別の試算表をパーティションとして出力する
+   * 内容が前回と同じパーティションは書き直さない（manifest.json のハッシュで照合）
    */
   async updateAllData(params: {
     company_id: string;
@@ -27,55 +115,98 @@ export class DataExporter {
     include_partners?: boolean;
     include_account_items?: boolean;
     include_trial_balance?: boolean;
+    format?: 'csv' | 'arrow';
+    gzip?: boolean;
+    concurrency?: number;
   }) {
     try {
+      const exportOptions: ExportOptions = { format: params.format || 'csv', gzip: params.gzip === true };
       const results = {
         updated_files: [] as string[],
+        unchanged_files: [] as string[],
         removed_files: [] as string[],
         statistics: {} as any
       };
 
       // 出力ディレクトリを確保
-      if (!fs.existsSync(this.exportDataDir)) {
-        fs.mkdirSync(this.exportDataDir, { recursive: true });
-      }
+      const companyDir = this.companyDir(params.company_id);
+      fs.mkdirSync(path.join(companyDir, TRIAL_BALANCE_DIR), { recursive: true });
+
+      const manifest = ExportManifest.load(companyDir, params.company_id);
+      const includeAccountItems = params.include_account_items !== false;
+      const includePartners = params.include_partners !== false;
+      const includeTrialBalance = params.include_trial_balance !== false;
 
-      const today = new Date().toISOString().slice(0, 10).replace(/-/g, '');
+      // マスタは一度だけ取得して書き出しと試算表の勘定科目マッピングで共有し、
+      // 互いに依存しない取得・書き出しは並行して実行する
+      const graph = new TaskGraph();
+
+      if (includeAccountItems || includeTrialBalance) {
+        graph.add('fetch_account_items', [], () => this.apiClient.getAccountItems(params.company_id));
+      }
 
       // 1. 勘定科目マスタを更新
-      if (params.include_account_items !== false) {
-        const accountFile = await this.updateAccountItems(params.company_id, today);
-        results.updated_files.push(accountFile);
+      if (includeAccountItems) {
+        graph.add('write_account_items', ['fetch_account_items'], async ({ fetch_account_items }) => [
+          await this.writePartition(manifest, 'account_items', ACCOUNT_ITEM_COLUMNS,
+            Array.from(this.accountItemRows(fetch_account_items)), exportOptions)
+        ]);
       }
 
       // 2. 取引先マスタを更新
-      if (params.include_partners !== false) {
-        const partnersFile = await this.updatePartners(params.company_id, today);
-        results.updated_files.push(partnersFile);
+      if (includePartners) {
+        graph.add('fetch_partners', [], () => this.fetchAllPartners(params.company_id));
+        graph.add('write_partners', ['fetch_partners'], async ({ fetch_partners }) => [
+          await this.writePartition(manifest, 'partners', PARTNER_COLUMNS,
+            Array.from(this.partnerRows(fetch_partners)), exportOptions)
+        ]);
       }
 
       // 3. 試算表データを更新
-      if (params.include_trial_balance !== false) {
-        const trialBalanceFile = await this.updateTrialBalance(
-          params.company_id,
-          today,
-          params.start_year || 2024,
-          params.start_month || 1
-        );
-        results.updated_files.push(trialBalanceFile);
+      if (includeTrialBalance) {
+        graph.add('trial_balance', ['fetch_account_items'], ({ fetch_account_items }) =>
+          this.updateTrialBalance(
+            params.company_id,
+            manifest,
+            fetch_account_items,
+            params.start_year || 2024,
+            params.start_month || 1,
+            exportOptions,
+            params.concurrency
+          ));
+      }
+
+      let run;
+      try {
+        run = await graph.run();
+      } finally {
+        // 一部が失敗しても、書き出し済みのパーティションは記録する
+        manifest.save();
+      }
+
+      for (const task of ['write_account_items', 'write_partners', 'trial_balance']) {
+        for (const outcome of (run.results[task] || []) as PartitionWrite[]) {
+          (outcome.written ? results.updated_files : results.unchanged_files).push(outcome.file);
+        }
       }
 
-      // 4. 古いファイルを削除
-      results.removed_files = this.cleanupOldFiles(today);
+      // 4. 旧形式（日付付きの全件ファイル）を削除
+      results.removed_files = this.cleanupOldFiles();
 
       // 5. 統計情報を収集
-      results.statistics = this.getDataStatistics();
+      results.statistics = {
+        ...this.getDataStatistics(manifest),
+        written_partitions: results.updated_files.length,
+        unchanged_partitions: results.unchanged_files.length,
+        total_ms: run.total_ms,
+        stages: run.timings
+      };
 
       return {
         success: true,
         message: "データの更新が完了しました",
         results,
-        export_directory: this.exportDataDir
+        export_directory: companyDir
       };
 
     } catch (error) {
@@ -84,21 +215,12 @@ export class DataExporter {
   }
 
   /**
-   * 勘定科目マスタを更新
+   * 勘定科目マスタの行
    */
-  private async updateAccountItems(companyId: string, dateStr: string): Promise<string> {
-    const response = await this.apiClient.request('GET', 'account_items', {
-      company_id: companyId
-    });
-
-    const csvData = [
-      ['勘定科目ID', '勘定科目名', '勘定科目コード', '大分類', '大分類2', '中分類', '小分類', 
-       '勘定科目カテゴリ', 'カテゴリID', 'グループ名', '税区分', '作成日時', '更新日時']
-    ];
-
+  private *accountItemRows(response: any): Generator<CsvValue[]> {
     for (const item of response.account_items) {
       const categories = item.categories || [];
-      csvData.push([
+      yield [
         item.id || '',
         item.name || '',
         item.code || '',
@@ -112,33 +234,27 @@ export class DataExporter {
         item.tax_code || '',
         item.created_at || '',
         item.updated_at || ''
-      ]);
+      ];
     }
-
-    const filename = `account_items_hierarchy_${dateStr}.csv`;
-    const filepath = path.join(this.exportDataDir, filename);
-    const csvContent = csvData.map(row => row.map(cell => `"${cell}"`).join(',')).join('\n');
-    
-    fs.writeFileSync(filepath, csvContent, 'utf8');
-    return filename;
   }
 
   /**
-   * 取引先マスタを更新
+   * 取引先を全ページ取得（1ページ目だけで打ち切らない）
    */
-  private async updatePartners(companyId: string, dateStr: string): Promise<string> {
-    const response = await this.apiClient.request('GET', 'partners', {
-      company_id: companyId,
-      limit: 1000
-    });
-
-    const csvData = [
-      ['取引先ID', '取引先名', '取引先コード', '取引先カテゴリ', '郵便番号', '住所', '電話番号', 
-       'FAX番号', 'メールアドレス', '代表者名', '敬称', '振込先口座名', '支払条件ID', '作成日時', '更新日時']
-    ];
+  private async fetchAllPartners(companyId: string): Promise<any[]> {
+    const partners: any[] = [];
+    for await (const page of this.apiClient.iteratePartners(companyId)) {
+      partners.push(...page);
+    }
+    return partners;
+  }
 
-    for (const partner of response.partners) {
-      csvData.push([
+  /**
+   * 取引先マスタの行
+   */
+  private *partnerRows(partners: any[]): Generator<CsvValue[]> {
+    for (const partner of partners) {
+      yield [
         partner.id || '',
         partner.name || '',
         partner.code || '',
@@ -154,31 +270,24 @@ export class DataExporter {
         partner.payment_term_id || '',
         partner.created_at || '',
         partner.updated_at || ''
-      ]);
+      ];
     }
-
-    const filename = `partners_${dateStr}.csv`;
-    const filepath = path.join(this.exportDataDir, filename);
-    const csvContent = csvData.map(row => row.map(cell => `"${cell}"`).join(',')).join('\n');
-    
-    fs.writeFileSync(filepath, csvContent, 'utf8');
-    return filename;
   }
 
   /**
-   * 完全な試算表データ（PL + BS）を更新
+   * 完全な試算表データ（PL + BS）を月別パーティションとして更新
+   * 月ごとのPL・BSを同時実行数の上限内で並列取得し、内容が変わった月だけを書き直す
+   * （締め済みの月は試算表ストアから読み込まれるため、APIも呼ばれない）
    */
   private async updateTrialBalance(
     companyId: string,
-    dateStr: string,
+    manifest: ExportManifest,
+    accountItemsResponse: any,
     startYear: number,
-    startMonth: number
-  ): Promise<string> {
-    // 勘定科目情報を取得してマッピング
-    const accountItemsResponse = await this.apiClient.request('GET', 'account_items', {
-      company_id: companyId
-    });
-
+    startMonth: number,
+    exportOptions: ExportOptions,
+    concurrency: number = DEFAULT_FETCH_CONCURRENCY
+  ): Promise<PartitionWrite[]> {
     const accountMapping: { [key: string]: any } = {};
     for (const item of accountItemsResponse.account_items) {
       accountMapping[item.id] = {
@@ -188,162 +297,161 @@ export class DataExporter {
       };
     }
 
-    const csvData = [
-      ['開始日', '終了日', '勘定科目名', '勘定科目ID', '勘定科目カテゴリ',
-       '期首残高', '借方金額', '貸方金額', '期末残高', '構成比',
-       '内訳名', '内訳ID', '内訳期首残高', '内訳借方金額', '内訳貸方金額',
-       '内訳期末残高', '内訳構成比', '試算表タイプ']
-    ];
-
-    // 現在の日付まで月次でループ
-    const currentDate = new Date();
-    let processDate = new Date(startYear, startMonth - 1, 1);
-
-    while (processDate <= currentDate) {
-      const year = processDate.getFullYear();
-      const month = processDate.getMonth() + 1;
-      const startDateStr = `${year}-${month.toString().padStart(2, '0')}-01`;
-      const lastDay = new Date(year, month, 0).getDate();
-      const endDateStr = `${year}-${month.toString().padStart(2, '0')}-${lastDay.toString().padStart(2, '0')}`;
-
-      // PL試算表を取得
-      try {
-        const plResponse = await this.apiClient.request('GET', 'reports/trial_pl', {
-          company_id: companyId,
-          start_date: startDateStr,
-          end_date: endDateStr,
-          breakdown_display_type: 'partner'
-        });
-
-        if (plResponse.trial_pl?.balances) {
-          for (const balance of plResponse.trial_pl.balances) {
-            if (!balance.total_line && balance.account_item_name) {
-              const accountInfo = accountMapping[balance.account_item_id] || {};
-
-              const baseRow = [
-                startDateStr,
-                endDateStr,
-                balance.account_item_name,
-                balance.account_item_id || '',
-                accountInfo.category || '',
-                balance.opening_balance || 0,
-                balance.debit_amount || 0,
-                balance.credit_amount || 0,
-                balance.closing_balance || 0,
-                balance.composition_ratio || 0
-              ];
-
-              if (balance.breakdowns && balance.breakdowns.length > 0) {
-                for (const breakdown of balance.breakdowns) {
-                  csvData.push([
-                    ...baseRow,
-                    breakdown.name || '未選択',
-                    breakdown.id || 0,
-                    breakdown.opening_balance || 0,
-                    breakdown.debit_amount || 0,
-                    breakdown.credit_amount || 0,
-                    breakdown.closing_balance || 0,
-                    breakdown.composition_ratio || 0,
-                    'PL'
-                  ]);
-                }
-              } else {
-                csvData.push([
-                  ...baseRow,
-                  '未選択',
-                  0,
-                  baseRow[5], // 期首残高
-                  baseRow[6], // 借方金額
-                  baseRow[7], // 貸方金額
-                  baseRow[8], // 期末残高
-                  baseRow[9], // 構成比
-                  'PL'
-                ]);
-              }
-            }
-          }
-        }
-      } catch (error) {
-        console.warn(`PL試算表取得エラー (${startDateStr}):`, error);
+    // 現在の月まで
+    const now = new Date();
+    const months = getMonthRanges(startYear, startMonth, now.getFullYear(), now.getMonth() + 1);
+
+    const settled = await mapSettledWithConcurrency(months, concurrency, async (range) => {
+      const params = { start_date: range.start_date, end_date: range.end_date, breakdown_display_type: 'partner' as const };
+
+      // PL・BS試算表を同時に取得
+      const [pl, bs] = await Promise.all([
+        this.apiClient.getTrialPL(companyId, params),
+        this.apiClient.getTrialBS(companyId, params)
+      ]);
+
+      const rows = [
+        ...this.trialBalanceRows(pl.trial_pl?.balances, accountMapping, range.start_date, range.end_date, 'PL'),
+        ...this.trialBalanceRows(bs.trial_bs?.balances, accountMapping, range.start_date, range.end_date, 'BS')
+      ];
+      return this.writePartition(manifest, `${TRIAL_BALANCE_DIR}/${range.start_date.slice(0, 7)}`,
+        TRIAL_BALANCE_COLUMNS, rows, exportOptions);
+    });
+
+    // 取得できなかった月は前回の出力を残して警告のみ（書き込みエラーは更新全体を失敗させる）
+    const writes: PartitionWrite[] = [];
+    settled.forEach((outcome, index) => {
+      if (outcome.status === 'fulfilled') {
+        writes.push(outcome.value);
+      } else if (outcome.reason instanceof PartitionWriteError) {
+        throw outcome.reason;
+      } else {
+        console.warn(`試算表取得エラー (${months[index].start_date}):`, outcome.reason);
       }
+    });
+    return writes;
+  }
 
-      // BS試算表を取得
-      try {
-        const bsResponse = await this.apiClient.request('GET', 'reports/trial_bs', {
-          company_id: companyId,
-          start_date: startDateStr,
-          end_date: endDateStr,
-          breakdown_display_type: 'partner'
-        });
-
-        if (bsResponse.trial_bs?.balances) {
-          for (const balance of bsResponse.trial_bs.balances) {
-            if (!balance.total_line && balance.account_item_name) {
-              const accountInfo = accountMapping[balance.account_item_id] || {};
-
-              const baseRow = [
-                startDateStr,
-                endDateStr,
-                balance.account_item_name,
-                balance.account_item_id || '',
-                accountInfo.category || '',
-                balance.opening_balance || 0,
-                balance.debit_amount || 0,
-                balance.credit_amount || 0,
-                balance.closing_balance || 0,
-                balance.composition_ratio || 0
-              ];
-
-              if (balance.breakdowns && balance.breakdowns.length > 0) {
-                for (const breakdown of balance.breakdowns) {
-                  csvData.push([
-                    ...baseRow,
-                    breakdown.name || '未選択',
-                    breakdown.id || 0,
-                    breakdown.opening_balance || 0,
-                    breakdown.debit_amount || 0,
-                    breakdown.credit_amount || 0,
-                    breakdown.closing_balance || 0,
-                    breakdown.composition_ratio || 0,
-                    'BS'
-                  ]);
-                }
-              } else {
-                csvData.push([
-                  ...baseRow,
-                  '未選択',
-                  0,
-                  baseRow[5], // 期首残高
-                  baseRow[6], // 借方金額
-                  baseRow[7], // 貸方金額
-                  baseRow[8], // 期末残高
-                  baseRow[9], // 構成比
-                  'BS'
-                ]);
-              }
-            }
-          }
+  /**
+   * 試算表の残高行をCSVの行に変換（取引先別の内訳があれば内訳ごとに1行）
+   */
+  private *trialBalanceRows(
+    balances: any[] | undefined,
+    accountMapping: { [key: string]: any },
+    startDateStr: string,
+    endDateStr: string,
+    reportType: 'PL' | 'BS'
+  ): Generator<CsvValue[]> {
+    for (const balance of balances || []) {
+      if (balance.total_line || !balance.account_item_name) continue;
+
+      const accountInfo = accountMapping[balance.account_item_id] || {};
+      const baseRow = [
+        startDateStr,
+        endDateStr,
+        balance.account_item_name,
+        balance.account_item_id || '',
+        accountInfo.category || '',
+        balance.opening_balance || 0,
+        balance.debit_amount || 0,
+        balance.credit_amount || 0,
+        balance.closing_balance || 0,
+        balance.composition_ratio || 0
+      ];
+
+      // breakdown_display_type: 'partner' の内訳は partners に入る
+      const breakdowns = balance.partners || balance.breakdowns;
+      if (breakdowns && breakdowns.length > 0) {
+        for (const breakdown of breakdowns) {
+          yield [
+            ...baseRow,
+            breakdown.name || '未選択',
+            breakdown.id || 0,
+            breakdown.opening_balance || 0,
+            breakdown.debit_amount || 0,
+            breakdown.credit_amount || 0,
+            breakdown.closing_balance || 0,
+            breakdown.composition_ratio || 0,
+            reportType
+          ];
         }
-      } catch (error) {
-        console.warn(`BS試算表取得エラー (${startDateStr}):`, error);
+      } else {
+        yield [
+          ...baseRow,
+          '未選択',
+          0,
+          baseRow[5], // 期首残高
+          baseRow[6], // 借方金額
+          baseRow[7], // 貸方金額
+          baseRow[8], // 期末残高
+          baseRow[9], // 構成比
+          reportType
+        ];
       }
+    }
+  }
 
-      // 次の月へ
-      processDate.setMonth(processDate.getMonth() + 1);
+  /**
+   * パーティションを出力（内容が前回と同じなら書き直さない）
+   * 一時ファイルに書いてから置き換えるため、読み取り側が書きかけのファイルを読むことはない
+   */
+  private async writePartition(
+    manifest: ExportManifest,
+    key: string,
+    columns: ExportColumn[],
+    rows: CsvValue[][],
+    exportOptions: ExportOptions
+  ): Promise<PartitionWrite> {
+    const extension = exportOptions.format === 'arrow' ? '.arrow' : exportOptions.gzip ? '.csv.gz' : '.csv';
+    const file = `${key}${extension}`;
+    const { sha256 } = hashRows(columns.map(column => column.name), rows);
+
+    if (manifest.isUnchanged(key, file, sha256)) {
+      manifest.touch(key);
+      return { file, written: false };
     }
 
-    const filename = `complete_monthly_trial_balance_${dateStr}.csv`;
-    const filepath = path.join(this.exportDataDir, filename);
-    const csvContent = csvData.map(row => row.join(',')).join('\n');
-    
-    fs.writeFileSync(filepath, csvContent, 'utf8');
-    return filename;
+    const filepath = path.join(manifest.directory, file);
+    const tmpPath = `${filepath}.${process.pid}.tmp`;
+    const writer: TableWriter = exportOptions.format === 'arrow'
+      ? ArrowWriter.open(tmpPath, columns)
+      : CsvWriter.open(tmpPath, { gzip: exportOptions.gzip });
+
+    let bytes: number;
+    try {
+      if (writer instanceof CsvWriter) {
+        await writer.writeRow(columns.map(column => column.name));
+      }
+      await writer.writeRows(rows);
+      bytes = (await writer.close()).bytes;
+      fs.renameSync(tmpPath, filepath);
+    } catch (error) {
+      await writer.abort();
+      fs.rmSync(tmpPath, { force: true });
+      throw new PartitionWriteError(`${file} の書き込みに失敗しました: ${error}`);
+    }
+
+    // 出力形式を変えた場合は以前の形式のファイルを削除
+    const previous = manifest.get(key);
+    if (previous && previous.file !== file) {
+      fs.rmSync(path.join(manifest.directory, previous.file), { force: true });
+    }
+
+    manifest.set(key, { file, sha256, rows: rows.length, bytes });
+    return { file, written: true };
   }
 
   /**
-   * 古いファイルを削除
+   * 事業所ごとの出力ディレクトリ
    */
-  private cleanupOldFiles(currentDateStr: string): string[] {
+  private companyDir(companyId: string): string {
+    return path.join(this.exportDataDir, companyId);
+  }
+
+  /**
+   * 旧形式（日付付きの全件ファイル）を削除
+   */
+  private cleanupOldFiles(): string[] {
     const removedFiles: string[] = [];
     
     if (!fs.existsSync(this.exportDataDir)) {
@@ -351,20 +459,12 @@ export class DataExporter {
     }
 
     const files = fs.readdirSync(this.exportDataDir);
-    const filePatterns = [
-      'account_items_hierarchy_',
-      'partners_',
-      'complete_monthly_trial_balance_'
-    ];
+    const legacyPattern = /^(account_items_hierarchy|partners|complete_monthly_trial_balance)_\d{8}\./;
 
     for (const file of files) {
-      for (const pattern of filePatterns) {
-        if (file.startsWith(pattern) && !file.includes(currentDateStr)) {
-          const filepath = path.join(this.exportDataDir, file);
-          fs.unlinkSync(filepath);
-          removedFiles.push(file);
-          break;
-        }
+      if (legacyPattern.test(file)) {
+        fs.unlinkSync(path.join(this.exportDataDir, file));
+        removedFiles.push(file);
       }
     }
 
@@ -372,32 +472,23 @@ export class DataExporter {
   }
 
   /**
-   * データ統計情報を取得
+   * データ統計情報を取得（マニフェストに記録されたパーティション）
    */
-  private getDataStatistics(): any {
+  private getDataStatistics(manifest: ExportManifest): any {
     const stats: any = {
       files: [],
       total_size: 0
     };
 
-    if (!fs.existsSync(this.exportDataDir)) {
-      return stats;
-    }
-
-    const files = fs.readdirSync(this.exportDataDir);
-    
-    for (const file of files) {
-      const filepath = path.join(this.exportDataDir, file);
-      const fileStats = fs.statSync(filepath);
-      
+    for (const [key, entry] of manifest.entries()) {
       stats.files.push({
-        name: file,
-        size: fileStats.size,
-        created: fileStats.birthtime,
-        modified: fileStats.mtime
+        partition: key,
+        name: entry.file,
+        size: entry.bytes,
+        rows: entry.rows,
+        modified: entry.updated_at
       });
-      
-      stats.total_size += fileStats.size;
+      stats.total_size += entry.bytes;
     }
 
     return stats;
@@ -428,7 +519,11 @@ export const DataUpdateSchema = z.object({
   start_month: z.number().min(1).max(12).optional().describe('試算表データの開始月（デフォルト: 1）'),
   include_partners: z.boolean().optional().describe('取引先マスタを含める（デフォルト: true）'),
   include_account_items: z.boolean().optional().describe('勘定科目マスタを含める（デフォルト: true）'),
-  include_trial_balance: z.boolean().optional().describe('試算表データを含める（デフォルト: true）')
+  include_trial_balance: z.boolean().optional().describe('試算表データを含める（デフォルト: true）'),
+  format: z.enum(['csv', 'arrow']).optional()
+    .describe('出力形式（csv: テキスト、arrow: 型付きの列指向形式 Arrow IPC。デフォルト: csv）'),
+  gzip: z.boolean().optional().describe('CSVをgzip圧縮して出力（.csv.gz、デフォルト: false）'),
+  concurrency: z.number().min(1).max(16).optional().describe('試算表を同時に取得する月数（デフォルト: 4）')
 });
 
 export const QuickUpdateSchema = z.object({
@@ -0,0 +1,172 @@
+import { z } from 'zod';
+import { FreeeAPIClient } from './api-client.js';
+import { FreeeConfig } from './types.js';
+import { SYNC_RESOURCES, SyncResource, SyncRunStats, SyncStore, getSharedSyncStore } from './sync-store.js';
+
+// 削除されたレコードを検出するための全件照合の間隔（デフォルト）
+const DEFAULT_RECONCILE_INTERVAL_HOURS = 24;
+
+const DAY = 24 * 60 * 60 * 1000;
+
+/**
+ * freeeデータ同期ツール
+ * 取引・振替伝票・請求書・取引先をローカルのSQLiteに差分同期する
+ *
+ * - 取引: 更新日（start_renew_date）のウォーターマーク以降に更新されたものだけを取得
+ * - 振替伝票・請求書・取引先: 更新日で絞り込めないため全件を取得し、内容が変わったものだけを書き込む
+ * - 全件取得時は、取得できなかったレコードを削除済みとしてローカルからも削除する
+ */
+export class DataSync {
+  private apiClient: FreeeAPIClient;
+  private storePromise: Promise<SyncStore> | null;
+
+  constructor(config: FreeeConfig, store?: SyncStore) {
+    // 同期は対話的なツール呼び出しより低い優先度で実行
+    this.apiClient = new FreeeAPIClient(config, { priority: 'bulk' });
+    this.storePromise = store ? Promise.resolve(store) : null;
+  }
+
+  /**
+   * 事業所のデータを同期
+   */
+  async syncCompanyData(params: {
+    company_id: string;
+    resources?: SyncResource[];
+    full?: boolean;
+    reconcile_interval_hours?: number;
+  }) {
+    try {
+      const store = await this.getStore();
+      const resources = params.resources?.length ? params.resources : SYNC_RESOURCES;
+      const reconcileMs = (params.reconcile_interval_hours ?? DEFAULT_RECONCILE_INTERVAL_HOURS) * 60 * 60 * 1000;
+
+      const results = await Promise.all(resources.map(async (resource) => {
+        const state = store.getState(params.company_id, resource);
+        const needsReconcile = !state.last_full_sync_at ||
+          Date.now() - Date.parse(state.last_full_sync_at) >= reconcileMs;
+        const incremental = resource === 'deals' && !params.full && !needsReconcile && state.watermark !== null;
+
+        const run = await this.syncResource(store, params.company_id, resource, incremental ? state.watermark : null);
+        return { resource, ...run };
+      }));
+
+      return {
+        success: true,
+        message: '同期が完了しました',
+        company_id: params.company_id,
+        database: store.path,
+        results
+      };
+    } catch (error) {
+      throw new Error(`同期エラー: ${error}`);
+    }
+  }
+
+  /**
+   * 同期状態と前回の統計を取得
+   */
+  async getSyncStatus(params: { company_id?: string }) {
+    try {
+      const store = await this.getStore();
+      const companyIds = params.company_id ? [params.company_id] : store.listCompanies();
+
+      return {
+        database: store.path,
+        companies: companyIds.map(companyId => ({
+          company_id: companyId,
+          resources: SYNC_RESOURCES.map(resource => store.getState(companyId, resource))
+        }))
+      };
+    } catch (error) {
+      throw new Error(`同期状態取得エラー: ${error}`);
+    }
+  }
+
+  /**
+   * 同期ストアを取得（未指定なら共有ストア）
+   */
+  async getStore(): Promise<SyncStore> {
+    if (!this.storePromise) {
+      this.storePromise = getSharedSyncStore();
+    }
+    return this.storePromise;
+  }
+
+  // Private methods
+
+  /**
+   * 1リソースを同期（watermark指定時は増分、未指定時は全件取得＋削除の照合）
+   */
+  private async syncResource(
+    store: SyncStore,
+    companyId: string,
+    resource: SyncResource,
+    watermark: string | null
+  ): Promise<SyncRunStats> {
+    const startedAt = new Date();
+    const stats: SyncRunStats = {
+      mode: watermark ? 'incremental' : 'full',
+      started_at: startedAt.toISOString(),
+      duration_ms: 0,
+      fetched: 0,
+      inserted: 0,
+      updated: 0,
+      unchanged: 0,
+      deleted: 0
+    };
+    const seenIds = new Set<string>();
+
+    for await (const page of this.iteratePages(companyId, resource, watermark)) {
+      stats.fetched += page.length;
+      if (!watermark) {
+        for (const row of page) seenIds.add(String(row.id));
+      }
+
+      const counts = store.upsertMany(companyId, resource, page);
+      stats.inserted += counts.inserted;
+      stats.updated += counts.updated;
+      stats.unchanged += counts.unchanged;
+    }
+
+    if (!watermark) {
+      stats.deleted = store.deleteMissing(companyId, resource, seenIds);
+    }
+
+    stats.duration_ms = Date.now() - startedAt.getTime();
+
+    // 日付単位の絞り込みのため、開始日の前日から取り直して取りこぼしを防ぐ
+    const nextWatermark = resource === 'deals'
+      ? new Date(startedAt.getTime() - DAY).toISOString().slice(0, 10)
+      : null;
+    store.saveRun(companyId, resource, stats, nextWatermark);
+
+    return stats;
+  }
+
+  private iteratePages(companyId: string, resource: SyncResource, watermark: string | null): AsyncIterable<any[]> {
+    switch (resource) {
+      case 'deals':
+        return this.apiClient.iterateDeals(companyId, watermark ? { start_renew_date: watermark } : {});
+      case 'manual_journals':
+        return this.apiClient.iterateManualJournals(companyId);
+      case 'invoices':
+        return this.apiClient.iterateInvoices(companyId);
+      case 'partners':
+        return this.apiClient.iteratePartners(companyId);
+    }
+  }
+}
+
+// MCPツール用のスキーマ定義
+export const SyncCompanyDataSchema = z.object({
+  company_id: z.string().describe('会社ID'),
+  resources: z.array(z.enum(['deals', 'manual_journals', 'invoices', 'partners'])).optional()
+    .describe('同期するデータ（デフォルト: すべて）'),
+  full: z.boolean().optional().describe('増分ではなく全件を取得し、削除されたレコードも照合する'),
+  reconcile_interval_hours: z.number().min(0).optional()
+    .describe('前回の全件照合からこの時間が経過していれば全件取得する（デフォルト: 24）')
+});
+
+export const SyncStatusSchema = z.object({
+  company_id: z.string().optional().describe('会社ID（省略時は同期済みの全事業所）')
+});
@@ -0,0 +1,223 @@
+/**
+ * 経費申請の一括操作（承認・却下・差戻し）
+ *
+ * - 共有スケジューラー経由で同時実行数を制限して操作を送信
+ * - 既に目的の状態になっている申請は操作せずスキップ（再実行しても二重に操作しない）
+ * - ネットワークエラー・5xx・レート制限は再試行キューに戻し、待機後にまとめて再送
+ * - 1件終わるごとに進捗を通知
+ */
+
+import { FreeeAPIClient } from './api-client.js';
+import { ExpenseDetailCache } from './expense-detail-cache.js';
+import { mapSettledWithConcurrency } from './concurrency.js';
+import { FreeeAPIError, RateLimitError } from './types.js';
+
+export type ExpenseAction = 'approve' | 'reject' | 'send_back';
+
+/**
+ * 操作ごとのエンドポイントと、操作後の申請ステータス
+ */
+export const EXPENSE_ACTIONS: Record<ExpenseAction, { path: string; targetStatus: string }> = {
+  approve: { path: 'approve', targetStatus: 'approved' },
+  reject: { path: 'reject', targetStatus: 'rejected' },
+  send_back: { path: 'feedback', targetStatus: 'feedback' }
+};
+
+export interface BulkActionTarget {
+  id: number | string;
+  status?: string; // 分かっていれば指定（未指定なら操作前に最新の状態を確認）
+  total_amount?: number;
+  [key: string]: any;
+}
+
+export interface BulkActionItemResult {
+  id: number | string;
+  outcome: 'succeeded' | 'skipped' | 'failed';
+  success: boolean;
+  attempts: number;
+  reason?: string;
+  error?: string;
+  expense_application?: any;
+  application: BulkActionTarget;
+}
+
+export interface BulkActionProgress {
+  completed: number;
+  total: number;
+  item: BulkActionItemResult;
+}
+
+export interface BulkActionOptions {
+  concurrency?: number;
+  maxRetries?: number;
+  retryDelay?: number;
+  approverId?: number; // 承認時、現在のステップの承認者でなくなった申請をスキップする
+  onProgress?: (progress: BulkActionProgress) => void;
+}
+
+const DEFAULT_ACTION_CONCURRENCY = 4;
+
+/**
+ * 現在のステップで指定ユーザーが承認者か判定（承認情報がなく判定できなければ undefined）
+ */
+export function isCurrentApprover(app: any, approverId: number): boolean | undefined {
+  // 進行中の承認ステップがない申請は誰の承認待ちでもない
+  if (app.current_step_id === null) return false;
+  if (!Array.isArray(app.approvals)) return undefined;
+
+  const currentApproval = app.approvals.find(
+    (approval: any) => approval.step === app.current_step_id
+  );
+  return currentApproval?.approver_id === approverId;
+}
+
+/**
+ * 再試行すれば成功しうるエラーか（通信エラー・タイムアウト・5xx・レート制限）
+ */
+export function isTransientError(error: unknown): boolean {
+  if (error instanceof RateLimitError) return true;
+  if (error instanceof FreeeAPIError) {
+    return error.status === undefined || error.status === 408 || error.status >= 500;
+  }
+  return false;
+}
+
+/**
+ * 結果に載せる申請の概要項目
+ */
+function summarize(app: any): Partial<BulkActionTarget> {
+  return {
+    application_number: app.application_number,
+    applicant_name: app.applicant_name,
+    title: app.title,
+    total_amount: app.total_amount,
+    status: app.status
+  };
+}
+
+export class ExpenseBulkExecutor {
+  constructor(
+    private apiClient: FreeeAPIClient,
+    private detailCache: ExpenseDetailCache
+  ) {}
+
+  /**
+   * 申請1件に操作を実行（キャッシュした詳細は無効化）
+   */
+  async perform(action: ExpenseAction, companyId: string, id: number | string, comment?: string) {
+    try {
+      const response = await this.apiClient.put(
+        `/api/1/expense_applications/${id}/${EXPENSE_ACTIONS[action].path}`,
+        { company_id: companyId, comment }
+      );
+      return response.expense_application;
+    } finally {
+      this.detailCache.invalidate(companyId, id);
+    }
+  }
+
+  /**
+   * 複数の申請に同じ操作を実行
+   * 一時的なエラーで失敗した申請は、全件を一巡した後に再試行キューから再送する
+   */
+  async run(
+    action: ExpenseAction,
+    companyId: string,
+    targets: BulkActionTarget[],
+    comment: string | undefined,
+    options: BulkActionOptions = {}
+  ) {
+    const concurrency = options.concurrency ?? DEFAULT_ACTION_CONCURRENCY;
+    const maxRetries = options.maxRetries ?? 3;
+    const retryDelay = options.retryDelay ?? 2000;
+
+    const applications = [...targets]; // 最新の状態を取得したら置き換える
+    const results: BulkActionItemResult[] = new Array(targets.length);
+    let completed = 0;
+    let retryCount = 0;
+
+    const finish = (index: number, item: Omit<BulkActionItemResult, 'id' | 'application' | 'success'>) => {
+      const application = applications[index];
+      results[index] = { id: application.id, ...item, success: item.outcome !== 'failed', application };
+      completed++;
+      options.onProgress?.({ completed, total: targets.length, item: results[index] });
+    };
+
+    let queue = targets.map((_, index) => index);
+
+    for (let attempt = 0; attempt <= maxRetries && queue.length > 0; attempt++) {
+      if (attempt > 0) {
+        retryCount += queue.length;
+        await new Promise(resolve => setTimeout(resolve, retryDelay * attempt));
+      }
+
+      const retryQueue: number[] = [];
+      await mapSettledWithConcurrency(queue, concurrency, async (index) => {
+        const target = targets[index];
+        try {
+          // 前回の送信が実は反映されていた可能性があるため、再試行時は必ず最新の状態を確認
+          let current: any = target;
+          if (attempt > 0 || target.status === undefined) {
+            current = await this.fetchCurrent(companyId, target.id);
+            applications[index] = { ...target, ...summarize(current) };
+          }
+          const skipReason = this.skipReason(action, current, options.approverId);
+          if (skipReason) {
+            finish(index, { outcome: 'skipped', attempts: attempt + 1, reason: skipReason });
+            return;
+          }
+
+          const updated = await this.perform(action, companyId, target.id, comment);
+          finish(index, { outcome: 'succeeded', attempts: attempt + 1, expense_application: updated });
+        } catch (error) {
+          if (isTransientError(error) && attempt < maxRetries) {
+            retryQueue.push(index);
+            return;
+          }
+          finish(index, {
+            outcome: 'failed',
+            attempts: attempt + 1,
+            error: error instanceof Error ? error.message : String(error)
+          });
+        }
+      });
+      queue = retryQueue;
+    }
+
+    const succeeded = results.filter(r => r.outcome === 'succeeded');
+    return {
+      action,
+      total_processed: results.length,
+      success_count: succeeded.length,
+      skipped_count: results.filter(r => r.outcome === 'skipped').length,
+      fail_count: results.filter(r => r.outcome === 'failed').length,
+      retry_count: retryCount,
+      total_amount: succeeded.reduce((sum, r) => sum + (r.application.total_amount || 0), 0),
+      results
+    };
+  }
+
+  // Private methods
+
+  /**
+   * 申請の最新状態を取得（キャッシュは使わない）
+   */
+  private async fetchCurrent(companyId: string, id: number | string): Promise<any> {
+    const detail = await this.apiClient.get(`/api/1/expense_applications/${id}`, {
+      company_id: companyId
+    });
+    return detail.expense_application;
+  }
+
+  /**
+   * 操作が不要な申請ならその理由を返す
+   */
+  private skipReason(action: ExpenseAction, app: any, approverId?: number): string | undefined {
+    const targetStatus = EXPENSE_ACTIONS[action].targetStatus;
+    if (app.status === targetStatus) return `already_${targetStatus}`;
+    if (action === 'approve' && approverId !== undefined && isCurrentApprover(app, approverId) === false) {
+      return 'not_current_approver';
+    }
+    return undefined;
+  }
+}
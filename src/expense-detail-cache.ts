@@ -0,0 +1,119 @@
+/**
+ * 経費申請詳細キャッシュ
+ * プロセス内の全ExpenseManagerで共有し、承認待ちの確認や一括承認のたびに
+ * 同じ申請の詳細（expense_applications/{id}）を取り直さないようにする
+ *
+ * - キーは事業所ID・申請ID・更新日時（updated_at）。申請が更新されればキーが変わり自然に再取得される
+ * - 最大件数を超えたら最も長く使われていないエントリから削除（LRU）
+ * - 更新日時が分からない申請はキャッシュしない
+ */
+
+export interface ExpenseDetailCacheOptions {
+  maxEntries: number;
+}
+
+export const DEFAULT_EXPENSE_DETAIL_CACHE_OPTIONS: ExpenseDetailCacheOptions = {
+  maxEntries: 2000
+};
+
+export class ExpenseDetailCache {
+  private options: ExpenseDetailCacheOptions;
+  private entries = new Map<string, unknown>(); // 挿入順 = LRU順
+  private stats = {
+    hits: 0,
+    misses: 0,
+    uncacheable: 0,
+    evictions: 0
+  };
+
+  constructor(options: Partial<ExpenseDetailCacheOptions> = {}) {
+    this.options = { ...DEFAULT_EXPENSE_DETAIL_CACHE_OPTIONS, ...options };
+  }
+
+  /**
+   * キャッシュから詳細を取得し、なければ読み込んで保存
+   */
+  async getOrLoad<T>(
+    target: { companyId: string; id: number | string; updatedAt?: string | null },
+    load: () => Promise<T>
+  ): Promise<T> {
+    if (!target.updatedAt) {
+      this.stats.uncacheable++;
+      return load();
+    }
+
+    const key = `${target.companyId}:${target.id}:${target.updatedAt}`;
+    if (this.entries.has(key)) {
+      const value = this.entries.get(key);
+      // 最近使ったエントリを末尾へ移動
+      this.entries.delete(key);
+      this.entries.set(key, value);
+      this.stats.hits++;
+      return value as T;
+    }
+
+    this.stats.misses++;
+    const value = await load();
+    this.set(key, value);
+    return value;
+  }
+
+  /**
+   * 指定申請のキャッシュを削除（承認・却下などの操作後に使用）
+   */
+  invalidate(companyId: string, id: number | string): number {
+    const prefix = `${companyId}:${id}:`;
+    let removed = 0;
+    for (const key of this.entries.keys()) {
+      if (key.startsWith(prefix)) {
+        this.entries.delete(key);
+        removed++;
+      }
+    }
+    return removed;
+  }
+
+  /**
+   * キャッシュの統計情報を取得
+   */
+  getStats() {
+    const lookups = this.stats.hits + this.stats.misses;
+    return {
+      ...this.stats,
+      hit_rate: lookups > 0 ? Math.round((this.stats.hits / lookups) * 1000) / 1000 : 0,
+      entries: this.entries.size,
+      options: this.options
+    };
+  }
+
+  // Private methods
+
+  private set(key: string, value: unknown): void {
+    this.entries.delete(key);
+    this.entries.set(key, value);
+
+    while (this.entries.size > this.options.maxEntries) {
+      const oldest = this.entries.keys().next().value as string;
+      this.entries.delete(oldest);
+      this.stats.evictions++;
+    }
+  }
+}
+
+let sharedExpenseDetailCache: ExpenseDetailCache | null = null;
+
+/**
+ * プロセス全体で共有する経費申請詳細キャッシュを取得
+ * 環境変数 FREEE_EXPENSE_DETAIL_CACHE_MAX_ENTRIES で最大件数を調整可能
+ */
+export function getSharedExpenseDetailCache(): ExpenseDetailCache {
+  if (!sharedExpenseDetailCache) {
+    const maxEntries = Number(process.env.FREEE_EXPENSE_DETAIL_CACHE_MAX_ENTRIES);
+    sharedExpenseDetailCache = new ExpenseDetailCache({
+      maxEntries: Number.isFinite(maxEntries) && maxEntries > 0
+        ? maxEntries
+        : DEFAULT_EXPENSE_DETAIL_CACHE_OPTIONS.maxEntries
+    });
+  }
+  return sharedExpenseDetailCache;
+}
@@ -1,6 +1,25 @@
 import { z } from 'zod';
 import { FreeeAPIClient } from './api-client.js';
 import { FreeeConfig } from './types.js';
+import { mapSettledWithConcurrency, mapWithConcurrencyAndRetry } from './concurrency.js';
+import { ResponseCache, getSharedResponseCache } from './response-cache.js';
+import {
+  StatisticsSegment,
+  addApplication,
+  createStatisticsPartial,
+  isClosedSegment,
+  localDate,
+  mergeStatisticsPartial,
+  splitIntoMonths,
+  summarizeStatistics
+} from './expense-statistics.js';
+import { ExpenseDetailCache, getSharedExpenseDetailCache } from './expense-detail-cache.js';
+import { BulkActionProgress, ExpenseAction, ExpenseBulkExecutor, isCurrentApprover } from './expense-bulk-executor.js';
+
+// 申請詳細を同時に取得する件数（実際の送信ペースは共有スケジューラーが制御）
+const DEFAULT_DETAIL_CONCURRENCY = 8;
+// 経費申請統計で同時に集計する月数
+const DEFAULT_STATISTICS_CONCURRENCY = 4;
 
 /**
  * 経費申請管理ツール
@@ -8,63 +27,88 @@ import { FreeeConfig } from './types.js';
  */
 export class ExpenseManager {
   private apiClient: FreeeAPIClient;
+  private detailCache: ExpenseDetailCache;
+  private responseCache: ResponseCache;
+  private bulkExecutor: ExpenseBulkExecutor;
 
   constructor(config: FreeeConfig) {
     this.apiClient = new FreeeAPIClient(config);
+    this.detailCache = getSharedExpenseDetailCache();
+    this.responseCache = getSharedResponseCache();
+    this.bulkExecutor = new ExpenseBulkExecutor(this.apiClient, this.detailCache);
   }
 
   /**
    * 私が承認すべき申請一覧を取得
+   * 一覧の情報で承認者が判定できる申請は詳細を取得せず、残りは同時実行数を制限して詳細を取得する
    */
   async getMyPendingApprovals(params: {
     company_id: string;
     approver_user_id: string;
     include_details?: boolean;
+    concurrency?: number;
   }) {
     try {
-      // Step 1: 承認待ちの申請一覧を取得
-      const pendingApps = await this.apiClient.request('GET', 'expense_applications', {
+      const approverId = parseInt(params.approver_user_id);
+
+      // Step 1: 承認待ちの申請一覧を全件取得
+      const pendingApps: any[] = [];
+      for await (const page of this.apiClient.paginate('expense_applications', {
         company_id: params.company_id,
         status: 'pending'
-      });
+      })) {
+        pendingApps.push(...page);
+      }
 
-      // Step 2: 各申請の詳細を取得して自分が承認者かチェック
-      const myApprovals = [];
-      
-      for (const app of pendingApps.expense_applications || []) {
-        try {
-          const detail = await this.apiClient.request('GET', `expense_applications/${app.id}`, {
-            company_id: params.company_id
-          });
-          
-          // 現在のステップで自分が承認者か確認
-          const currentApproval = detail.expense_application.approvals?.find(
-            (approval: any) => approval.step === detail.expense_application.current_step_id
-          );
-          
-          if (currentApproval?.approver_id === parseInt(params.approver_user_id)) {
-            const appData = detail.expense_application;
-            myApprovals.push({
-              id: appData.id,
-              application_number: appData.application_number,
-              applicant_name: appData.applicant_name,
-              total_amount: appData.total_amount,
-              application_date: appData.application_date,
-              title: appData.title,
-              description: appData.description,
-              current_step_id: appData.current_step_id,
-              urgency: this.calculateUrgency(appData),
-              days_pending: this.calculateDaysPending(appData.application_date),
-              ...(params.include_details && { 
-                receipt_metadatum: appData.receipt_metadatum,
-                expense_application_lines: appData.expense_application_lines 
-              })
-            });
+      // Step 2: 一覧で判定できない申請（と詳細が必要な申請）だけ詳細を取得して承認者をチェック
+      let resolvedFromList = 0;
+      const settled = await mapSettledWithConcurrency(
+        pendingApps,
+        params.concurrency ?? DEFAULT_DETAIL_CONCURRENCY,
+        async (app) => {
+          const fromList = isCurrentApprover(app, approverId);
+          if (fromList === false) {
+            resolvedFromList++;
+            return null;
+          }
+          if (fromList === true && !params.include_details) {
+            resolvedFromList++;
+            return app;
           }
-        } catch (error) {
-          console.warn(`Failed to get details for expense ${app.id}:`, error);
+
+          const appData = await this.getExpenseApplicationDetail(params.company_id, app);
+          return isCurrentApprover(appData, approverId) === true ? appData : null;
         }
-      }
+      );
+
+      const myApprovals = [];
+      let failedCount = 0;
+      settled.forEach((outcome, index) => {
+        if (outcome.status === 'rejected') {
+          failedCount++;
+          console.warn(`Failed to get details for expense ${pendingApps[index].id}:`, outcome.reason);
+          return;
+        }
+        const appData = outcome.value;
+        if (!appData) return;
+
+        myApprovals.push({
+          id: appData.id,
+          application_number: appData.application_number,
+          applicant_name: appData.applicant_name,
+          total_amount: appData.total_amount,
+          application_date: appData.application_date,
+          title: appData.title,
+          description: appData.description,
+          current_step_id: appData.current_step_id,
+          urgency: this.calculateUrgency(appData),
+          days_pending: this.calculateDaysPending(appData.application_date),
+          ...(params.include_details && { 
+            receipt_metadatum: appData.receipt_metadatum,
+            expense_application_lines: appData.expense_application_lines 
+          })
+        });
+      });
 
       // 緊急度でソート
       myApprovals.sort((a, b) => {
@@ -76,7 +120,13 @@ export class ExpenseManager {
         pending_approvals: myApprovals,
         total_count: myApprovals.length,
         total_amount: myApprovals.reduce((sum, app) => sum + (app.total_amount || 0), 0),
-        urgency_summary: this.getUrgencySummary(myApprovals)
+        urgency_summary: this.getUrgencySummary(myApprovals),
+        scan_summary: {
+          pending_listed: pendingApps.length,
+          resolved_from_list: resolvedFromList,
+          detail_lookups: pendingApps.length - resolvedFromList - failedCount,
+          failed: failedCount
+        }
       };
 
     } catch (error) {
@@ -93,15 +143,17 @@ export class ExpenseManager {
     comment?: string;
   }) {
     try {
-      const response = await this.apiClient.request('PUT', `expense_applications/${params.expense_application_id}/approve`, {
-        company_id: params.company_id,
-        comment: params.comment
-      });
+      const expenseApplication = await this.bulkExecutor.perform(
+        'approve',
+        params.company_id,
+        params.expense_application_id,
+        params.comment
+      );
 
       return {
         success: true,
         message: '経費申請を承認しました',
-        expense_application: response.expense_application
+        expense_application: expenseApplication
       };
     } catch (error) {
       throw new Error(`承認エラー: ${error}`);
@@ -117,15 +169,17 @@ export class ExpenseManager {
     comment: string;
   }) {
     try {
-      const response = await this.apiClient.request('PUT', `expense_applications/${params.expense_application_id}/reject`, {
-        company_id: params.company_id,
-        comment: params.comment
-      });
+      const expenseApplication = await this.bulkExecutor.perform(
+        'reject',
+        params.company_id,
+        params.expense_application_id,
+        params.comment
+      );
 
       return {
         success: true,
         message: '経費申請を却下しました',
-        expense_application: response.expense_application
+        expense_application: expenseApplication
       };
     } catch (error) {
       throw new Error(`却下エラー: ${error}`);
@@ -141,15 +195,17 @@ export class ExpenseManager {
     comment: string;
   }) {
     try {
-      const response = await this.apiClient.request('PUT', `expense_applications/${params.expense_application_id}/feedback`, {
-        company_id: params.company_id,
-        comment: params.comment
-      });
+      const expenseApplication = await this.bulkExecutor.perform(
+        'send_back',
+        params.company_id,
+        params.expense_application_id,
+        params.comment
+      );
 
       return {
         success: true,
         message: '経費申請を差戻しました',
-        expense_application: response.expense_application
+        expense_application: expenseApplication
       };
     } catch (error) {
       throw new Error(`差戻しエラー: ${error}`);
@@ -168,9 +224,8 @@ export class ExpenseManager {
     limit?: number;
   }) {
     try {
-      const response = await this.apiClient.request('GET', 'expense_applications', {
-        company_id: params.company_id,
-        status: params.status,
+      const response = await this.apiClient.getExpenseApplications(params.company_id, {
+        application_status: params.status,
         start_application_date: params.start_application_date,
         end_application_date: params.end_application_date,
         offset: params.offset || 0,
@@ -195,32 +250,63 @@ export class ExpenseManager {
 
   /**
    * 経費申請統計を取得
+   * 全件を1回だけ走査して全ての集計を同時に更新する（件数の上限なし）
+   * 開始日の指定があれば月ごとに集計し（終了日の省略時は今日まで）、終了済みの月は部分集計のキャッシュを利用する
    */
   async getExpenseStatistics(params: {
     company_id: string;
     start_date?: string;
     end_date?: string;
     group_by?: 'month' | 'category' | 'applicant';
+    bypass_cache?: boolean;
   }) {
     try {
-      const allExpenses = await this.apiClient.request('GET', 'expense_applications', {
-        company_id: params.company_id,
-        start_application_date: params.start_date,
-        end_application_date: params.end_date,
-        limit: 1000
-      });
+      // 年初来のように終了日を省略した場合も、今日までを月ごとに区切って締め済みの月をキャッシュする
+      const endDate = params.end_date || localDate();
+      const segmented = Boolean(params.start_date && params.start_date <= endDate);
+      const segments: Array<Partial<StatisticsSegment>> = segmented
+        ? splitIntoMonths(params.start_date!, endDate)
+        : [{ start_date: params.start_date, end_date: params.end_date }];
+      if (segmented && !params.end_date) {
+        // 最後の月は終了日なしで取得し、今日より後の日付の申請も従来どおり含める
+        segments[segments.length - 1] = { ...segments[segments.length - 1], end_date: undefined };
+      }
+
+      let scannedSegments = 0;
+      let scannedApplications = 0;
+      const scan = async (segment: Partial<StatisticsSegment>) => {
+        const partial = await this.scanStatistics(params.company_id, segment.start_date, segment.end_date);
+        scannedSegments++;
+        scannedApplications += partial.count;
+        return partial;
+      };
+
+      const partials = await mapWithConcurrencyAndRetry(
+        segments,
+        (segment) => segmented && segment.end_date !== undefined && isClosedSegment(segment as StatisticsSegment)
+          ? this.responseCache.getOrLoad(
+              `expense_statistics:${segment.start_date}:${segment.end_date}`,
+              { resource: 'expense_statistics', companyId: params.company_id },
+              () => scan(segment),
+              { bypassCache: params.bypass_cache }
+            )
+          : scan(segment),
+        {
+          concurrency: DEFAULT_STATISTICS_CONCURRENCY,
+          describe: segment => segment.month || '全期間'
+        }
+      );
+
+      const totals = createStatisticsPartial();
+      partials.forEach(partial => mergeStatisticsPartial(totals, partial));
 
-      const applications = allExpenses.expense_applications || [];
-      
       return {
-        total_applications: applications.length,
-        total_amount: applications.reduce((sum: number, app: any) => sum + (app.total_amount || 0), 0),
-        average_amount: applications.length > 0 ? 
-          applications.reduce((sum: number, app: any) => sum + (app.total_amount || 0), 0) / applications.length : 0,
-        status_breakdown: this.groupByStatus(applications),
-        monthly_trend: this.getMonthlyTrend(applications),
-        category_breakdown: this.getCategoryBreakdown(applications),
-        top_applicants: this.getTopApplicants(applications)
+        ...summarizeStatistics(totals),
+        scan_summary: {
+          segments: segments.length,
+          segments_from_cache: segments.length - scannedSegments,
+          applications_scanned: scannedApplications
+        }
       };
     } catch (error) {
       throw new Error(`統計取得エラー: ${error}`);
@@ -236,7 +322,8 @@ export class ExpenseManager {
     max_amount?: number;
     applicant_names?: string[];
     comment?: string;
-  }) {
+    concurrency?: number;
+  }, options: { onProgress?: (progress: BulkActionProgress) => void } = {}) {
     try {
       // 承認対象を取得
       const pendingApprovals = await this.getMyPendingApprovals({
@@ -257,42 +344,107 @@ export class ExpenseManager {
         );
       }
 
-      // 一括承認実行
-      const results = [];
-      for (const app of targets) {
-        try {
-          const result = await this.approveExpenseApplication({
-            company_id: params.company_id,
-            expense_application_id: app.id.toString(),
-            comment: params.comment || '一括承認'
-          });
-          results.push({ ...result, application: app });
-        } catch (error) {
-          results.push({ 
-            success: false, 
-            error: error.message, 
-            application: app 
-          });
+      // 一括承認実行（承認待ち一覧から取得した申請なので状態は pending）
+      const summary = await this.bulkExecutor.run(
+        'approve',
+        params.company_id,
+        targets.map(app => ({ ...app, status: 'pending' })),
+        params.comment || '一括承認',
+        {
+          concurrency: params.concurrency,
+          approverId: parseInt(params.approver_user_id),
+          onProgress: options.onProgress
         }
-      }
-
-      const successCount = results.filter(r => r.success).length;
-      const failCount = results.filter(r => !r.success).length;
+      );
 
-      return {
-        total_processed: results.length,
-        success_count: successCount,
-        fail_count: failCount,
-        total_amount_approved: results
-          .filter(r => r.success)
-          .reduce((sum, r) => sum + r.application.total_amount, 0),
-        results
-      };
+      const { total_amount, ...rest } = summary;
+      return { ...rest, total_amount_approved: total_amount };
     } catch (error) {
       throw new Error(`一括承認エラー: ${error}`);
     }
   }
 
+  /**
+   * 一括却下
+   */
+  async bulkRejectExpenses(params: {
+    company_id: string;
+    expense_application_ids: string[];
+    comment: string;
+    concurrency?: number;
+  }, options: { onProgress?: (progress: BulkActionProgress) => void } = {}) {
+    try {
+      return await this.runBulkAction('reject', params, options);
+    } catch (error) {
+      throw new Error(`一括却下エラー: ${error}`);
+    }
+  }
+
+  /**
+   * 一括差戻し
+   */
+  async bulkSendBackExpenses(params: {
+    company_id: string;
+    expense_application_ids: string[];
+    comment: string;
+    concurrency?: number;
+  }, options: { onProgress?: (progress: BulkActionProgress) => void } = {}) {
+    try {
+      return await this.runBulkAction('send_back', params, options);
+    } catch (error) {
+      throw new Error(`一括差戻しエラー: ${error}`);
+    }
+  }
+
+  /**
+   * ID指定の申請に一括操作を実行（各申請の最新状態を確認してから操作）
+   */
+  private runBulkAction(
+    action: ExpenseAction,
+    params: { company_id: string; expense_application_ids: string[]; comment: string; concurrency?: number },
+    options: { onProgress?: (progress: BulkActionProgress) => void }
+  ) {
+    const ids = [...new Set(params.expense_application_ids)];
+    return this.bulkExecutor.run(
+      action,
+      params.company_id,
+      ids.map(id => ({ id })),
+      params.comment,
+      { concurrency: params.concurrency, onProgress: options.onProgress }
+    );
+  }
+
+  /**
+   * 期間内の経費申請をページ単位で読みながら集計（次ページは先読みされる）
+   */
+  private async scanStatistics(companyId: string, startDate?: string, endDate?: string) {
+    const partial = createStatisticsPartial();
+    for await (const page of this.apiClient.iterateExpenseApplications(companyId, {
+      start_application_date: startDate,
+      end_application_date: endDate
+    })) {
+      for (const app of page) {
+        addApplication(partial, app);
+      }
+    }
+    return partial;
+  }
+
+  /**
+   * 経費申請の詳細を取得（更新日時が変わっていなければキャッシュを利用）
+   */
+  private async getExpenseApplicationDetail(companyId: string, app: any): Promise<any> {
+    return this.detailCache.getOrLoad(
+      { companyId, id: app.id, updatedAt: app.updated_at },
+      async () => {
+        const detail = await this.apiClient.get(`/api/1/expense_applications/${app.id}`, {
+          company_id: companyId
+        });
+        return detail.expense_application;
+      }
+    );
+  }
+
   /**
    * 緊急度を計算
    */
@@ -357,80 +509,14 @@ export class ExpenseManager {
     
     return summary;
   }
-
-  /**
-   * ステータス別グループ化
-   */
-  private groupByStatus(applications: any[]) {
-    return applications.reduce((acc: any, app: any) => {
-      const status = app.status || 'unknown';
-      if (!acc[status]) acc[status] = [];
-      acc[status].push(app);
-      return acc;
-    }, {});
-  }
-
-  /**
-   * 月次トレンドを取得
-   */
-  private getMonthlyTrend(applications: any[]) {
-    const monthlyData: { [key: string]: { count: number; amount: number } } = {};
-    
-    applications.forEach(app => {
-      const month = app.application_date?.substring(0, 7) || 'unknown';
-      if (!monthlyData[month]) {
-        monthlyData[month] = { count: 0, amount: 0 };
-      }
-      monthlyData[month].count++;
-      monthlyData[month].amount += app.total_amount || 0;
-    });
-    
-    return Object.entries(monthlyData)
-      .sort(([a], [b]) => a.localeCompare(b))
-      .map(([month, data]) => ({ month, ...data }));
-  }
-
-  /**
-   * カテゴリ別内訳を取得
-   */
-  private getCategoryBreakdown(applications: any[]) {
-    // 実際の実装では expense_application_lines から詳細を分析
-    return applications.reduce((acc: any, app: any) => {
-      const category = app.title || 'その他';
-      if (!acc[category]) acc[category] = { count: 0, amount: 0 };
-      acc[category].count++;
-      acc[category].amount += app.total_amount || 0;
-      return acc;
-    }, {});
-  }
-
-  /**
-   * 申請者上位を取得
-   */
-  private getTopApplicants(applications: any[]) {
-    const applicantData: { [key: string]: { count: number; amount: number } } = {};
-    
-    applications.forEach(app => {
-      const name = app.applicant_name || 'unknown';
-      if (!applicantData[name]) {
-        applicantData[name] = { count: 0, amount: 0 };
-      }
-      applicantData[name].count++;
-      applicantData[name].amount += app.total_amount || 0;
-    });
-    
-    return Object.entries(applicantData)
-      .sort(([, a], [, b]) => b.amount - a.amount)
-      .slice(0, 10)
-      .map(([name, data]) => ({ name, ...data }));
-  }
 }
 
 // MCPツール用のスキーマ定義
 export const PendingApprovalsSchema = z.object({
   company_id: z.string().describe('会社ID'),
   approver_user_id: z.string().describe('承認者のユーザーID'),
-  include_details: z.boolean().optional().describe('詳細情報を含める（デフォルト: false）')
+  include_details: z.boolean().optional().describe('詳細情報を含める（デフォルト: false）'),
+  concurrency: z.number().min(1).max(16).optional().describe('申請詳細の同時取得数（デフォルト: 8）')
 });
 
 export const ApproveExpenseSchema = z.object({
@@ -464,7 +550,8 @@ export const ExpenseStatisticsSchema = z.object({
   company_id: z.string().describe('会社ID'),
   start_date: z.string().optional().describe('集計開始日（YYYY-MM-DD）'),
   end_date: z.string().optional().describe('集計終了日（YYYY-MM-DD）'),
-  group_by: z.enum(['month', 'category', 'applicant']).optional().describe('グループ化方式')
+  group_by: z.enum(['month', 'category', 'applicant']).optional().describe('グループ化方式'),
+  bypass_cache: z.boolean().optional().describe('終了済みの月の部分集計キャッシュを使わず再集計する')
 });
 
 export const BulkApproveSchema = z.object({
@@ -472,5 +559,20 @@ export const BulkApproveSchema = z.object({
   approver_user_id: z.string().describe('承認者のユーザーID'),
   max_amount: z.number().optional().describe('承認上限金額'),
   applicant_names: z.array(z.string()).optional().describe('対象申請者名'),
-  comment: z.string().optional().describe('一括承認コメント')
+  comment: z.string().optional().describe('一括承認コメント'),
+  concurrency: z.number().min(1).max(16).optional().describe('同時に送信する承認の数（デフォルト: 4）')
+});
+
+export const BulkRejectSchema = z.object({
+  company_id: z.string().describe('会社ID'),
+  expense_application_ids: z.array(z.string()).min(1).describe('却下する経費申請ID'),
+  comment: z.string().describe('却下理由（必須）'),
+  concurrency: z.number().min(1).max(16).optional().describe('同時に送信する却下の数（デフォルト: 4）')
+});
+
+export const BulkSendBackSchema = z.object({
+  company_id: z.string().describe('会社ID'),
+  expense_application_ids: z.array(z.string()).min(1).describe('差戻す経費申請ID'),
+  comment: z.string().describe('差戻し理由（必須）'),
+  concurrency: z.number().min(1).max(16).optional().describe('同時に送信する差戻しの数（デフォルト: 4）')
 });
\ No newline at end of file
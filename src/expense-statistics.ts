@@ -0,0 +1,136 @@
+/**
+ * 経費申請統計の集計
+ * ページ単位で読み込んだ申請を1回ずつ走査し、全ての集計を同時に更新する
+ * 期間の部分集計は結合できるため、月ごとに集計してキャッシュしておける
+ */
+
+import { getMonthRange } from './periods.js';
+
+interface Bucket {
+  count: number;
+  amount: number;
+}
+
+/**
+ * 経費申請の部分集計（JSONとしてそのまま保存・結合できる形）
+ */
+export interface ExpenseStatisticsPartial {
+  count: number;
+  amount: number;
+  by_status: Record<string, Bucket>;
+  by_month: Record<string, Bucket>;
+  by_category: Record<string, Bucket>;
+  by_applicant: Record<string, Bucket>;
+}
+
+/**
+ * 集計対象期間の区切り（月単位。期間の両端は月の途中になりうる）
+ */
+export interface StatisticsSegment {
+  month: string; // YYYY-MM
+  start_date: string;
+  end_date: string;
+}
+
+export function createStatisticsPartial(): ExpenseStatisticsPartial {
+  return { count: 0, amount: 0, by_status: {}, by_month: {}, by_category: {}, by_applicant: {} };
+}
+
+/**
+ * 申請1件を部分集計に加算
+ */
+export function addApplication(partial: ExpenseStatisticsPartial, app: any): void {
+  const amount = app.total_amount || 0;
+  partial.count++;
+  partial.amount += amount;
+  addToBucket(partial.by_status, app.status || 'unknown', 1, amount);
+  addToBucket(partial.by_month, app.application_date?.substring(0, 7) || 'unknown', 1, amount);
+  // 実際の実装では expense_application_lines から詳細を分析
+  addToBucket(partial.by_category, app.title || 'その他', 1, amount);
+  addToBucket(partial.by_applicant, app.applicant_name || 'unknown', 1, amount);
+}
+
+/**
+ * 部分集計を別の部分集計に加算（source は変更しない）
+ */
+export function mergeStatisticsPartial(target: ExpenseStatisticsPartial, source: ExpenseStatisticsPartial): void {
+  target.count += source.count;
+  target.amount += source.amount;
+  for (const key of ['by_status', 'by_month', 'by_category', 'by_applicant'] as const) {
+    for (const [name, bucket] of Object.entries(source[key])) {
+      addToBucket(target[key], name, bucket.count, bucket.amount);
+    }
+  }
+}
+
+/**
+ * 部分集計から統計結果を作成
+ */
+export function summarizeStatistics(partial: ExpenseStatisticsPartial) {
+  return {
+    total_applications: partial.count,
+    total_amount: partial.amount,
+    average_amount: partial.count > 0 ? partial.amount / partial.count : 0,
+    status_breakdown: partial.by_status,
+    monthly_trend: Object.entries(partial.by_month)
+      .sort(([a], [b]) => a.localeCompare(b))
+      .map(([month, data]) => ({ month, ...data })),
+    category_breakdown: partial.by_category,
+    top_applicants: Object.entries(partial.by_applicant)
+      .sort(([, a], [, b]) => b.amount - a.amount)
+      .slice(0, 10)
+      .map(([name, data]) => ({ name, ...data }))
+  };
+}
+
+/**
+ * 集計期間を月ごとに区切る（YYYY-MM-DD）
+ */
+export function splitIntoMonths(startDate: string, endDate: string): StatisticsSegment[] {
+  const segments: StatisticsSegment[] = [];
+  let year = Number(startDate.substring(0, 4));
+  let month = Number(startDate.substring(5, 7));
+
+  while (true) {
+    const range = getMonthRange(year, month);
+    if (range.start_date > endDate) break;
+
+    segments.push({
+      month: range.start_date.substring(0, 7),
+      start_date: range.start_date < startDate ? startDate : range.start_date,
+      end_date: range.end_date > endDate ? endDate : range.end_date
+    });
+
+    month++;
+    if (month > 12) {
+      month = 1;
+      year++;
+    }
+  }
+
+  return segments;
+}
+
+/**
+ * 期間が今日より前に終わっているか（部分集計をキャッシュしてよいか）
+ */
+export function isClosedSegment(segment: StatisticsSegment, now: Date = new Date()): boolean {
+  return segment.end_date < localDate(now);
+}
+
+/**
+ * ローカル時刻の日付（YYYY-MM-DD）
+ */
+export function localDate(now: Date = new Date()): string {
+  return [
+    now.getFullYear(),
+    (now.getMonth() + 1).toString().padStart(2, '0'),
+    now.getDate().toString().padStart(2, '0')
+  ].join('-');
+}
+
+function addToBucket(buckets: Record<string, Bucket>, key: string, count: number, amount: number): void {
+  const bucket = buckets[key] || (buckets[key] = { count: 0, amount: 0 });
+  bucket.count += count;
+  bucket.amount += amount;
+}
@@ -0,0 +1,112 @@
+/**
+ * エクスポートのマニフェスト
+ * 事業所ごとの出力ディレクトリにある manifest.json に、パーティション（マスタ・月別試算表）ごとの
+ * ファイル名・内容のハッシュ・行数を記録し、内容が変わっていないパーティションの書き直しを省く
+ */
+
+import * as fs from 'fs';
+import * as path from 'path';
+import { createHash } from 'crypto';
+import { CsvValue, formatCsvRow } from './csv-writer.js';
+
+const MANIFEST_FILE = 'manifest.json';
+const MANIFEST_VERSION = 1;
+
+export interface PartitionEntry {
+  file: string;          // 事業所ディレクトリからの相対パス
+  sha256: string;        // 列名と行の内容のハッシュ（出力形式によらない）
+  rows: number;
+  bytes: number;
+  updated_at: string;    // ファイルを書き直した日時
+  checked_at: string;    // 最後に内容を照合した日時
+}
+
+interface ManifestData {
+  version: number;
+  company_id: string;
+  partitions: Record<string, PartitionEntry>;
+}
+
+/**
+ * 列名と行からパーティションの内容のハッシュを計算
+ */
+export function hashRows(columnNames: readonly string[], rows: Iterable<readonly CsvValue[]>): { sha256: string; rows: number } {
+  const hash = createHash('sha256').update(formatCsvRow(columnNames));
+  let count = 0;
+  for (const row of rows) {
+    hash.update(formatCsvRow(row));
+    count++;
+  }
+  return { sha256: hash.digest('hex'), rows: count };
+}
+
+export class ExportManifest {
+  readonly directory: string;
+  private data: ManifestData;
+
+  private constructor(directory: string, data: ManifestData) {
+    this.directory = directory;
+    this.data = data;
+  }
+
+  /**
+   * 事業所ディレクトリのマニフェストを読み込む（なければ空）
+   */
+  static load(directory: string, companyId: string): ExportManifest {
+    const filepath = path.join(directory, MANIFEST_FILE);
+    let data: ManifestData = { version: MANIFEST_VERSION, company_id: companyId, partitions: {} };
+
+    try {
+      const parsed = JSON.parse(fs.readFileSync(filepath, 'utf8'));
+      if (parsed.version === MANIFEST_VERSION && parsed.partitions) {
+        data = parsed;
+      }
+    } catch (error: any) {
+      if (error.code !== 'ENOENT') {
+        console.warn(`マニフェストを読み込めないため全パーティションを書き直します (${filepath}): ${error}`);
+      }
+    }
+    return new ExportManifest(directory, data);
+  }
+
+  get(key: string): PartitionEntry | undefined {
+    return this.data.partitions[key];
+  }
+
+  /**
+   * 同じ内容・同じファイル名で出力済みか（ファイルが消えていれば未出力扱い）
+   */
+  isUnchanged(key: string, file: string, sha256: string): boolean {
+    const entry = this.data.partitions[key];
+    return !!entry && entry.sha256 === sha256 && entry.file === file &&
+      fs.existsSync(path.join(this.directory, file));
+  }
+
+  /**
+   * 照合日時のみ更新（内容は変わっていない）
+   */
+  touch(key: string): void {
+    const entry = this.data.partitions[key];
+    if (entry) entry.checked_at = new Date().toISOString();
+  }
+
+  set(key: string, entry: Omit<PartitionEntry, 'updated_at' | 'checked_at'>): void {
+    const now = new Date().toISOString();
+    this.data.partitions[key] = { ...entry, updated_at: now, checked_at: now };
+  }
+
+  entries(): Array<[string, PartitionEntry]> {
+    return Object.entries(this.data.partitions).sort(([a], [b]) => a.localeCompare(b));
+  }
+
+  /**
+   * マニフェストを保存（一時ファイルに書いてから置き換え）
+   */
+  save(): void {
+    const filepath = path.join(this.directory, MANIFEST_FILE);
+    const tmpPath = `${filepath}.${process.pid}.tmp`;
+    const partitions = Object.fromEntries(this.entries());
+    fs.writeFileSync(tmpPath, JSON.stringify({ ...this.data, partitions }, null, 2), 'utf8');
+    fs.renameSync(tmpPath, filepath);
+  }
+}
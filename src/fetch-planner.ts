@@ -0,0 +1,81 @@
+/**
+ * 月次推移表の取得計画
+ * 要求された出力（推移表・サマリー・内訳）から、必要な試算表の種類・内訳・月だけを取得対象にする
+ */
+
+import { MonthRange, getMonthRanges } from './periods.js';
+
+export type Statement = 'PL' | 'BS';
+
+/**
+ * 月次推移表の出力区分
+ * - pl_report / bs_report: 勘定科目別の推移表
+ * - pl_summary / bs_summary: サマリーのPL項目（売上・費用・営業利益）/ BS項目（資産・負債・純資産）
+ * - summary: サマリーの全項目
+ */
+export type ReportOutput = 'pl_report' | 'bs_report' | 'summary' | 'pl_summary' | 'bs_summary';
+
+export const ALL_REPORT_OUTPUTS: ReportOutput[] = ['bs_report', 'pl_report', 'summary'];
+
+// 出力区分ごとに必要な試算表
+const OUTPUT_STATEMENTS: Record<ReportOutput, Statement[]> = {
+  pl_report: ['PL'],
+  bs_report: ['BS'],
+  pl_summary: ['PL'],
+  bs_summary: ['BS'],
+  summary: ['PL', 'BS']
+};
+
+export interface TrialBalanceFetch {
+  statement: Statement;
+  range: MonthRange;
+  breakdown_display_type?: 'partner';
+}
+
+export interface FetchPlan {
+  outputs: ReportOutput[];
+  statements: Statement[];
+  breakdown: 'partner' | null;
+  months: MonthRange[];
+  requests: TrialBalanceFetch[];
+}
+
+/**
+ * 取得計画を作成
+ * 取引先別の内訳は、推移表に内訳を含める（include_details）場合のみ取得する
+ */
+export function planTrialBalanceFetches(params: {
+  start_year: number;
+  start_month: number;
+  end_year: number;
+  end_month: number;
+  outputs?: ReportOutput[];
+  include_details?: boolean;
+}): FetchPlan {
+  const outputs = params.outputs?.length ? [...new Set(params.outputs)] : ALL_REPORT_OUTPUTS;
+  const needed = new Set(outputs.flatMap(output => OUTPUT_STATEMENTS[output]));
+  const statements = (['PL', 'BS'] as Statement[]).filter(statement => needed.has(statement));
+
+  // 内訳は推移表の行にのみ付くため、推移表を出力しない試算表では取得しない
+  const breakdown = params.include_details ? 'partner' as const : null;
+  const withDetails = new Set<Statement>();
+  if (breakdown) {
+    if (outputs.includes('pl_report')) withDetails.add('PL');
+    if (outputs.includes('bs_report')) withDetails.add('BS');
+  }
+
+  const months = getMonthRanges(params.start_year, params.start_month, params.end_year, params.end_month);
+  const requests = months.flatMap(range => statements.map(statement => ({
+    statement,
+    range,
+    ...(withDetails.has(statement) ? { breakdown_display_type: 'partner' as const } : {})
+  })));
+
+  return {
+    outputs,
+    statements,
+    breakdown: withDetails.size > 0 ? breakdown : null,
+    months,
+    requests
+  };
+}
@@ -0,0 +1,156 @@
+/**
+ * freee API向けHTTPコネクションプール
+ * プロセス内の全FreeeAPIClientで共有し、TLS接続をKeep-Aliveで再利用する
+ *
+ * - 接続先（オリジン）ごとの最大接続数
+ * - 接続タイムアウト・アイドル（Keep-Alive）タイムアウト
+ * - HTTP/2（ALPNでネゴシエートできた場合のみ）
+ * - HTTP/1.1パイプライン数（デフォルト1 = パイプラインなし）
+ */
+
+import { Agent, Pool, fetch as undiciFetch, type Dispatcher } from 'undici';
+
+export interface HttpPoolOptions {
+  connections: number;
+  keepAliveTimeout: number;
+  keepAliveMaxTimeout: number;
+  connectTimeout: number;
+  allowH2: boolean;
+  pipelining: number;
+}
+
+// 接続数は共有スケジューラーの同時実行数（デフォルト8）に合わせる
+export const DEFAULT_HTTP_POOL_OPTIONS: HttpPoolOptions = {
+  connections: 8,
+  keepAliveTimeout: 30 * 1000,
+  keepAliveMaxTimeout: 10 * 60 * 1000,
+  connectTimeout: 10 * 1000,
+  allowH2: true,
+  pipelining: 1
+};
+
+interface OriginStats {
+  pool: Pool;
+  connects: number;
+  disconnects: number;
+  connection_errors: number;
+}
+
+export class HttpPool {
+  readonly options: HttpPoolOptions;
+  private agent: Agent;
+  private origins = new Map<string, OriginStats>();
+  private requests = 0;
+
+  constructor(options: Partial<HttpPoolOptions> = {}) {
+    this.options = { ...DEFAULT_HTTP_POOL_OPTIONS, ...options };
+
+    this.agent = new Agent({
+      connections: this.options.connections,
+      keepAliveTimeout: this.options.keepAliveTimeout,
+      keepAliveMaxTimeout: this.options.keepAliveMaxTimeout,
+      connect: { timeout: this.options.connectTimeout },
+      allowH2: this.options.allowH2,
+      pipelining: this.options.pipelining,
+      factory: (origin, opts) => this.createPool(origin, opts)
+    });
+  }
+
+  /**
+   * プールを経由してfetchを実行
+   */
+  fetch(url: string, init: RequestInit = {}): Promise<Response> {
+    this.requests++;
+    return undiciFetch(url, {
+      ...(init as any),
+      dispatcher: this.agent
+    }) as unknown as Promise<Response>;
+  }
+
+  /**
+   * プールの統計情報を取得
+   * connects がリクエスト数より十分少なければ接続が再利用されている
+   */
+  getStats() {
+    const origins: Record<string, any> = {};
+    let connects = 0;
+
+    for (const [origin, entry] of this.origins) {
+      const { connected, free, pending, queued, running, size } = entry.pool.stats;
+      origins[origin] = {
+        connected,
+        free,
+        pending,
+        queued,
+        running,
+        size,
+        connects: entry.connects,
+        disconnects: entry.disconnects,
+        connection_errors: entry.connection_errors
+      };
+      connects += entry.connects;
+    }
+
+    return {
+      requests: this.requests,
+      connects,
+      reused_requests: Math.max(0, this.requests - connects),
+      origins,
+      options: this.options
+    };
+  }
+
+  /**
+   * 全接続を閉じる（処理中のリクエストは完了を待つ）
+   */
+  async close(): Promise<void> {
+    await this.agent.close();
+    this.origins.clear();
+  }
+
+  // Private methods
+
+  private createPool(origin: string | URL, opts: object): Dispatcher {
+    const key = typeof origin === 'string' ? origin : origin.origin;
+    const pool = new Pool(origin, opts as Pool.Options);
+    const entry: OriginStats = { pool, connects: 0, disconnects: 0, connection_errors: 0 };
+
+    pool.on('connect', () => {
+      entry.connects++;
+    });
+    pool.on('disconnect', () => {
+      entry.disconnects++;
+    });
+    pool.on('connectionError', () => {
+      entry.connection_errors++;
+    });
+
+    this.origins.set(key, entry);
+    return pool;
+  }
+}
+
+let sharedHttpPool: HttpPool | null = null;
+
+/**
+ * プロセス全体で共有するHTTPプールを取得
+ * 環境変数 FREEE_HTTP_CONNECTIONS / FREEE_HTTP_KEEPALIVE_MS / FREEE_HTTP_CONNECT_TIMEOUT_MS /
+ * FREEE_HTTP2 / FREEE_HTTP_PIPELINING で調整可能
+ */
+export function getSharedHttpPool(): HttpPool {
+  if (!sharedHttpPool) {
+    sharedHttpPool = new HttpPool({
+      connections: envNumber('FREEE_HTTP_CONNECTIONS', DEFAULT_HTTP_POOL_OPTIONS.connections),
+      keepAliveTimeout: envNumber('FREEE_HTTP_KEEPALIVE_MS', DEFAULT_HTTP_POOL_OPTIONS.keepAliveTimeout),
+      connectTimeout: envNumber('FREEE_HTTP_CONNECT_TIMEOUT_MS', DEFAULT_HTTP_POOL_OPTIONS.connectTimeout),
+      allowH2: process.env.FREEE_HTTP2 !== '0',
+      pipelining: envNumber('FREEE_HTTP_PIPELINING', DEFAULT_HTTP_POOL_OPTIONS.pipelining)
+    });
+  }
+  return sharedHttpPool;
+}
+
+function envNumber(name: string, fallback: number): number {
+  const value = process.env[name] ? Number(process.env[name]) : NaN;
+  return Number.isFinite(value) && value > 0 ? value : fallback;
+}
@@ -27,9 +27,15 @@ async function main() {
       process.exit(1);
     }
 
-    // MCPサーバーを開始
+    // MCPサーバーを開始（--daemon 指定時はUnixソケットで常駐）
     const server = new FreeeMCPServer(config);
-    await server.start();
+    const daemonOptions = parseDaemonOptions(process.argv.slice(2));
+
+    if (daemonOptions.daemon) {
+      await server.listen(daemonOptions.socketPath);
+    } else {
+      await server.start();
+    }
 
   } catch (error) {
     console.error('❌ Failed to start Freee MCP Server:', error.message);
@@ -45,6 +51,24 @@ async function main() {
   }
 }
 
+// コマンドライン引数を解析（--daemon, --socket <path> / --socket=<path>）
+function parseDaemonOptions(args: string[]): { daemon: boolean; socketPath?: string } {
+  let socketPath: string | undefined;
+
+  for (let i = 0; i < args.length; i++) {
+    if (args[i].startsWith('--socket=')) {
+      socketPath = args[i].slice('--socket='.length);
+    } else if (args[i] === '--socket' && args[i + 1]) {
+      socketPath = args[++i];
+    }
+  }
+
+  return {
+    daemon: args.includes('--daemon') || process.env.FREEE_MCP_DAEMON === '1',
+    socketPath
+  };
+}
+
 // 未処理エラーのハンドリング
 process.on('uncaughtException', (error) => {
   console.error('❌ Uncaught Exception:', error);
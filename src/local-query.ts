@@ -0,0 +1,179 @@
+import { z } from 'zod';
+import { SyncStore, getSharedSyncStore } from './sync-store.js';
+
+/**
+ * 集計軸と deal_lines の列の対応
+ */
+const DIMENSIONS = {
+  partner: 'l.partner_id',
+  account_item: 'l.account_item_id',
+  section: 'l.section_id',
+  item: 'l.item_id',
+  tax_code: 'l.tax_code',
+  month: 'l.month',
+  entry_side: 'l.entry_side',
+  source: 'l.source'
+} as const;
+
+type Dimension = keyof typeof DIMENSIONS;
+
+const DIMENSION_NAMES = Object.keys(DIMENSIONS) as [Dimension, ...Dimension[]];
+
+/**
+ * ローカル集計ツール
+ * sync_company_data で同期した取引・振替伝票の明細行を、freee APIを呼ばずにSQLiteのインデックスで集計する
+ */
+export class LocalQuery {
+  private storePromise: Promise<SyncStore> | null;
+
+  constructor(store?: SyncStore) {
+    this.storePromise = store ? Promise.resolve(store) : null;
+  }
+
+  /**
+   * 明細行を条件で絞り込み、指定した軸で集計
+   */
+  async queryLocalData(params: {
+    company_id: string;
+    group_by: Dimension[];
+    start_date?: string;
+    end_date?: string;
+    account_item_ids?: number[];
+    partner_ids?: number[];
+    section_ids?: number[];
+    item_ids?: number[];
+    tax_codes?: number[];
+    entry_side?: 'debit' | 'credit';
+    source?: 'deal' | 'manual_journal';
+    order_by?: 'amount' | 'count' | 'key';
+    limit?: number;
+  }) {
+    try {
+      const store = await this.getStore();
+      const startedAt = process.hrtime.bigint();
+
+      const where = ['l.company_id = @company_id'];
+      const bindings: Record<string, unknown> = { company_id: params.company_id };
+
+      if (params.start_date) {
+        where.push('l.issue_date >= @start_date');
+        bindings.start_date = params.start_date;
+      }
+      if (params.end_date) {
+        where.push('l.issue_date <= @end_date');
+        bindings.end_date = params.end_date;
+      }
+      if (params.entry_side) {
+        where.push('l.entry_side = @entry_side');
+        bindings.entry_side = params.entry_side;
+      }
+      if (params.source) {
+        where.push('l.source = @source');
+        bindings.source = params.source;
+      }
+
+      const idFilters: Array<[string, number[] | undefined]> = [
+        ['account_item_id', params.account_item_ids],
+        ['partner_id', params.partner_ids],
+        ['section_id', params.section_ids],
+        ['item_id', params.item_ids],
+        ['tax_code', params.tax_codes]
+      ];
+      for (const [column, ids] of idFilters) {
+        if (!ids?.length) continue;
+        const names = ids.map((id, index) => {
+          bindings[`${column}_${index}`] = id;
+          return `@${column}_${index}`;
+        });
+        where.push(`l.${column} IN (${names.join(', ')})`);
+      }
+
+      const groupBy = [...new Set(params.group_by)];
+      const keys = groupBy.map(dimension => `${DIMENSIONS[dimension]} AS ${dimension}`);
+      const groupColumns = groupBy.map(dimension => DIMENSIONS[dimension]);
+
+      // 取引先で集計する場合は同期済みの取引先マスタから名前を引く
+      const partnerName = groupBy.includes('partner')
+        ? `, (SELECT json_extract(p.data, '$.name') FROM records p
+             WHERE p.company_id = l.company_id AND p.resource = 'partners'
+               AND p.id = CAST(l.partner_id AS TEXT)) AS partner_name`
+        : '';
+
+      const orderBy = {
+        amount: 'ABS(net_amount) DESC',
+        count: 'line_count DESC',
+        key: groupColumns.join(', ')
+      }[params.order_by || 'amount'];
+
+      // 貸借を合算すると振替伝票では同じ金額を二重に数えるため、借方 - 貸方 の純額を返す
+      const aggregates = `
+          COUNT(*) AS line_count,
+          SUM(CASE WHEN l.entry_side = 'debit' THEN l.amount ELSE 0 END) AS debit_amount,
+          SUM(CASE WHEN l.entry_side = 'credit' THEN l.amount ELSE 0 END) AS credit_amount,
+          SUM(CASE WHEN l.entry_side = 'debit' THEN l.amount
+                   WHEN l.entry_side = 'credit' THEN -l.amount ELSE 0 END) AS net_amount,
+          SUM(l.vat) AS vat`;
+
+      const sql = `
+        SELECT ${keys.join(', ')}${partnerName},${aggregates}
+        FROM deal_lines l
+        WHERE ${where.join(' AND ')}
+        GROUP BY ${groupColumns.join(', ')}
+        ORDER BY ${orderBy}
+        LIMIT @limit
+      `;
+
+      // 合計は LIMIT で切り捨てた行ではなく、条件に合う全明細行から求める
+      const totalsSql = `
+        SELECT${aggregates},
+          COUNT(DISTINCT json_array(${groupColumns.join(', ')})) AS group_count
+        FROM deal_lines l
+        WHERE ${where.join(' AND ')}
+      `;
+
+      const [totals] = store.query(totalsSql, bindings);
+      const rows = store.query(sql, { ...bindings, limit: params.limit ?? 100 });
+      const elapsedMs = Number(process.hrtime.bigint() - startedAt) / 1e6;
+
+      return {
+        rows,
+        row_count: rows.length,
+        group_by: groupBy,
+        truncated: rows.length < totals.group_count,
+        totals,
+        elapsed_ms: Math.round(elapsedMs * 100) / 100,
+        data_source: store.path,
+        last_synced_at: store.getState(params.company_id, 'deals').last_run_at
+      };
+    } catch (error) {
+      throw new Error(`ローカル集計エラー: ${error}`);
+    }
+  }
+
+  // Private methods
+
+  private async getStore(): Promise<SyncStore> {
+    if (!this.storePromise) {
+      this.storePromise = getSharedSyncStore();
+    }
+    return this.storePromise;
+  }
+}
+
+// MCPツール用のスキーマ定義
+export const LocalQuerySchema = z.object({
+  company_id: z.string().describe('会社ID'),
+  group_by: z.array(z.enum(DIMENSION_NAMES)).min(1).max(3)
+    .describe('集計軸（partner / account_item / section / item / tax_code / month / entry_side / source）'),
+  start_date: z.string().optional().describe('取引日の開始日（YYYY-MM-DD）'),
+  end_date: z.string().optional().describe('取引日の終了日（YYYY-MM-DD）'),
+  account_item_ids: z.array(z.number()).optional().describe('勘定科目IDで絞り込み'),
+  partner_ids: z.array(z.number()).optional().describe('取引先IDで絞り込み'),
+  section_ids: z.array(z.number()).optional().describe('部門IDで絞り込み'),
+  item_ids: z.array(z.number()).optional().describe('品目IDで絞り込み'),
+  tax_codes: z.array(z.number()).optional().describe('税区分コードで絞り込み'),
+  entry_side: z.enum(['debit', 'credit']).optional().describe('貸借で絞り込み'),
+  source: z.enum(['deal', 'manual_journal']).optional().describe('取引または振替伝票のみ'),
+  order_by: z.enum(['amount', 'count', 'key']).optional().describe('並び順（デフォルト: 金額の大きい順）'),
+  limit: z.number().min(1).max(10000).optional().describe('最大行数（デフォルト: 100）')
+});
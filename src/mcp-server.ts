@@ -3,43 +3,51 @@ import { StdioServerTransport } from '@modelcontextprotocol/sdk/server/stdio.js'
 import {
   CallToolRequestSchema,
   ErrorCode,
+  ListResourcesRequestSchema,
+  ListResourceTemplatesRequestSchema,
   ListToolsRequestSchema,
   McpError,
+  ReadResourceRequestSchema,
 } from '@modelcontextprotocol/sdk/types.js';
 import { z } from 'zod';
+import net from 'net';
+import fs from 'fs';
+import path from 'path';
+import os from 'os';
 import { FreeeAPIClient } from './api-client.js';
-import { FreeeConfig, FreeeConfigSchema, MCPTool } from './types.js';
+import { FreeeConfig, FreeeConfigSchema, MCPTool, ToolContext } from './types.js';
 import { MonthlyTrendAnalyzer, MonthlyTrendReportSchema } from './monthly-trend-analyzer.js';
 import { DataExporter, DataUpdateSchema, QuickUpdateSchema } from './data-exporter.js';
-import { ExpenseManager, PendingApprovalsSchema, ApproveExpenseSchema, RejectExpenseSchema, SendBackExpenseSchema, MyExpenseApplicationsSchema, ExpenseStatisticsSchema, BulkApproveSchema } from './expense-manager.js';
+import { DataSync, SyncCompanyDataSchema, SyncStatusSchema } from './data-sync.js';
+import { LocalQuery, LocalQuerySchema } from './local-query.js';
+import { ListResource, collectRows } from './pagination.js';
+import { ExpenseManager, PendingApprovalsSchema, ApproveExpenseSchema, RejectExpenseSchema, SendBackExpenseSchema, MyExpenseApplicationsSchema, ExpenseStatisticsSchema, BulkApproveSchema, BulkRejectSchema, BulkSendBackSchema } from './expense-manager.js';
+import { BulkActionProgress } from './expense-bulk-executor.js';
+import { getSharedExpenseDetailCache } from './expense-detail-cache.js';
+import { InvalidCursorError, ToolOutputFormatter, ToolOutputOptionsSchema } from './tool-output.js';
+import { RESULT_URI_SCHEME, ResourceNotFoundError, ToolResultStore, resultUri } from './result-store.js';
 
 export class FreeeMCPServer {
-  private server: Server;
   private apiClient: FreeeAPIClient;
   private monthlyTrendAnalyzer: MonthlyTrendAnalyzer;
   private dataExporter: DataExporter;
   private expenseManager: ExpenseManager;
+  private dataSync: DataSync;
+  private localQuery: LocalQuery;
   private tools: MCPTool[] = [];
+  private resultStore = ToolResultStore.fromEnv();
+  private toolOutput = ToolOutputFormatter.fromEnv(this.resultStore);
+  private socketServer: net.Server | null = null;
+  private connections = new Set<net.Socket>();
 
   constructor(config: FreeeConfig) {
-    this.server = new Server(
-      {
-        name: 'freee-mcp-scalar',
-        version: '1.0.0',
-      },
-      {
-        capabilities: {
-          tools: {},
-        },
-      }
-    );
-
     this.apiClient = new FreeeAPIClient(config);
     this.monthlyTrendAnalyzer = new MonthlyTrendAnalyzer(config);
     this.dataExporter = new DataExporter(config);
     this.expenseManager = new ExpenseManager(config);
+    this.dataSync = new DataSync(config);
+    this.localQuery = new LocalQuery();
     this.initializeTools();
-    this.setupHandlers();
   }
 
   /**
@@ -75,8 +83,9 @@ export class FreeeMCPServer {
         const now = new Date();
         const endYear = now.getFullYear();
         const endMonth = now.getMonth() + 1;
-        const startDate = new Date(endYear, endMonth - 1 - args.months, 1);
-        
+        // 当月を含めて months ヶ月分
+        const startDate = new Date(endYear, endMonth - args.months, 1);
+
         return await this.monthlyTrendAnalyzer.createMonthlyTrendReport({
           company_id: args.company_id,
           start_year: startDate.getFullYear(),
@@ -100,17 +109,11 @@ export class FreeeMCPServer {
         end_month: z.number().min(1).max(12).describe('End month')
       }),
       handler: async (args: any) => {
-        const result = await this.monthlyTrendAnalyzer.createMonthlyTrendReport(args);
-        return {
-          bs_report: result.bs_report,
-          summary: result.summary.map((s: any) => ({
-            period: s.period,
-            total_assets: s.total_assets,
-            total_liabilities: s.total_liabilities,
-            total_equity: s.total_equity
-          })),
-          metadata: result.metadata
-        };
+        // BSの試算表のみ取得
+        return await this.monthlyTrendAnalyzer.createMonthlyTrendReport({
+          ...args,
+          outputs: ['bs_report', 'bs_summary']
+        });
       }
     });
 
@@ -126,17 +129,11 @@ export class FreeeMCPServer {
         end_month: z.number().min(1).max(12).describe('End month')
       }),
       handler: async (args: any) => {
-        const result = await this.monthlyTrendAnalyzer.createMonthlyTrendReport(args);
-        return {
-          pl_report: result.pl_report,
-          summary: result.summary.map((s: any) => ({
-            period: s.period,
-            revenues: s.revenues,
-            expenses: s.expenses,
-            operating_profit: s.operating_profit
-          })),
-          metadata: result.metadata
-        };
+        // PLの試算表のみ取得
+        return await this.monthlyTrendAnalyzer.createMonthlyTrendReport({
+          ...args,
+          outputs: ['pl_report', 'pl_summary']
+        });
       }
     });
 
@@ -144,17 +141,20 @@ export class FreeeMCPServer {
     this.tools.push({
       name: 'get_companies',
       description: 'Get list of companies accessible to the authenticated user',
-      inputSchema: z.object({}),
-      handler: () => this.apiClient.getCompanies()
+      inputSchema: z.object({
+        bypass_cache: z.boolean().optional().describe('Skip the master data cache and fetch fresh data')
+      }),
+      handler: (params) => this.apiClient.getCompanies({ bypassCache: params.bypass_cache })
     });
 
     this.tools.push({
       name: 'get_company',
       description: 'Get details of a specific company',
       inputSchema: z.object({
-        company_id: z.string().describe('Company ID')
+        company_id: z.string().describe('Company ID'),
+        bypass_cache: z.boolean().optional().describe('Skip the master data cache and fetch fresh data')
       }),
-      handler: (params) => this.apiClient.getCompany(params.company_id)
+      handler: (params) => this.apiClient.getCompany(params.company_id, { bypassCache: params.bypass_cache })
     });
 
     // 取引先
@@ -165,13 +165,14 @@ export class FreeeMCPServer {
         company_id: z.string().describe('Company ID'),
         keyword: z.string().optional().describe('Search keyword'),
         offset: z.number().optional().describe('Offset for pagination'),
-        limit: z.number().optional().describe('Limit for pagination')
+        limit: z.number().optional().describe('Limit for pagination'),
+        bypass_cache: z.boolean().optional().describe('Skip the master data cache and fetch fresh data')
       }),
       handler: (params) => this.apiClient.getPartners(params.company_id, {
         keyword: params.keyword,
         offset: params.offset,
         limit: params.limit
-      })
+      }, { bypassCache: params.bypass_cache })
     });
 
     // 勘定科目
@@ -180,11 +181,12 @@ export class FreeeMCPServer {
       description: 'Get list of account items (chart of accounts)',
       inputSchema: z.object({
         company_id: z.string().describe('Company ID'),
-        base_date: z.string().optional().describe('Base date (YYYY-MM-DD)')
+        base_date: z.string().optional().describe('Base date (YYYY-MM-DD)'),
+        bypass_cache: z.boolean().optional().describe('Skip the master data cache and fetch fresh data')
       }),
       handler: (params) => this.apiClient.getAccountItems(params.company_id, {
         base_date: params.base_date
-      })
+      }, { bypassCache: params.bypass_cache })
     });
 
     // 取引
@@ -334,13 +336,14 @@ export class FreeeMCPServer {
         company_id: z.string().describe('Company ID'),
         start_date: z.string().describe('Start date (YYYY-MM-DD)'),
         end_date: z.string().describe('End date (YYYY-MM-DD)'),
-        breakdown_display_type: z.enum(['partner', 'item', 'section', 'tag']).optional().describe('Breakdown type')
+        breakdown_display_type: z.enum(['partner', 'item', 'section', 'tag']).optional().describe('Breakdown type'),
+        bypass_cache: z.boolean().optional().describe('Skip the closed-month trial balance cache and fetch fresh data')
       }),
       handler: (params) => this.apiClient.getTrialPL(params.company_id, {
         start_date: params.start_date,
         end_date: params.end_date,
         breakdown_display_type: params.breakdown_display_type
-      })
+      }, { bypassCache: params.bypass_cache })
     });
 
     this.tools.push({
@@ -350,13 +353,14 @@ export class FreeeMCPServer {
         company_id: z.string().describe('Company ID'),
         start_date: z.string().describe('Start date (YYYY-MM-DD)'),
         end_date: z.string().describe('End date (YYYY-MM-DD)'),
-        breakdown_display_type: z.enum(['partner', 'item', 'section', 'tag']).optional().describe('Breakdown type')
+        breakdown_display_type: z.enum(['partner', 'item', 'section', 'tag']).optional().describe('Breakdown type'),
+        bypass_cache: z.boolean().optional().describe('Skip the closed-month trial balance cache and fetch fresh data')
       }),
       handler: (params) => this.apiClient.getTrialBS(params.company_id, {
         start_date: params.start_date,
         end_date: params.end_date,
         breakdown_display_type: params.breakdown_display_type
-      })
+      }, { bypassCache: params.bypass_cache })
     });
 
     // その他
@@ -384,9 +388,10 @@ export class FreeeMCPServer {
       name: 'get_taxes',
       description: 'Get list of tax codes',
       inputSchema: z.object({
-        company_id: z.string().describe('Company ID')
+        company_id: z.string().describe('Company ID'),
+        bypass_cache: z.boolean().optional().describe('Skip the master data cache and fetch fresh data')
       }),
-      handler: (params) => this.apiClient.getTaxes(params.company_id)
+      handler: (params) => this.apiClient.getTaxes(params.company_id, { bypassCache: params.bypass_cache })
     });
 
     this.tools.push({
@@ -394,11 +399,12 @@ export class FreeeMCPServer {
       description: 'Get list of segments (departments/projects)',
       inputSchema: z.object({
         company_id: z.string().describe('Company ID'),
-        segment_tag: z.enum(['1', '2', '3']).optional().describe('Segment tag filter')
+        segment_tag: z.enum(['1', '2', '3']).optional().describe('Segment tag filter'),
+        bypass_cache: z.boolean().optional().describe('Skip the master data cache and fetch fresh data')
       }),
       handler: (params) => this.apiClient.getSegments(params.company_id, {
         segment_tag: params.segment_tag
-      })
+      }, { bypassCache: params.bypass_cache })
     });
 
     this.tools.push({
@@ -408,13 +414,14 @@ export class FreeeMCPServer {
         company_id: z.string().describe('Company ID'),
         keyword: z.string().optional().describe('Search keyword'),
         offset: z.number().optional().describe('Offset for pagination'),
-        limit: z.number().optional().describe('Limit for pagination')
+        limit: z.number().optional().describe('Limit for pagination'),
+        bypass_cache: z.boolean().optional().describe('Skip the master data cache and fetch fresh data')
       }),
       handler: (params) => this.apiClient.getItems(params.company_id, {
         keyword: params.keyword,
         offset: params.offset,
         limit: params.limit
-      })
+      }, { bypassCache: params.bypass_cache })
     });
 
     this.tools.push({
@@ -430,10 +437,192 @@ export class FreeeMCPServer {
       })
     });
 
+    // 全件取得ツール（ページングを自動処理し、全行を rows 配列として返す）
+    // イテレーターは max_rows より1件多く取得し、上限を超える行があったかを truncated で返す
+    const fetchAllOptions = {
+      max_rows: z.number().min(1).max(100000).default(10000).describe('Maximum number of rows to fetch')
+    };
+
+    this.tools.push({
+      name: 'get_deals_all',
+      description: 'Get all deals matching the filters, paging automatically. Rows are returned in a rows array alongside summary fields.',
+      inputSchema: z.object({
+        company_id: z.string().describe('Company ID'),
+        partner_id: z.string().optional().describe('Partner ID filter'),
+        account_item_id: z.string().optional().describe('Account item ID filter'),
+        start_issue_date: z.string().optional().describe('Start issue date (YYYY-MM-DD)'),
+        end_issue_date: z.string().optional().describe('End issue date (YYYY-MM-DD)'),
+        type: z.enum(['income', 'expense']).optional().describe('Deal type'),
+        ...fetchAllOptions
+      }),
+      handler: (params) => this.fetchAll('deals', params, this.apiClient.iterateDeals(params.company_id, {
+        partner_id: params.partner_id,
+        account_item_id: params.account_item_id,
+        start_issue_date: params.start_issue_date,
+        end_issue_date: params.end_issue_date,
+        type: params.type
+      }, { maxRows: params.max_rows + 1 }))
+    });
+
+    this.tools.push({
+      name: 'get_partners_all',
+      description: 'Get all partners, paging automatically. Rows are returned in a rows array alongside summary fields.',
+      inputSchema: z.object({
+        company_id: z.string().describe('Company ID'),
+        keyword: z.string().optional().describe('Search keyword'),
+        ...fetchAllOptions
+      }),
+      handler: (params) => this.fetchAll('partners', params, this.apiClient.iteratePartners(params.company_id, {
+        keyword: params.keyword
+      }, { maxRows: params.max_rows + 1 }))
+    });
+
+    this.tools.push({
+      name: 'get_invoices_all',
+      description: 'Get all invoices matching the filters, paging automatically. Rows are returned in a rows array alongside summary fields.',
+      inputSchema: z.object({
+        company_id: z.string().describe('Company ID'),
+        partner_id: z.string().optional().describe('Partner ID filter'),
+        issue_date_start: z.string().optional().describe('Start issue date (YYYY-MM-DD)'),
+        issue_date_end: z.string().optional().describe('End issue date (YYYY-MM-DD)'),
+        invoice_status: z.string().optional().describe('Invoice status filter'),
+        ...fetchAllOptions
+      }),
+      handler: (params) => this.fetchAll('invoices', params, this.apiClient.iterateInvoices(params.company_id, {
+        partner_id: params.partner_id,
+        issue_date_start: params.issue_date_start,
+        issue_date_end: params.issue_date_end,
+        invoice_status: params.invoice_status
+      }, { maxRows: params.max_rows + 1 }))
+    });
+
+    this.tools.push({
+      name: 'get_manual_journals_all',
+      description: 'Get all manual journals matching the filters, paging automatically. Rows are returned in a rows array alongside summary fields.',
+      inputSchema: z.object({
+        company_id: z.string().describe('Company ID'),
+        start_issue_date: z.string().optional().describe('Start issue date (YYYY-MM-DD)'),
+        end_issue_date: z.string().optional().describe('End issue date (YYYY-MM-DD)'),
+        entry_side: z.enum(['debit', 'credit']).optional().describe('Entry side filter'),
+        ...fetchAllOptions
+      }),
+      handler: (params) => this.fetchAll('manual_journals', params, this.apiClient.iterateManualJournals(params.company_id, {
+        start_issue_date: params.start_issue_date,
+        end_issue_date: params.end_issue_date,
+        entry_side: params.entry_side
+      }, { maxRows: params.max_rows + 1 }))
+    });
+
+    this.tools.push({
+      name: 'get_items_all',
+      description: 'Get all items, paging automatically. Rows are returned in a rows array alongside summary fields.',
+      inputSchema: z.object({
+        company_id: z.string().describe('Company ID'),
+        keyword: z.string().optional().describe('Search keyword'),
+        ...fetchAllOptions
+      }),
+      handler: (params) => this.fetchAll('items', params, this.apiClient.iterateItems(params.company_id, {
+        keyword: params.keyword
+      }, { maxRows: params.max_rows + 1 }))
+    });
+
+    this.tools.push({
+      name: 'get_expense_applications_all',
+      description: 'Get all expense applications matching the filters, paging automatically. Rows are returned in a rows array alongside summary fields.',
+      inputSchema: z.object({
+        company_id: z.string().describe('Company ID'),
+        start_application_date: z.string().optional().describe('Start application date (YYYY-MM-DD)'),
+        end_application_date: z.string().optional().describe('End application date (YYYY-MM-DD)'),
+        application_status: z.string().optional().describe('Application status filter'),
+        ...fetchAllOptions
+      }),
+      handler: (params) => this.fetchAll('expense_applications', params, this.apiClient.iterateExpenseApplications(params.company_id, {
+        start_application_date: params.start_application_date,
+        end_application_date: params.end_application_date,
+        application_status: params.application_status
+      }, { maxRows: params.max_rows + 1 }))
+    });
+
+    // APIクライアント統計
+    this.tools.push({
+      name: 'get_api_client_stats',
+      description: 'Get statistics of the shared API request scheduler (rate limit tokens, queue lengths, waits, 429 backoffs), HTTP connection pool (open/idle sockets, new connections vs. reused requests), master data cache (hit rate, entries, evictions), closed-month trial balance store, expense application detail cache and coalescing of identical in-flight GET requests (hits, misses, in flight)',
+      inputSchema: z.object({}),
+      handler: async () => ({
+        ...this.apiClient.getStats(),
+        expense_detail_cache: getSharedExpenseDetailCache().getStats(),
+        tool_output: this.toolOutput.getStats(),
+        result_store: this.resultStore.getStats()
+      })
+    });
+
+    this.tools.push({
+      name: 'invalidate_trial_balance_cache',
+      description: 'Delete stored closed-month trial balances so they are fetched again from freee (omit year/month to clear every month of the company)',
+      inputSchema: z.object({
+        company_id: z.string().describe('Company ID'),
+        year: z.number().optional().describe('Year to invalidate'),
+        month: z.number().min(1).max(12).optional().describe('Month to invalidate')
+      }),
+      handler: async (params) => ({
+        company_id: params.company_id,
+        removed_files: await this.apiClient.invalidateTrialBalanceCache(params.company_id, params.year, params.month)
+      })
+    });
+
+    // ローカル同期ツール
+    this.tools.push({
+      name: 'sync_company_data',
+      description: 'Mirror deals, manual journals, invoices and partners of a company into the local SQLite store. Deals are fetched incrementally by update date; a periodic full pass removes records deleted in freee.',
+      inputSchema: SyncCompanyDataSchema,
+      handler: async (args: any) => {
+        try {
+          return await this.dataSync.syncCompanyData(args);
+        } catch (error) {
+          throw new McpError(
+            ErrorCode.InternalError,
+            `同期エラー: ${error}`
+          );
+        }
+      }
+    });
+
+    this.tools.push({
+      name: 'get_sync_status',
+      description: 'Get local sync state (watermarks, record counts, last run statistics) per company and resource',
+      inputSchema: SyncStatusSchema,
+      handler: async (args: any) => {
+        try {
+          return await this.dataSync.getSyncStatus(args);
+        } catch (error) {
+          throw new McpError(
+            ErrorCode.InternalError,
+            `同期状態取得エラー: ${error}`
+          );
+        }
+      }
+    });
+
+    this.tools.push({
+      name: 'query_local_data',
+      description: 'Aggregate synced deal and manual journal lines locally (group by partner, account item, section, item, tax code or month with date/ID filters) without calling the freee API. Run sync_company_data first.',
+      inputSchema: LocalQuerySchema,
+      handler: async (args: any) => {
+        try {
+          return await this.localQuery.queryLocalData(args);
+        } catch (error) {
+          throw new McpError(
+            ErrorCode.InternalError,
+            `ローカル集計エラー: ${error}`
+          );
+        }
+      }
+    });
+
     // データ更新ツール（完全版）
     this.tools.push({
       name: 'update_freee_data',
-      description: 'Update exported data directory with latest Freee data (account items, partners, trial balance). Old files are automatically removed.',
+      description: 'Update exported data directory with latest Freee data (account items, partners, monthly trial balance partitions). Only partitions whose content changed are rewritten.',
       inputSchema: DataUpdateSchema,
       handler: async (args: any) => {
         try {
@@ -565,9 +754,11 @@ export class FreeeMCPServer {
       name: 'bulk_approve_expenses',
       description: 'Bulk approve expense applications with conditions (amount limit, specific applicants)',
       inputSchema: BulkApproveSchema,
-      handler: async (args: any) => {
+      handler: async (args: any, context?: ToolContext) => {
         try {
-          return await this.expenseManager.bulkApproveExpenses(args);
+          return await this.expenseManager.bulkApproveExpenses(args, {
+            onProgress: progress => this.reportBulkProgress(context, progress)
+          });
         } catch (error) {
           throw new McpError(
             ErrorCode.InternalError,
@@ -576,22 +767,143 @@ export class FreeeMCPServer {
         }
       }
     });
+
+    this.tools.push({
+      name: 'bulk_reject_expenses',
+      description: 'Reject multiple expense applications with the same reason. Applications already rejected are skipped and transient failures are retried; progress is reported per application.',
+      inputSchema: BulkRejectSchema,
+      handler: async (args: any, context?: ToolContext) => {
+        try {
+          return await this.expenseManager.bulkRejectExpenses(args, {
+            onProgress: progress => this.reportBulkProgress(context, progress)
+          });
+        } catch (error) {
+          throw new McpError(
+            ErrorCode.InternalError,
+            `一括却下エラー: ${error}`
+          );
+        }
+      }
+    });
+
+    this.tools.push({
+      name: 'bulk_send_back_expenses',
+      description: 'Send back multiple expense applications for revision with the same comment. Applications already sent back are skipped and transient failures are retried; progress is reported per application.',
+      inputSchema: BulkSendBackSchema,
+      handler: async (args: any, context?: ToolContext) => {
+        try {
+          return await this.expenseManager.bulkSendBackExpenses(args, {
+            onProgress: progress => this.reportBulkProgress(context, progress)
+          });
+        } catch (error) {
+          throw new McpError(
+            ErrorCode.InternalError,
+            `一括差戻しエラー: ${error}`
+          );
+        }
+      }
+    });
+  }
+
+  /**
+   * 一括操作の1件ごとの結果を進捗通知として送信
+   */
+  private reportBulkProgress(context: ToolContext | undefined, progress: BulkActionProgress): void {
+    const { item } = progress;
+    const label = item.outcome === 'failed' ? `失敗: ${item.error}` : item.outcome === 'skipped' ? `スキップ: ${item.reason}` : '完了';
+    context?.reportProgress?.(progress.completed, progress.total, `${item.id} ${label}`);
+  }
+
+  /**
+   * 接続ごとのMCPサーバーを作成
+   * ツール・APIクライアント・キャッシュは全接続で共有する
+   */
+  private createServer(): Server {
+    const server = new Server(
+      {
+        name: 'freee-mcp-scalar',
+        version: '1.0.0',
+      },
+      {
+        capabilities: {
+          tools: {},
+          resources: {},
+        },
+      }
+    );
+
+    this.setupHandlers(server);
+    return server;
   }
 
   /**
    * MCPハンドラーを設定
    */
-  private setupHandlers(): void {
-    this.server.setRequestHandler(ListToolsRequestSchema, async () => ({
+  private setupHandlers(server: Server): void {
+    server.setRequestHandler(ListToolsRequestSchema, async () => ({
       tools: this.tools.map(tool => ({
         name: tool.name,
         description: tool.description,
-        inputSchema: tool.inputSchema,
+        inputSchema: tool.inputSchema instanceof z.ZodObject
+          ? tool.inputSchema.merge(ToolOutputOptionsSchema)
+          : tool.inputSchema,
       })),
     }));
 
-    this.server.setRequestHandler(CallToolRequestSchema, async (request) => {
+    // 大きなツール結果はリソースとして保存され、セクション・行範囲単位で読み出せる
+    server.setRequestHandler(ListResourcesRequestSchema, async () => ({
+      resources: this.resultStore.list().map(entry => ({
+        uri: resultUri(entry.id),
+        name: `${entry.tool} (${new Date(entry.createdAt).toISOString()})`,
+        description: `Result of ${entry.tool}. Sections: ${
+          this.resultStore.sections(entry).map(section => section.name).join(', ') || '-'
+        }`,
+        mimeType: 'application/json',
+      })),
+    }));
+
+    server.setRequestHandler(ListResourceTemplatesRequestSchema, async () => ({
+      resourceTemplates: [
+        {
+          uriTemplate: `${RESULT_URI_SCHEME}://{result_id}/{section}{?offset,limit}`,
+          name: 'Stored tool result section',
+          description: 'A section (e.g. bs_report, pl_report, summary) of a large tool result. Array sections can be read by row range with offset/limit.',
+          mimeType: 'application/json',
+        },
+      ],
+    }));
+
+    server.setRequestHandler(ReadResourceRequestSchema, async (request) => {
+      const { uri } = request.params;
+      try {
+        return {
+          contents: [
+            {
+              uri,
+              mimeType: 'application/json',
+              text: JSON.stringify(this.resultStore.read(uri)) ?? 'null',
+            },
+          ],
+        };
+      } catch (error) {
+        if (error instanceof ResourceNotFoundError) {
+          throw new McpError(ErrorCode.InvalidParams, error.message);
+        }
+        throw new McpError(ErrorCode.InternalError, `Resource read failed: ${error.message}`);
+      }
+    });
+
+    server.setRequestHandler(CallToolRequestSchema, async (request) => {
       const { name, arguments: args } = request.params;
+      const progressToken = request.params._meta?.progressToken;
+      const context: ToolContext = progressToken === undefined ? {} : {
+        reportProgress: (progress, total, message) => {
+          server.notification({
+            method: 'notifications/progress',
+            params: { progressToken, progress, total, ...(message && { message }) }
+          }).catch(() => undefined);
+        }
+      };
       
       const tool = this.tools.find(t => t.name === name);
       if (!tool) {
@@ -599,21 +911,34 @@ export class FreeeMCPServer {
       }
 
       try {
+        // 出力オプション（形式・項目の絞り込み・ページ分割）はツール自身の引数とは別に解釈
+        const output = ToolOutputOptionsSchema.parse(args ?? {});
+
+        // 続きのページは保持している結果から返す（ツールは再実行しない）
+        if (output.cursor) {
+          return {
+            content: [{ type: 'text', text: this.toolOutput.continue(name, output.cursor) }],
+          };
+        }
+
         // パラメータの検証
         const validatedArgs = tool.inputSchema.parse(args);
         
         // ツールの実行
-        const result = await tool.handler(validatedArgs);
-        
+        const result = await tool.handler(validatedArgs, context);
+
         return {
           content: [
             {
               type: 'text',
-              text: JSON.stringify(result, null, 2),
+              text: this.toolOutput.format(name, result, output),
             },
           ],
         };
       } catch (error) {
+        if (error instanceof InvalidCursorError) {
+          throw new McpError(ErrorCode.InvalidParams, error.message);
+        }
         if (error instanceof z.ZodError) {
           throw new McpError(
             ErrorCode.InvalidParams,
@@ -634,9 +959,130 @@ export class FreeeMCPServer {
    */
   async start(): Promise<void> {
     const transport = new StdioServerTransport();
-    await this.server.connect(transport);
+    await this.createServer().connect(transport);
     console.error('🚀 Freee MCP Server started');
   }
+
+  /**
+   * デーモンモードで開始（Unixドメインソケットで複数クライアントを受け付ける）
+   */
+  async listen(socketPath: string = FreeeMCPServer.defaultSocketPath()): Promise<void> {
+    await fs.promises.mkdir(path.dirname(socketPath), { recursive: true });
+    await this.removeStaleSocket(socketPath);
+
+    this.socketServer = net.createServer((socket) => this.handleConnection(socket));
+
+    await new Promise<void>((resolve, reject) => {
+      this.socketServer!.once('error', reject);
+      this.socketServer!.listen(socketPath, () => {
+        this.socketServer!.off('error', reject);
+        resolve();
+      });
+    });
+
+    // トークンを扱うため所有者のみ接続可能にする
+    await fs.promises.chmod(socketPath, 0o600);
+    process.once('exit', () => {
+      try {
+        fs.unlinkSync(socketPath);
+      } catch {
+        // 既に削除済み
+      }
+    });
+
+    this.socketServer.on('error', (error) => {
+      console.error('❌ Daemon socket error:', error.message);
+    });
+
+    console.error(`🚀 Freee MCP Server daemon listening on ${socketPath}`);
+  }
+
+  /**
+   * デーモンを停止
+   */
+  async stop(): Promise<void> {
+    for (const socket of this.connections) {
+      socket.destroy();
+    }
+
+    if (this.socketServer) {
+      const server = this.socketServer;
+      this.socketServer = null;
+      await new Promise<void>((resolve) => server.close(() => resolve()));
+    }
+  }
+
+  /**
+   * デフォルトのソケットパス（FREEE_MCP_SOCKETで上書き可能）
+   */
+  static defaultSocketPath(): string {
+    return process.env.FREEE_MCP_SOCKET ||
+      path.join(os.homedir(), '.config', 'freee-mcp', 'mcp.sock');
+  }
+
+  /**
+   * ページイテレーターを読み切って全行を rows 配列で返す
+   */
+  private async fetchAll(
+    resource: ListResource,
+    params: { max_rows: number },
+    pages: AsyncIterable<unknown[]>
+  ) {
+    try {
+      return await collectRows(pages, {
+        resource,
+        maxRows: params.max_rows
+      });
+    } catch (error) {
+      throw new McpError(
+        ErrorCode.InternalError,
+        `全件取得エラー (${resource}): ${error}`
+      );
+    }
+  }
+
+  private handleConnection(socket: net.Socket): void {
+    this.connections.add(socket);
+
+    // 接続ごとにSDKのServerを作成し、ソケットをstdio互換のストリームとして使う
+    const server = this.createServer();
+    const transport = new StdioServerTransport(socket, socket);
+
+    socket.on('error', (error) => {
+      console.error('⚠️ Client connection error:', error.message);
+    });
+
+    socket.on('close', () => {
+      this.connections.delete(socket);
+      server.close().catch(() => undefined);
+    });
+
+    server.connect(transport).catch((error) => {
+      console.error('❌ Failed to attach client:', error.message);
+      socket.destroy();
+    });
+  }
+
+  /**
+   * 前回のデーモンが残したソケットファイルを削除（稼働中なら起動を中止）
+   */
+  private async removeStaleSocket(socketPath: string): Promise<void> {
+    if (!fs.existsSync(socketPath)) return;
+
+    const inUse = await new Promise<boolean>((resolve) => {
+      const probe = net.connect(socketPath);
+      probe.once('connect', () => {
+        probe.destroy();
+        resolve(true);
+      });
+      probe.once('error', () => resolve(false));
+    });
+
+    if (inUse) {
+      throw new Error(`Another Freee MCP daemon is already listening on ${socketPath}`);
+    }
+    await fs.promises.unlink(socketPath);
+  }
 }
 
 // 設定を読み込んでサーバーを起動
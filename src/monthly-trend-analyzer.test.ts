@@ -0,0 +1,293 @@
+import { describe, expect, it } from 'vitest';
+import { MonthlyTrendAnalyzer } from './monthly-trend-analyzer.js';
+import { getMonthRanges } from './periods.js';
+
+/**
+ * 列指向マトリクス版の月次推移表が、従来の実装（残高行をオブジェクトとして保持し、
+ * 勘定科目ごとに Map で集約してからソートする方式）と同じ結果になることを確認する
+ */
+
+const BS_CATEGORIES = [
+  ['資産', '流動資産', '現金・預金'],
+  ['資産', '流動資産', '売上債権'],
+  ['資産', '固定資産', '有形固定資産'],
+  ['資産', '繰延資産', '繰延資産'],
+  ['負債及び純資産', '負債', '流動負債'],
+  ['負債及び純資産', '負債', '固定負債'],
+  ['負債及び純資産', '純資産', '株主資本'],
+  ['その他', '', '']
+];
+const PL_CATEGORIES = ['売上高', '当期商品仕入', '販売管理費', '営業外収益', '営業外費用', '特別利益', '法人税等', 'その他'];
+// 同順位（同じ表示順序・コード・名前）を作るため、コードと名前は少ない候補から選ぶ
+const CODES = ['', '100', '100', '205', 'abc', '3000'];
+const NAMES = ['現金', '普通預金', '売掛金', '買掛金', '売上高', '仕入高', '給料手当', '地代家賃'];
+
+type Random = () => number;
+
+function seededRandom(seed: number): Random {
+  return () => {
+    seed = (seed + 0x6d2b79f5) | 0;
+    let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+    t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+function pick<T>(random: Random, values: readonly T[]): T {
+  return values[Math.floor(random() * values.length)];
+}
+
+function shuffle<T>(random: Random, values: T[]): T[] {
+  for (let i = values.length - 1; i > 0; i--) {
+    const j = Math.floor(random() * (i + 1));
+    [values[i], values[j]] = [values[j], values[i]];
+  }
+  return values;
+}
+
+function amount(random: Random): number {
+  return Math.round((random() - 0.3) * 1_000_000);
+}
+
+/**
+ * 勘定科目マスタと、月 × 試算表種別ごとのレスポンスを生成
+ * 月によって現れない勘定科目・名称変更・マスタにない勘定科目・合計行を含める
+ */
+function generateFixture(seed: number, months: number, accountCount: number) {
+  const random = seededRandom(seed);
+  const end = 2015 * 12 + 3 + months - 1; // 2015年4月から months か月
+  const ranges = getMonthRanges(2015, 4, Math.floor(end / 12), (end % 12) + 1);
+
+  const accounts = Array.from({ length: accountCount }, (_, index) => {
+    const bs = pick(random, BS_CATEGORIES);
+    return {
+      id: 1000 + index,
+      name: pick(random, NAMES),
+      renamed: random() < 0.1 ? `${pick(random, NAMES)}（旧）` : undefined,
+      code: pick(random, CODES),
+      account_category: pick(random, PL_CATEGORIES),
+      categories: [...bs, '']
+    };
+  });
+  // 1割の勘定科目はマスタにない
+  const accountItems = accounts.filter(() => random() >= 0.1);
+
+  const balances = (index: number, statement: 'PL' | 'BS') => {
+    const rows: any[] = shuffle(random, accounts.filter(() => random() < 0.8)).map(account => ({
+      account_item_id: account.id,
+      account_item_name: account.renamed && index >= ranges.length / 2 ? account.renamed : account.name,
+      debit_amount: Math.abs(amount(random)),
+      credit_amount: Math.abs(amount(random)),
+      closing_balance: amount(random)
+    }));
+    rows.push({ account_item_name: `${statement}合計`, total_line: true, closing_balance: amount(random) });
+    rows.push({ account_item_id: 9999, account_item_name: '', closing_balance: amount(random) });
+    return rows;
+  };
+
+  const responses = new Map<string, any[]>();
+  ranges.forEach((range, index) => {
+    responses.set(`PL ${range.start_date}`, balances(index, 'PL'));
+    responses.set(`BS ${range.start_date}`, balances(index, 'BS'));
+  });
+
+  return { random, ranges, accountItems, responses };
+}
+
+/**
+ * 試算表APIの代わりに、生成したレスポンスをランダムな遅延で返す（取り込み順が月順にならない）
+ */
+function createAnalyzer(fixture: ReturnType<typeof generateFixture>): MonthlyTrendAnalyzer {
+  const delay = () => new Promise(resolve => setTimeout(resolve, Math.floor(fixture.random() * 3)));
+  const analyzer = Object.create(MonthlyTrendAnalyzer.prototype);
+  analyzer.apiClient = {
+    getAccountItems: async () => ({ account_items: fixture.accountItems }),
+    getTrialPL: async (_companyId: string, params: { start_date: string }) => {
+      await delay();
+      return { trial_pl: { balances: fixture.responses.get(`PL ${params.start_date}`) } };
+    },
+    getTrialBS: async (_companyId: string, params: { start_date: string }) => {
+      await delay();
+      return { trial_bs: { balances: fixture.responses.get(`BS ${params.start_date}`) } };
+    }
+  };
+  return analyzer;
+}
+
+// 従来の実装（マトリクス導入前）
+
+function referenceTrialBalanceData(fixture: ReturnType<typeof generateFixture>) {
+  const data: any[] = [];
+  for (const range of fixture.ranges) {
+    for (const reportType of ['PL', 'BS']) {
+      for (const balance of fixture.responses.get(`${reportType} ${range.start_date}`) || []) {
+        if (!balance.total_line && balance.account_item_name) {
+          data.push({ ...balance, period: range.start_date, report_type: reportType });
+        }
+      }
+    }
+  }
+  return data;
+}
+
+function referenceAccountItems(accountItems: any[]) {
+  return accountItems.map((item: any) => ({
+    id: item.id,
+    name: item.name,
+    code: item.code || '',
+    category: item.account_category,
+    major_category: item.categories?.[0] || '',
+    major_category2: item.categories?.[1] || '',
+    middle_category: item.categories?.[2] || '',
+    minor_category: item.categories?.[3] || ''
+  }));
+}
+
+function referenceSort(result: any[]) {
+  result.sort((a, b) => {
+    if (a.sort_key !== b.sort_key) return a.sort_key.localeCompare(b.sort_key);
+    if (a.account_code !== b.account_code) {
+      const codeA = parseInt(a.account_code) || 999999;
+      const codeB = parseInt(b.account_code) || 999999;
+      return codeA - codeB;
+    }
+    return a.account_name.localeCompare(b.account_name);
+  });
+  return result.map(({ sort_key, ...rest }) => rest);
+}
+
+function referenceBSReport(trialBalanceData: any[], accountItems: any[]) {
+  const bsOrder: { [key: string]: string } = {
+    '資産,流動資産,現金・預金': '01',
+    '資産,流動資産,売上債権': '02',
+    '資産,流動資産,棚卸資産': '03',
+    '資産,流動資産,他流動資産': '04',
+    '資産,固定資産,有形固定資産': '05',
+    '資産,固定資産,無形固定資産': '06',
+    '資産,固定資産,投資その他の資産': '07',
+    '資産,繰延資産,繰延資産': '08',
+    '負債及び純資産,負債,流動負債': '20',
+    '負債及び純資産,負債,固定負債': '21',
+    '負債及び純資産,純資産,株主資本': '30',
+    '負債及び純資産,純資産,評価・換算差額等': '31',
+    '負債及び純資産,純資産,新株予約権': '32',
+  };
+  const accountMap = new Map(accountItems.map(item => [item.id, item]));
+  const groupedData = new Map();
+
+  for (const item of trialBalanceData.filter(item => item.report_type === 'BS')) {
+    const key = `${item.account_item_id}_${item.account_item_name}`;
+    if (!groupedData.has(key)) {
+      const accountInfo: any = accountMap.get(item.account_item_id) || {};
+      groupedData.set(key, {
+        account_id: item.account_item_id,
+        account_name: item.account_item_name,
+        account_code: accountInfo.code || '',
+        major_category: accountInfo.major_category || '',
+        major_category2: accountInfo.major_category2 || '',
+        middle_category: accountInfo.middle_category || '',
+        minor_category: accountInfo.minor_category || '',
+        periods: new Map()
+      });
+    }
+    groupedData.get(key).periods.set(item.period, item.closing_balance || 0);
+  }
+
+  return referenceSort(Array.from(groupedData.values()).map(item => ({
+    ...item,
+    sort_key: bsOrder[`${item.major_category},${item.major_category2},${item.middle_category}`] || '99',
+    periods: Object.fromEntries(item.periods)
+  })));
+}
+
+function referencePLReport(trialBalanceData: any[], accountItems: any[]) {
+  const plOrder: { [key: string]: string } = {
+    '売上高': '01',
+    '当期商品仕入': '02',
+    '販売管理費': '03',
+    '営業外収益': '04',
+    '営業外費用': '05',
+    '特別利益': '06',
+    '特別損失': '07',
+    '法人税等': '08',
+  };
+  const accountMap = new Map(accountItems.map(item => [item.id, item]));
+  const groupedData = new Map();
+
+  for (const item of trialBalanceData.filter(item => item.report_type === 'PL')) {
+    const key = `${item.account_item_id}_${item.account_item_name}`;
+    if (!groupedData.has(key)) {
+      const accountInfo: any = accountMap.get(item.account_item_id) || {};
+      groupedData.set(key, {
+        account_id: item.account_item_id,
+        account_name: item.account_item_name,
+        account_code: accountInfo.code || '',
+        account_category: accountInfo.category || '',
+        periods: new Map()
+      });
+    }
+    groupedData.get(key).periods.set(item.period, (item.credit_amount || 0) - (item.debit_amount || 0));
+  }
+
+  return referenceSort(Array.from(groupedData.values()).map(item => ({
+    ...item,
+    sort_key: plOrder[item.account_category] || '99',
+    periods: Object.fromEntries(item.periods)
+  })));
+}
+
+function referenceFinancialSummary(bsReport: any[], plReport: any[]) {
+  const periods = new Set<string>();
+  [...bsReport, ...plReport].forEach(item => {
+    Object.keys(item.periods).forEach(period => periods.add(period));
+  });
+
+  const sum = (report: any[], match: (item: any) => boolean, period: string, absolute = false) =>
+    report.filter(match).reduce((total, item) => {
+      const value = item.periods[period] || 0;
+      return total + (absolute ? Math.abs(value) : value);
+    }, 0);
+
+  return Array.from(periods).sort().map(period => {
+    const revenues = sum(plReport, item => item.account_category === '売上高', period);
+    const expenses = sum(plReport, item => ['販売管理費', '当期商品仕入'].includes(item.account_category), period, true);
+    return {
+      period,
+      revenues,
+      expenses,
+      operating_profit: revenues - expenses,
+      total_assets: sum(bsReport, item => item.major_category === '資産', period),
+      total_liabilities: sum(bsReport, item => item.major_category2 === '負債', period, true),
+      total_equity: sum(bsReport, item => item.major_category2 === '純資産', period)
+    };
+  });
+}
+
+describe('MonthlyTrendAnalyzer', () => {
+  it.each([
+    { seed: 1, months: 12, accounts: 60 },
+    { seed: 2, months: 12, accounts: 200 },
+    { seed: 3, months: 120, accounts: 80 }
+  ])('matches the previous implementation ($months months, $accounts accounts)', async ({ seed, months, accounts }) => {
+    const fixture = generateFixture(seed, months, accounts);
+    const [first, last] = [fixture.ranges[0], fixture.ranges[fixture.ranges.length - 1]];
+
+    const result = await createAnalyzer(fixture).createMonthlyTrendReport({
+      company_id: '1',
+      start_year: first.year,
+      start_month: first.month,
+      end_year: last.year,
+      end_month: last.month,
+      concurrency: 8
+    });
+
+    const data = referenceTrialBalanceData(fixture);
+    const accountItems = referenceAccountItems(fixture.accountItems);
+    const bsReport = referenceBSReport(data, accountItems);
+    const plReport = referencePLReport(data, accountItems);
+
+    expect(result.bs_report).toEqual(bsReport);
+    expect(result.pl_report).toEqual(plReport);
+    expect(result.summary).toEqual(referenceFinancialSummary(bsReport, plReport));
+  });
+});
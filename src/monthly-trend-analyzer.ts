@@ -1,10 +1,90 @@
 import { z } from 'zod';
 import { FreeeAPIClient } from './api-client.js';
 import { FreeeConfig } from './types.js';
+import { mapWithConcurrencyAndRetry } from './concurrency.js';
+import { FetchPlan, ReportOutput, Statement, planTrialBalanceFetches } from './fetch-planner.js';
+import { PartnerSeries, TrialBalanceMatrix } from './trial-balance-matrix.js';
 import * as fs from 'fs';
 import * as path from 'path';
 import * as os from 'os';
 
+// 試算表取得の同時リクエスト数（デフォルト）
+const DEFAULT_FETCH_CONCURRENCY = 4;
+
+// BS表示順序定義
+const BS_ORDER: { [key: string]: string } = {
+  // 資産の部
+  '資産,流動資産,現金・預金': '01',
+  '資産,流動資産,売上債権': '02',
+  '資産,流動資産,棚卸資産': '03',
+  '資産,流動資産,他流動資産': '04',
+  '資産,固定資産,有形固定資産': '05',
+  '資産,固定資産,無形固定資産': '06',
+  '資産,固定資産,投資その他の資産': '07',
+  '資産,繰延資産,繰延資産': '08',
+  // 負債の部
+  '負債及び純資産,負債,流動負債': '20',
+  '負債及び純資産,負債,固定負債': '21',
+  // 純資産の部
+  '負債及び純資産,純資産,株主資本': '30',
+  '負債及び純資産,純資産,評価・換算差額等': '31',
+  '負債及び純資産,純資産,新株予約権': '32',
+};
+
+// PL表示順序定義
+const PL_ORDER: { [key: string]: string } = {
+  '売上高': '01',
+  '当期商品仕入': '02',
+  '販売管理費': '03',
+  '営業外収益': '04',
+  '営業外費用': '05',
+  '特別利益': '06',
+  '特別損失': '07',
+  '法人税等': '08',
+};
+
+interface TrialBalanceData {
+  pl: TrialBalanceMatrix;
+  bs: TrialBalanceMatrix;
+}
+
+interface BSReportRow {
+  account_id: number;
+  account_name: string;
+  account_code: string;
+  major_category: string;
+  major_category2: string;
+  middle_category: string;
+  minor_category: string;
+  periods: Record<string, number>;
+  partners?: PartnerSeries[];
+}
+
+interface PLReportRow {
+  account_id: number;
+  account_name: string;
+  account_code: string;
+  account_category: string;
+  periods: Record<string, number>;
+  partners?: PartnerSeries[];
+}
+
+/**
+ * マトリクスの行番号を並べ替え：表示順序 → 勘定科目コード → 勘定科目名
+ * 同順位は初出順（期間順 → レスポンス内の行順）に並べてから安定ソートする
+ */
+function orderAccountRows(matrix: TrialBalanceMatrix, sortKeys: string[], codes: string[]): number[] {
+  const codeNumbers = codes.map(code => parseInt(code) || 999999);
+  const rows = Array.from({ length: matrix.accountCount }, (_, row) => row)
+    .sort((a, b) => matrix.firstSeenOrder(a) - matrix.firstSeenOrder(b));
+
+  return rows.sort((a, b) => {
+    if (sortKeys[a] !== sortKeys[b]) return sortKeys[a].localeCompare(sortKeys[b]);
+    if (codes[a] !== codes[b]) return codeNumbers[a] - codeNumbers[b];
+    return matrix.accountName(a).localeCompare(matrix.accountName(b));
+  });
+}
+
 /**
  * 月次推移表作成ツール
  * freeeの試算表データから財務諸表の標準順序で月次推移表を作成
@@ -27,39 +107,48 @@ export class MonthlyTrendAnalyzer {
     end_month: number;
     output_format?: 'csv' | 'json';
     include_details?: boolean;
+    concurrency?: number;
+    outputs?: ReportOutput[];
   }) {
     try {
-      // 1. 勘定科目の階層構造を取得
-      const accountItems = await this.getAccountItemsWithHierarchy(params.company_id);
-      
-      // 2. 試算表データを取得（PL + BS）
-      const trialBalanceData = await this.getCompleteTrialBalanceData(
-        params.company_id,
-        params.start_year,
-        params.start_month,
-        params.end_year,
-        params.end_month
-      );
+      // 出力に必要な試算表・内訳・月だけを取得対象にする
+      const plan = planTrialBalanceFetches(params);
+      const outputs = new Set(plan.outputs);
+
+      // 1. 勘定科目の階層構造と 2. 試算表データを並行して取得
+      const [accountItems, trialBalanceData] = await Promise.all([
+        this.getAccountItemsWithHierarchy(params.company_id),
+        this.getCompleteTrialBalanceData(params.company_id, plan, params.concurrency)
+      ]);
+
+      const result: any = {};
 
       // 3. BS項目の期末残高推移表を作成
-      const bsReport = this.createBSReport(trialBalanceData, accountItems);
+      if (outputs.has('bs_report')) {
+        result.bs_report = this.createBSReport(trialBalanceData.bs, accountItems, params.include_details);
+      }
 
       // 4. PL項目の貸借差額推移表を作成
-      const plReport = this.createPLReport(trialBalanceData, accountItems);
+      if (outputs.has('pl_report')) {
+        result.pl_report = this.createPLReport(trialBalanceData.pl, accountItems, params.include_details);
+      }
 
       // 5. 統合サマリーを作成
-      const summary = this.createFinancialSummary(bsReport, plReport);
-
-      const result = {
-        bs_report: bsReport,
-        pl_report: plReport,
-        summary: summary,
-        metadata: {
-          period: `${params.start_year}年${params.start_month}月 - ${params.end_year}年${params.end_month}月`,
-          bs_accounts: bsReport.length,
-          pl_accounts: plReport.length,
-          created_at: new Date().toISOString()
-        }
+      const summaryStatements = new Set<Statement>();
+      if (outputs.has('summary') || outputs.has('pl_summary')) summaryStatements.add('PL');
+      if (outputs.has('summary') || outputs.has('bs_summary')) summaryStatements.add('BS');
+      if (summaryStatements.size > 0) {
+        result.summary = this.createFinancialSummary(trialBalanceData, accountItems, summaryStatements);
+      }
+
+      result.metadata = {
+        period: `${params.start_year}年${params.start_month}月 - ${params.end_year}年${params.end_month}月`,
+        ...(result.bs_report ? { bs_accounts: result.bs_report.length } : {}),
+        ...(result.pl_report ? { pl_accounts: result.pl_report.length } : {}),
+        statements: plan.statements,
+        breakdown: plan.breakdown,
+        api_requests: plan.requests.length,
+        created_at: new Date().toISOString()
       };
 
       // ファイル出力（オプション）
@@ -78,9 +167,7 @@ export class MonthlyTrendAnalyzer {
    * 勘定科目の階層構造を取得
    */
   private async getAccountItemsWithHierarchy(companyId: string) {
-    const response = await this.apiClient.request('GET', 'account_items', {
-      company_id: companyId
-    });
+    const response = await this.apiClient.getAccountItems(companyId);
 
     return response.account_items.map((item: any) => ({
       id: item.id,
@@ -95,69 +182,48 @@ export class MonthlyTrendAnalyzer {
   }
 
   /**
-   * 完全な試算表データ（PL + BS）を取得
+   * 取得計画に含まれる試算表データを取得
+   * 同時実行数の上限内で並列取得し、レスポンスが届いた順に列指向マトリクスへ取り込む
+   * （レスポンス本体は保持しない）
    */
   private async getCompleteTrialBalanceData(
     companyId: string,
-    startYear: number,
-    startMonth: number,
-    endYear: number,
-    endMonth: number
-  ) {
-    const data: any[] = [];
-    let currentDate = new Date(startYear, startMonth - 1, 1);
-    const endDate = new Date(endYear, endMonth, 0); // 月末
-
-    while (currentDate <= endDate) {
-      const year = currentDate.getFullYear();
-      const month = currentDate.getMonth() + 1;
-      const startDateStr = `${year}-${month.toString().padStart(2, '0')}-01`;
-      const lastDay = new Date(year, month, 0).getDate();
-      const endDateStr = `${year}-${month.toString().padStart(2, '0')}-${lastDay.toString().padStart(2, '0')}`;
-
-      // PL試算表を取得
-      const plData = await this.apiClient.request('GET', 'reports/trial_pl', {
-        company_id: companyId,
-        start_date: startDateStr,
-        end_date: endDateStr,
-        breakdown_display_type: 'partner'
-      });
-
-      if (plData.trial_pl?.balances) {
-        for (const balance of plData.trial_pl.balances) {
-          if (!balance.total_line && balance.account_item_name) {
-            data.push({
-              ...balance,
-              period: startDateStr,
-              report_type: 'PL'
-            });
-          }
-        }
-      }
-
-      // BS試算表を取得
-      const bsData = await this.apiClient.request('GET', 'reports/trial_bs', {
-        company_id: companyId,
-        start_date: startDateStr,
-        end_date: endDateStr,
-        breakdown_display_type: 'partner'
-      });
+    plan: FetchPlan,
+    concurrency: number = DEFAULT_FETCH_CONCURRENCY
+  ): Promise<TrialBalanceData> {
+    const periods = plan.months.map(range => range.start_date);
+    const data: TrialBalanceData = {
+      pl: new TrialBalanceMatrix(periods),
+      bs: new TrialBalanceMatrix(periods)
+    };
 
-      if (bsData.trial_bs?.balances) {
-        for (const balance of bsData.trial_bs.balances) {
-          if (!balance.total_line && balance.account_item_name) {
-            data.push({
-              ...balance,
-              period: startDateStr,
-              report_type: 'BS'
-            });
-          }
+    // 失敗したリクエストのみ再試行される
+    await mapWithConcurrencyAndRetry(
+      plan.requests,
+      async ({ statement, range, breakdown_display_type }) => {
+        const params = {
+          start_date: range.start_date,
+          end_date: range.end_date,
+          ...(breakdown_display_type ? { breakdown_display_type } : {})
+        };
+        const withPartners = breakdown_display_type === 'partner';
+        if (statement === 'PL') {
+          const response = await this.apiClient.getTrialPL(companyId, params);
+          // PLは貸借差額
+          data.pl.addBalances(range.start_date, response.trial_pl?.balances,
+            balance => (balance.credit_amount || 0) - (balance.debit_amount || 0), withPartners);
+        } else {
+          const response = await this.apiClient.getTrialBS(companyId, params);
+          // BSは期末残高
+          data.bs.addBalances(range.start_date, response.trial_bs?.balances,
+            balance => balance.closing_balance || 0, withPartners);
         }
+      },
+      {
+        concurrency,
+        describe: ({ statement, range }) => `${statement} ${range.start_date}`
       }
-
-      // 次の月へ
-      currentDate.setMonth(currentDate.getMonth() + 1);
-    }
+    );
 
     return data;
   }
@@ -165,196 +231,114 @@ export class MonthlyTrendAnalyzer {
   /**
    * BS期末残高推移表を作成
    */
-  private createBSReport(trialBalanceData: any[], accountItems: any[]) {
-    // BS項目をフィルタ
-    const bsData = trialBalanceData.filter(item => item.report_type === 'BS');
-    
-    // 勘定科目情報をマップ
+  private createBSReport(matrix: TrialBalanceMatrix, accountItems: any[], includeDetails: boolean = false): BSReportRow[] {
     const accountMap = new Map(accountItems.map(item => [item.id, item]));
-    
-    // BS表示順序定義
-    const bsOrder: { [key: string]: string } = {
-      // 資産の部
-      '資産,流動資産,現金・預金': '01',
-      '資産,流動資産,売上債権': '02',
-      '資産,流動資産,棚卸資産': '03',
-      '資産,流動資産,他流動資産': '04',
-      '資産,固定資産,有形固定資産': '05',
-      '資産,固定資産,無形固定資産': '06',
-      '資産,固定資産,投資その他の資産': '07',
-      '資産,繰延資産,繰延資産': '08',
-      // 負債の部
-      '負債及び純資産,負債,流動負債': '20',
-      '負債及び純資産,負債,固定負債': '21',
-      // 純資産の部
-      '負債及び純資産,純資産,株主資本': '30',
-      '負債及び純資産,純資産,評価・換算差額等': '31',
-      '負債及び純資産,純資産,新株予約権': '32',
-    };
-
-    // 勘定科目ごとにグループ化
-    const groupedData = new Map();
-    
-    for (const item of bsData) {
-      const key = `${item.account_item_id}_${item.account_item_name}`;
-      if (!groupedData.has(key)) {
-        const accountInfo = accountMap.get(item.account_item_id) || {};
-        groupedData.set(key, {
-          account_id: item.account_item_id,
-          account_name: item.account_item_name,
-          account_code: accountInfo.code || '',
-          major_category: accountInfo.major_category || '',
-          major_category2: accountInfo.major_category2 || '',
-          middle_category: accountInfo.middle_category || '',
-          minor_category: accountInfo.minor_category || '',
-          periods: new Map()
-        });
-      }
-      
-      groupedData.get(key).periods.set(item.period, item.closing_balance || 0);
+    const infos: any[] = [];
+    const sortKeys: string[] = [];
+    const codes: string[] = [];
+
+    for (let row = 0; row < matrix.accountCount; row++) {
+      const accountInfo = accountMap.get(matrix.accountId(row)) || {};
+      infos.push(accountInfo);
+      sortKeys.push(BS_ORDER[
+        `${accountInfo.major_category || ''},${accountInfo.major_category2 || ''},${accountInfo.middle_category || ''}`
+      ] || '99');
+      codes.push(accountInfo.code || '');
     }
 
-    // 結果を配列に変換してソート
-    const result = Array.from(groupedData.values()).map(item => {
-      const sortKey = bsOrder[`${item.major_category},${item.major_category2},${item.middle_category}`] || '99';
-      return {
-        ...item,
-        sort_key: sortKey,
-        periods: Object.fromEntries(item.periods)
-      };
-    });
-
-    // ソート：表示順序 → 勘定科目コード → 勘定科目名
-    result.sort((a, b) => {
-      if (a.sort_key !== b.sort_key) return a.sort_key.localeCompare(b.sort_key);
-      if (a.account_code !== b.account_code) {
-        const codeA = parseInt(a.account_code) || 999999;
-        const codeB = parseInt(b.account_code) || 999999;
-        return codeA - codeB;
-      }
-      return a.account_name.localeCompare(b.account_name);
-    });
-
-    return result.map(item => {
-      const { sort_key, ...rest } = item;
-      return rest;
-    });
+    return orderAccountRows(matrix, sortKeys, codes).map(row => ({
+      account_id: matrix.accountId(row),
+      account_name: matrix.accountName(row),
+      account_code: codes[row],
+      major_category: infos[row].major_category || '',
+      major_category2: infos[row].major_category2 || '',
+      middle_category: infos[row].middle_category || '',
+      minor_category: infos[row].minor_category || '',
+      periods: matrix.rowPeriods(row),
+      ...(includeDetails ? { partners: matrix.rowPartners(row) } : {})
+    }));
   }
 
   /**
    * PL貸借差額推移表を作成
    */
-  private createPLReport(trialBalanceData: any[], accountItems: any[]) {
-    // PL項目をフィルタ
-    const plData = trialBalanceData.filter(item => item.report_type === 'PL');
-    
-    // 勘定科目情報をマップ
+  private createPLReport(matrix: TrialBalanceMatrix, accountItems: any[], includeDetails: boolean = false): PLReportRow[] {
     const accountMap = new Map(accountItems.map(item => [item.id, item]));
-    
-    // PL表示順序定義
-    const plOrder: { [key: string]: string } = {
-      '売上高': '01',
-      '当期商品仕入': '02',
-      '販売管理費': '03',
-      '営業外収益': '04',
-      '営業外費用': '05',
-      '特別利益': '06',
-      '特別損失': '07',
-      '法人税等': '08',
-    };
-
-    // 勘定科目ごとにグループ化
-    const groupedData = new Map();
-    
-    for (const item of plData) {
-      const key = `${item.account_item_id}_${item.account_item_name}`;
-      if (!groupedData.has(key)) {
-        const accountInfo = accountMap.get(item.account_item_id) || {};
-        groupedData.set(key, {
-          account_id: item.account_item_id,
-          account_name: item.account_item_name,
-          account_code: accountInfo.code || '',
-          account_category: accountInfo.category || '',
-          periods: new Map()
-        });
-      }
-      
-      // 貸借差額を計算
-      const netAmount = (item.credit_amount || 0) - (item.debit_amount || 0);
-      groupedData.get(key).periods.set(item.period, netAmount);
+    const categories: string[] = [];
+    const sortKeys: string[] = [];
+    const codes: string[] = [];
+
+    for (let row = 0; row < matrix.accountCount; row++) {
+      const accountInfo = accountMap.get(matrix.accountId(row)) || {};
+      categories.push(accountInfo.category || '');
+      sortKeys.push(PL_ORDER[accountInfo.category] || '99');
+      codes.push(accountInfo.code || '');
     }
 
-    // 結果を配列に変換してソート
-    const result = Array.from(groupedData.values()).map(item => {
-      const sortKey = plOrder[item.account_category] || '99';
-      return {
-        ...item,
-        sort_key: sortKey,
-        periods: Object.fromEntries(item.periods)
-      };
-    });
-
-    // ソート：表示順序 → 勘定科目コード → 勘定科目名
-    result.sort((a, b) => {
-      if (a.sort_key !== b.sort_key) return a.sort_key.localeCompare(b.sort_key);
-      if (a.account_code !== b.account_code) {
-        const codeA = parseInt(a.account_code) || 999999;
-        const codeB = parseInt(b.account_code) || 999999;
-        return codeA - codeB;
-      }
-      return a.account_name.localeCompare(b.account_name);
-    });
-
-    return result.map(item => {
-      const { sort_key, ...rest } = item;
-      return rest;
-    });
+    return orderAccountRows(matrix, sortKeys, codes).map(row => ({
+      account_id: matrix.accountId(row),
+      account_name: matrix.accountName(row),
+      account_code: codes[row],
+      account_category: categories[row],
+      periods: matrix.rowPeriods(row),
+      ...(includeDetails ? { partners: matrix.rowPartners(row) } : {})
+    }));
   }
 
   /**
    * 財務サマリーを作成
+   * 各勘定科目を一度だけ集計区分に振り分け、期間別の合計配列に加算する
+   * statements に含まれる試算表の項目のみ出力
    */
-  private createFinancialSummary(bsReport: any[], plReport: any[]) {
-    const periods = new Set();
-    
-    // 全期間を取得
-    [...bsReport, ...plReport].forEach(item => {
-      Object.keys(item.periods).forEach(period => periods.add(period));
-    });
-
-    return Array.from(periods).sort().map(period => {
-      // PL集計
-      const revenues = plReport
-        .filter(item => item.account_category === '売上高')
-        .reduce((sum, item) => sum + (item.periods[period] || 0), 0);
-      
-      const expenses = plReport
-        .filter(item => ['販売管理費', '当期商品仕入'].includes(item.account_category))
-        .reduce((sum, item) => sum + Math.abs(item.periods[period] || 0), 0);
-
-      // BS集計
-      const assets = bsReport
-        .filter(item => item.major_category === '資産')
-        .reduce((sum, item) => sum + (item.periods[period] || 0), 0);
-      
-      const liabilities = bsReport
-        .filter(item => item.major_category2 === '負債')
-        .reduce((sum, item) => sum + Math.abs(item.periods[period] || 0), 0);
-
-      const equity = bsReport
-        .filter(item => item.major_category2 === '純資産')
-        .reduce((sum, item) => sum + (item.periods[period] || 0), 0);
-
-      return {
-        period,
-        revenues,
-        expenses,
-        operating_profit: revenues - expenses,
-        total_assets: assets,
-        total_liabilities: liabilities,
-        total_equity: equity
-      };
-    });
+  private createFinancialSummary(data: TrialBalanceData, accountItems: any[], statements: Set<Statement>) {
+    const accountMap = new Map(accountItems.map(item => [item.id, item]));
+    const periods = data.pl.periods;
+    const columns = periods.length;
+    const revenues = new Float64Array(columns);
+    const expenses = new Float64Array(columns);
+    const assets = new Float64Array(columns);
+    const liabilities = new Float64Array(columns);
+    const equity = new Float64Array(columns);
+
+    for (let row = 0; row < data.pl.accountCount; row++) {
+      const category = accountMap.get(data.pl.accountId(row))?.category || '';
+      if (category === '売上高') {
+        data.pl.accumulate(row, revenues);
+      } else if (category === '販売管理費' || category === '当期商品仕入') {
+        data.pl.accumulate(row, expenses, true);
+      }
+    }
+
+    for (let row = 0; row < data.bs.accountCount; row++) {
+      const accountInfo = accountMap.get(data.bs.accountId(row)) || {};
+      if (accountInfo.major_category === '資産') data.bs.accumulate(row, assets);
+      if (accountInfo.major_category2 === '負債') data.bs.accumulate(row, liabilities, true);
+      if (accountInfo.major_category2 === '純資産') data.bs.accumulate(row, equity);
+    }
+
+    // いずれかの勘定科目に値のある期間のみ出力
+    const active = new Uint8Array(columns);
+    data.pl.markActivePeriods(active);
+    data.bs.markActivePeriods(active);
+
+    const summary = [];
+    for (let column = 0; column < columns; column++) {
+      if (!active[column]) continue;
+      summary.push({
+        period: periods[column],
+        ...(statements.has('PL') ? {
+          revenues: revenues[column],
+          expenses: expenses[column],
+          operating_profit: revenues[column] - expenses[column]
+        } : {}),
+        ...(statements.has('BS') ? {
+          total_assets: assets[column],
+          total_liabilities: liabilities[column],
+          total_equity: equity[column]
+        } : {})
+      });
+    }
+    return summary;
   }
 
   /**
@@ -377,7 +361,7 @@ export class MonthlyTrendAnalyzer {
     } else {
       // CSV形式での保存は簡略化（実際の実装では詳細なCSV生成を行う）
       const filepath = path.join(outputDir, `monthly_trend_summary_${timestamp}.csv`);
-      const csvContent = this.convertToCSV(data.summary);
+      const csvContent = this.convertToCSV(data.summary || []);
       fs.writeFileSync(filepath, csvContent, 'utf8');
       return filepath;
     }
@@ -407,5 +391,6 @@ export const MonthlyTrendReportSchema = z.object({
   end_year: z.number().describe('終了年'),
   end_month: z.number().min(1).max(12).describe('終了月'),
   output_format: z.enum(['csv', 'json']).optional().describe('出力形式'),
-  include_details: z.boolean().optional().describe('詳細情報を含める')
+  include_details: z.boolean().optional().describe('推移表の各勘定科目に取引先別の内訳を含める（内訳付きで取得するため応答が大きくなる）'),
+  concurrency: z.number().min(1).max(16).optional().describe('試算表取得の同時リクエスト数（デフォルト: 4）')
 });
\ No newline at end of file
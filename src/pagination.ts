@@ -0,0 +1,56 @@
+/**
+ * 一覧APIの全件取得ユーティリティ
+ * ページ単位の非同期イテレーターを、MCPツール用の1つの結果にまとめる
+ */
+
+/**
+ * 一覧APIごとの1ページあたりの最大取得件数（freee APIのlimit上限）
+ */
+export const LIST_PAGE_SIZES = {
+  deals: 100,
+  partners: 3000,
+  invoices: 100,
+  manual_journals: 500,
+  items: 3000,
+  expense_applications: 500
+} as const;
+
+export type ListResource = keyof typeof LIST_PAGE_SIZES;
+
+export interface PaginateOptions {
+  pageSize?: number;
+  maxRows?: number;
+}
+
+/**
+ * ページイテレーターを読み進めて全行を rows 配列に集め、件数などのサマリーと合わせて返す
+ * （rows は出力整形のページ分割・サイズ上限・項目の絞り込みの対象になる）
+ *
+ * 上限を超える行が残っていたかを判定するため、pages には maxRows より1件多く取得する
+ * イテレーターを渡す。maxRows + 1 件目が読めた場合だけ truncated にする
+ */
+export async function collectRows<T>(
+  pages: AsyncIterable<T[]>,
+  options: { resource: ListResource; maxRows: number }
+) {
+  const rows: T[] = [];
+  let pageCount = 0;
+
+  for await (const page of pages) {
+    pageCount++;
+    for (const row of page) rows.push(row);
+    if (rows.length > options.maxRows) break;
+  }
+
+  const truncated = rows.length > options.maxRows;
+  if (truncated) rows.length = options.maxRows;
+
+  return {
+    resource: options.resource,
+    total_rows: rows.length,
+    pages_fetched: pageCount,
+    truncated,
+    max_rows: options.maxRows,
+    rows
+  };
+}
@@ -0,0 +1,49 @@
+/**
+ * 月次期間ユーティリティ
+ */
+
+export interface MonthRange {
+  year: number;
+  month: number;
+  start_date: string; // YYYY-MM-01
+  end_date: string;   // YYYY-MM-末日
+}
+
+/**
+ * 指定年月の期間（月初〜月末）を取得
+ */
+export function getMonthRange(year: number, month: number): MonthRange {
+  const mm = month.toString().padStart(2, '0');
+  const lastDay = new Date(year, month, 0).getDate();
+  return {
+    year,
+    month,
+    start_date: `${year}-${mm}-01`,
+    end_date: `${year}-${mm}-${lastDay.toString().padStart(2, '0')}`
+  };
+}
+
+/**
+ * 開始年月から終了年月までの月次期間一覧を取得（期間順）
+ */
+export function getMonthRanges(
+  startYear: number,
+  startMonth: number,
+  endYear: number,
+  endMonth: number
+): MonthRange[] {
+  const ranges: MonthRange[] = [];
+  let year = startYear;
+  let month = startMonth;
+
+  while (year < endYear || (year === endYear && month <= endMonth)) {
+    ranges.push(getMonthRange(year, month));
+    month++;
+    if (month > 12) {
+      month = 1;
+      year++;
+    }
+  }
+
+  return ranges;
+}
@@ -0,0 +1,97 @@
+/**
+ * 同一GETリクエストの集約（シングルフライト）
+ * プロセス内の全FreeeAPIClientで共有し、実行中のリクエストと同じGETが来たら
+ * 新たに送信せず、実行中のリクエストの結果（同じパース済みオブジェクト）を返す
+ *
+ * - キーはメソッド・URL・パラメータ（キー順に並べ、undefined/null を除いたもの）
+ * - 集約するのは実行中の間だけで、完了した結果は保持しない（キャッシュは ResponseCache の役割）
+ * - 書き込みリクエストの後に来たGETは、書き込み前から実行中のGETには合流させない
+ * - 共有された結果は呼び出し側で変更しないこと
+ */
+
+export class RequestCoalescer {
+  private inFlight = new Map<string, Promise<unknown>>();
+  private stats = {
+    hits: 0,   // 実行中のリクエストに合流した数
+    misses: 0, // 実際に送信した数
+    max_waiters: 0,
+    detached: 0
+  };
+  private waiters = new Map<string, number>();
+
+  /**
+   * 同じキーのリクエストが実行中ならその結果を待ち、なければ load を実行
+   */
+  run<T>(key: string, load: () => Promise<T>): Promise<T> {
+    const existing = this.inFlight.get(key);
+    if (existing) {
+      this.stats.hits++;
+      const count = (this.waiters.get(key) || 1) + 1;
+      this.waiters.set(key, count);
+      this.stats.max_waiters = Math.max(this.stats.max_waiters, count);
+      return existing as Promise<T>;
+    }
+
+    this.stats.misses++;
+    const promise: Promise<T> = load().finally(() => {
+      // 切り離し後に同じキーで始まったリクエストは消さない
+      if (this.inFlight.get(key) === promise) {
+        this.inFlight.delete(key);
+        this.waiters.delete(key);
+      }
+    });
+    this.inFlight.set(key, promise);
+    return promise;
+  }
+
+  /**
+   * 実行中のリクエストを以降の合流対象から外す（合流済みの呼び出しには結果がそのまま返る）
+   * 書き込みの後に、書き込み前の状態を返しうるリクエストへ合流しないようにする
+   */
+  detachAll(): void {
+    this.stats.detached += this.inFlight.size;
+    this.inFlight.clear();
+    this.waiters.clear();
+  }
+
+  /**
+   * 集約の統計情報を取得
+   */
+  getStats() {
+    const lookups = this.stats.hits + this.stats.misses;
+    return {
+      ...this.stats,
+      hit_rate: lookups > 0 ? Math.round((this.stats.hits / lookups) * 1000) / 1000 : 0,
+      in_flight: this.inFlight.size
+    };
+  }
+}
+
+/**
+ * 集約用のキーを作成（パラメータの順序や未指定の項目の違いを無視する）
+ */
+export function normalizeRequestKey(
+  method: string,
+  endpoint: string,
+  params?: Record<string, any>
+): string {
+  const query = Object.entries(params || {})
+    .filter(([, value]) => value !== undefined && value !== null)
+    .map(([key, value]) => [key, String(value)])
+    .sort(([a], [b]) => (a < b ? -1 : a > b ? 1 : 0))
+    .map(([key, value]) => `${encodeURIComponent(key)}=${encodeURIComponent(value)}`)
+    .join('&');
+  return `${method.toUpperCase()} ${endpoint}${query ? `?${query}` : ''}`;
+}
+
+let sharedRequestCoalescer: RequestCoalescer | null = null;
+
+/**
+ * プロセス全体で共有するリクエスト集約器を取得
+ */
+export function getSharedRequestCoalescer(): RequestCoalescer {
+  if (!sharedRequestCoalescer) {
+    sharedRequestCoalescer = new RequestCoalescer();
+  }
+  return sharedRequestCoalescer;
+}
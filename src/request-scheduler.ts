@@ -0,0 +1,258 @@
+/**
+ * freee APIリクエストスケジューラー
+ * プロセス内の全FreeeAPIClientで共有し、レート制限を超えないようにリクエストを配分する
+ *
+ * - トークンバケット: 1時間あたりのリクエスト上限とバースト数
+ * - 優先度: interactive（対話的な参照）を bulk（一括エクスポート）より先に実行
+ * - 事業所ごとの公平性: 同じ優先度内では事業所をラウンドロビンで処理
+ * - 429応答時は Retry-After（+ジッター）の間、全リクエストを停止
+ */
+
+export type RequestPriority = 'interactive' | 'bulk';
+
+export interface RequestSchedulerOptions {
+  requestsPerHour: number;
+  burst: number;
+  maxConcurrent: number;
+  jitterRatio: number;
+}
+
+interface QueuedTask {
+  run: () => Promise<unknown>;
+  resolve: (value: any) => void;
+  reject: (reason: unknown) => void;
+  enqueuedAt: number;
+}
+
+interface PriorityQueue {
+  byCompany: Map<string, QueuedTask[]>;
+  order: string[]; // ラウンドロビン順
+}
+
+const PRIORITIES: RequestPriority[] = ['interactive', 'bulk'];
+
+// freee会計APIの公開上限（1時間あたり3,600リクエスト）に合わせたデフォルト値
+export const DEFAULT_SCHEDULER_OPTIONS: RequestSchedulerOptions = {
+  requestsPerHour: 3600,
+  burst: 10,
+  maxConcurrent: 8,
+  jitterRatio: 0.2
+};
+
+export class RequestScheduler {
+  private options: RequestSchedulerOptions;
+  private tokens: number;
+  private lastRefill = Date.now();
+  private pausedUntil = 0;
+  private running = 0;
+  private timer: NodeJS.Timeout | null = null;
+  private queues: Record<RequestPriority, PriorityQueue> = {
+    interactive: { byCompany: new Map(), order: [] },
+    bulk: { byCompany: new Map(), order: [] }
+  };
+  private stats = {
+    scheduled: 0,
+    completed: 0,
+    failed: 0,
+    rate_limited: 0,
+    total_wait_ms: 0,
+    max_wait_ms: 0
+  };
+
+  constructor(options: Partial<RequestSchedulerOptions> = {}) {
+    this.options = { ...DEFAULT_SCHEDULER_OPTIONS, ...options };
+    this.tokens = this.options.burst;
+  }
+
+  /**
+   * リクエストをスケジュールして実行
+   */
+  schedule<T>(
+    run: () => Promise<T>,
+    options: { priority?: RequestPriority; companyId?: string } = {}
+  ): Promise<T> {
+    const priority = options.priority || 'interactive';
+    const companyKey = options.companyId || '_global';
+
+    return new Promise<T>((resolve, reject) => {
+      const queue = this.queues[priority];
+      let companyQueue = queue.byCompany.get(companyKey);
+      if (!companyQueue) {
+        companyQueue = [];
+        queue.byCompany.set(companyKey, companyQueue);
+        queue.order.push(companyKey);
+      }
+
+      companyQueue.push({ run, resolve, reject, enqueuedAt: Date.now() });
+      this.stats.scheduled++;
+      this.pump();
+    });
+  }
+
+  /**
+   * 429応答を受けたときに全リクエストを一時停止
+   */
+  backoff(retryAfterMs: number): number {
+    const jitter = retryAfterMs * this.options.jitterRatio * Math.random();
+    const delay = Math.ceil(retryAfterMs + jitter);
+
+    this.pausedUntil = Math.max(this.pausedUntil, Date.now() + delay);
+    this.tokens = 0;
+    this.stats.rate_limited++;
+    this.pump();
+    return delay;
+  }
+
+  /**
+   * スケジューラーの統計情報を取得
+   */
+  getStats() {
+    const queued: Record<string, number> = {};
+    for (const priority of PRIORITIES) {
+      let count = 0;
+      for (const tasks of this.queues[priority].byCompany.values()) {
+        count += tasks.length;
+      }
+      queued[priority] = count;
+    }
+
+    this.refill();
+    return {
+      ...this.stats,
+      average_wait_ms: this.stats.completed + this.stats.failed > 0
+        ? Math.round(this.stats.total_wait_ms / (this.stats.completed + this.stats.failed))
+        : 0,
+      running: this.running,
+      queued,
+      available_tokens: Math.floor(this.tokens),
+      paused_for_ms: Math.max(0, this.pausedUntil - Date.now()),
+      options: this.options
+    };
+  }
+
+  // Private methods
+
+  private pump(): void {
+    while (this.running < this.options.maxConcurrent && this.hasQueued()) {
+      const now = Date.now();
+
+      if (now < this.pausedUntil) {
+        this.wakeAfter(this.pausedUntil - now);
+        return;
+      }
+
+      this.refill();
+      if (this.tokens < 1) {
+        this.wakeAfter(Math.ceil((1 - this.tokens) * this.msPerToken()));
+        return;
+      }
+
+      const task = this.dequeue();
+      if (!task) return;
+
+      this.tokens -= 1;
+      this.running++;
+
+      const waited = now - task.enqueuedAt;
+      this.stats.total_wait_ms += waited;
+      this.stats.max_wait_ms = Math.max(this.stats.max_wait_ms, waited);
+
+      task.run().then(
+        (value) => {
+          this.stats.completed++;
+          task.resolve(value);
+        },
+        (error) => {
+          this.stats.failed++;
+          task.reject(error);
+        }
+      ).finally(() => {
+        this.running--;
+        this.pump();
+      });
+    }
+  }
+
+  private dequeue(): QueuedTask | undefined {
+    for (const priority of PRIORITIES) {
+      const queue = this.queues[priority];
+      while (queue.order.length > 0) {
+        const companyKey = queue.order.shift()!;
+        const tasks = queue.byCompany.get(companyKey);
+        const task = tasks?.shift();
+
+        if (tasks && tasks.length > 0) {
+          queue.order.push(companyKey); // 次の事業所へ順番を回す
+        } else {
+          queue.byCompany.delete(companyKey);
+        }
+
+        if (task) return task;
+      }
+    }
+    return undefined;
+  }
+
+  private hasQueued(): boolean {
+    return PRIORITIES.some(priority => this.queues[priority].order.length > 0);
+  }
+
+  private refill(): void {
+    const now = Date.now();
+    const elapsed = now - this.lastRefill;
+    this.lastRefill = now;
+    this.tokens = Math.min(this.options.burst, this.tokens + elapsed / this.msPerToken());
+  }
+
+  private msPerToken(): number {
+    return (60 * 60 * 1000) / this.options.requestsPerHour;
+  }
+
+  private wakeAfter(ms: number): void {
+    if (this.timer) return;
+    this.timer = setTimeout(() => {
+      this.timer = null;
+      this.pump();
+    }, Math.max(1, ms));
+  }
+}
+
+let sharedScheduler: RequestScheduler | null = null;
+
+/**
+ * プロセス全体で共有するスケジューラーを取得
+ * 環境変数 FREEE_RATE_LIMIT_PER_HOUR / FREEE_RATE_LIMIT_BURST / FREEE_MAX_CONCURRENT_REQUESTS で調整可能
+ */
+export function getSharedScheduler(): RequestScheduler {
+  if (!sharedScheduler) {
+    sharedScheduler = new RequestScheduler({
+      requestsPerHour: envNumber('FREEE_RATE_LIMIT_PER_HOUR', DEFAULT_SCHEDULER_OPTIONS.requestsPerHour),
+      burst: envNumber('FREEE_RATE_LIMIT_BURST', DEFAULT_SCHEDULER_OPTIONS.burst),
+      maxConcurrent: envNumber('FREEE_MAX_CONCURRENT_REQUESTS', DEFAULT_SCHEDULER_OPTIONS.maxConcurrent)
+    });
+  }
+  return sharedScheduler;
+}
+
+/**
+ * Retry-Afterヘッダー（秒数またはHTTP日付）をミリ秒に変換
+ */
+export function parseRetryAfter(value: string | null): number | undefined {
+  if (!value) return undefined;
+
+  const seconds = Number(value);
+  if (!Number.isNaN(seconds)) {
+    return Math.max(0, seconds * 1000);
+  }
+
+  const date = Date.parse(value);
+  if (!Number.isNaN(date)) {
+    return Math.max(0, date - Date.now());
+  }
+  return undefined;
+}
+
+function envNumber(name: string, fallback: number): number {
+  const value = process.env[name] ? Number(process.env[name]) : NaN;
+  return Number.isFinite(value) && value > 0 ? value : fallback;
+}
@@ -0,0 +1,242 @@
+/**
+ * マスタデータ用レスポンスキャッシュ
+ * プロセス内の全FreeeAPIClientで共有し、変更頻度の低いマスタの再取得を避ける
+ * （経費申請統計の締め済み月の部分集計も同じ仕組みで保持する）
+ *
+ * - 事業所ごと・リソースごとにTTLを設定
+ * - 最大件数を超えたら最も長く使われていないエントリから削除（LRU）
+ * - 書き込みAPIの呼び出し時に関連するリソースを無効化
+ *   （読み込み中に無効化された場合、読み込んだ値は保存しない）
+ */
+
+export type CachedResource =
+  | 'companies'
+  | 'account_items'
+  | 'taxes'
+  | 'segments'
+  | 'items'
+  | 'partners'
+  | 'expense_statistics';
+
+export interface ResponseCacheOptions {
+  maxEntries: number;
+  ttlMs: Record<CachedResource, number>;
+}
+
+interface CacheEntry {
+  value: unknown;
+  expiresAt: number;
+  companyId: string;
+  resource: CachedResource;
+}
+
+const MINUTE = 60 * 1000;
+
+export const DEFAULT_RESPONSE_CACHE_OPTIONS: ResponseCacheOptions = {
+  maxEntries: 500,
+  ttlMs: {
+    companies: 30 * MINUTE,
+    account_items: 30 * MINUTE,
+    taxes: 60 * MINUTE,
+    segments: 30 * MINUTE,
+    items: 10 * MINUTE,
+    partners: 10 * MINUTE,
+    expense_statistics: 60 * MINUTE
+  }
+};
+
+/**
+ * 書き込みエンドポイントと、それによって古くなるキャッシュの対応
+ * 取引・請求書・振替伝票は取引先・品目・部門を参照・作成しうるため関連マスタも無効化する
+ */
+const WRITE_INVALIDATIONS: Record<string, CachedResource[]> = {
+  deals: ['partners', 'items', 'segments'],
+  invoices: ['partners', 'items', 'segments'],
+  manual_journals: ['partners', 'items', 'segments'],
+  account_items: ['account_items'],
+  partners: ['partners'],
+  items: ['items'],
+  segments: ['segments'],
+  taxes: ['taxes'],
+  companies: ['companies'],
+  expense_applications: ['expense_statistics']
+};
+
+const GLOBAL_KEY = '_global';
+const ALL_COMPANIES = '*';
+
+export class ResponseCache {
+  private options: ResponseCacheOptions;
+  private entries = new Map<string, CacheEntry>(); // 挿入順 = LRU順
+  private stats = {
+    hits: 0,
+    misses: 0,
+    evictions: 0,
+    invalidations: 0,
+    stale_loads_discarded: 0
+  };
+  // 事業所・リソースごとの無効化の世代
+  private generations = new Map<string, number>();
+  private clears = 0;
+
+  constructor(options: Partial<ResponseCacheOptions> = {}) {
+    this.options = {
+      ...DEFAULT_RESPONSE_CACHE_OPTIONS,
+      ...options,
+      ttlMs: { ...DEFAULT_RESPONSE_CACHE_OPTIONS.ttlMs, ...options.ttlMs }
+    };
+  }
+
+  /**
+   * キャッシュから取得し、なければ（またはbypass指定時は）読み込んで保存
+   */
+  async getOrLoad<T>(
+    key: string,
+    target: { resource: CachedResource; companyId?: string },
+    load: () => Promise<T>,
+    options: { bypassCache?: boolean } = {}
+  ): Promise<T> {
+    const companyId = target.companyId || GLOBAL_KEY;
+    const cacheKey = `${companyId}:${key}`;
+
+    if (!options.bypassCache) {
+      const entry = this.entries.get(cacheKey);
+      if (entry && entry.expiresAt > Date.now()) {
+        // 最近使ったエントリを末尾へ移動
+        this.entries.delete(cacheKey);
+        this.entries.set(cacheKey, entry);
+        this.stats.hits++;
+        return entry.value as T;
+      }
+      if (entry) this.entries.delete(cacheKey);
+    }
+
+    this.stats.misses++;
+    const generation = this.generation(companyId, target.resource);
+    const value = await load();
+
+    // 読み込み中に書き込みで無効化された値は、書き込み前の状態かもしれないため保存しない
+    if (this.generation(companyId, target.resource) !== generation) {
+      this.stats.stale_loads_discarded++;
+      return value;
+    }
+    this.set(cacheKey, {
+      value,
+      expiresAt: Date.now() + this.options.ttlMs[target.resource],
+      companyId,
+      resource: target.resource
+    });
+    return value;
+  }
+
+  /**
+   * 書き込みリクエストのエンドポイントから関連キャッシュを無効化
+   */
+  invalidateForWrite(endpoint: string, companyId?: string): void {
+    const match = endpoint.match(/^\/api\/1\/([a-z_]+)/);
+    const resources = match ? WRITE_INVALIDATIONS[match[1]] : undefined;
+    if (resources) {
+      this.invalidate(resources, companyId);
+    }
+  }
+
+  /**
+   * 指定リソースのキャッシュを削除（事業所ID省略時は全事業所）
+   */
+  invalidate(resources: CachedResource[], companyId?: string): number {
+    for (const resource of resources) {
+      this.bumpGeneration(companyId || ALL_COMPANIES, resource);
+      // 事業所に依存しないエントリは、どの事業所の無効化でも対象
+      if (companyId) this.bumpGeneration(GLOBAL_KEY, resource);
+    }
+
+    let removed = 0;
+    for (const [key, entry] of this.entries) {
+      if (!resources.includes(entry.resource)) continue;
+      // 事業所一覧など事業所に依存しないエントリは常に対象
+      if (companyId && entry.companyId !== companyId && entry.companyId !== GLOBAL_KEY) continue;
+      this.entries.delete(key);
+      removed++;
+    }
+    this.stats.invalidations += removed;
+    return removed;
+  }
+
+  /**
+   * 全キャッシュを削除
+   */
+  clear(): void {
+    this.stats.invalidations += this.entries.size;
+    this.entries.clear();
+    this.clears++;
+  }
+
+  /**
+   * キャッシュの統計情報を取得
+   */
+  getStats() {
+    const byResource: Record<string, number> = {};
+    for (const entry of this.entries.values()) {
+      byResource[entry.resource] = (byResource[entry.resource] || 0) + 1;
+    }
+
+    const lookups = this.stats.hits + this.stats.misses;
+    return {
+      ...this.stats,
+      hit_rate: lookups > 0 ? Math.round((this.stats.hits / lookups) * 1000) / 1000 : 0,
+      entries: this.entries.size,
+      by_resource: byResource,
+      options: this.options
+    };
+  }
+
+  // Private methods
+
+  private generation(companyId: string, resource: CachedResource): number {
+    return this.clears +
+      (this.generations.get(`${ALL_COMPANIES}:${resource}`) ?? 0) +
+      (this.generations.get(`${companyId}:${resource}`) ?? 0);
+  }
+
+  private bumpGeneration(companyId: string, resource: CachedResource): void {
+    const key = `${companyId}:${resource}`;
+    this.generations.set(key, (this.generations.get(key) ?? 0) + 1);
+  }
+
+  private set(cacheKey: string, entry: CacheEntry): void {
+    this.entries.delete(cacheKey);
+    this.entries.set(cacheKey, entry);
+
+    while (this.entries.size > this.options.maxEntries) {
+      const oldest = this.entries.keys().next().value as string;
+      this.entries.delete(oldest);
+      this.stats.evictions++;
+    }
+  }
+}
+
+let sharedResponseCache: ResponseCache | null = null;
+
+/**
+ * プロセス全体で共有するレスポンスキャッシュを取得
+ * 環境変数 FREEE_CACHE_MAX_ENTRIES / FREEE_CACHE_TTL_MS（全リソース共通のTTL）で調整可能
+ */
+export function getSharedResponseCache(): ResponseCache {
+  if (!sharedResponseCache) {
+    const ttl = Number(process.env.FREEE_CACHE_TTL_MS);
+    const maxEntries = Number(process.env.FREEE_CACHE_MAX_ENTRIES);
+    const ttlMs = Number.isFinite(ttl) && ttl >= 0 && process.env.FREEE_CACHE_TTL_MS
+      ? Object.fromEntries(
+          Object.keys(DEFAULT_RESPONSE_CACHE_OPTIONS.ttlMs).map(resource => [resource, ttl])
+        ) as Record<CachedResource, number>
+      : DEFAULT_RESPONSE_CACHE_OPTIONS.ttlMs;
+
+    sharedResponseCache = new ResponseCache({
+      maxEntries: Number.isFinite(maxEntries) && maxEntries > 0
+        ? maxEntries
+        : DEFAULT_RESPONSE_CACHE_OPTIONS.maxEntries,
+      ttlMs
+    });
+  }
+  return sharedResponseCache;
+}
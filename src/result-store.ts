@@ -0,0 +1,258 @@
+/**
+ * 大きなツール結果の保存先（MCPリソースとして公開）
+ * しきい値を超えた結果は1回だけここに保存し、ツール呼び出しにはリソースURIを返す
+ * クライアントは resources/read でセクション単位・行範囲単位に読み出す
+ *
+ * URI: freee-result://<結果ID>[/<セクション>[/<子セクション>...]][?offset=<開始行>&limit=<行数>]
+ *   例: freee-result://1f0c.../pl_report?offset=0&limit=100
+ *
+ * - 最大件数・合計サイズを超えたら最も長く使われていない結果から削除（LRU）
+ * - 一定時間読まれなかった結果は削除
+ */
+
+import { randomUUID } from 'crypto';
+
+export const RESULT_URI_SCHEME = 'freee-result';
+
+export interface ResultStoreOptions {
+  maxEntries: number;
+  maxTotalBytes: number;
+  ttlMs: number;
+  defaultRowLimit: number;
+}
+
+export const DEFAULT_RESULT_STORE_OPTIONS: ResultStoreOptions = {
+  maxEntries: 50,
+  maxTotalBytes: 200 * 1024 * 1024,
+  ttlMs: 60 * 60 * 1000,
+  defaultRowLimit: 1000
+};
+
+export interface StoredToolResult {
+  id: string;
+  tool: string;
+  value: unknown;
+  bytes: number;
+  createdAt: number;
+  expiresAt: number;
+}
+
+export interface ResultSection {
+  name: string;
+  uri: string;
+  rows?: number; // 配列の場合の行数
+}
+
+/**
+ * 存在しない・期限切れのリソース、または不正なURI
+ */
+export class ResourceNotFoundError extends Error {
+  constructor(message: string) {
+    super(message);
+    this.name = 'ResourceNotFoundError';
+  }
+}
+
+export class ToolResultStore {
+  private options: ResultStoreOptions;
+  private entries = new Map<string, StoredToolResult>(); // 挿入順 = LRU順
+  private totalBytes = 0;
+  private stats = {
+    stored: 0,
+    reads: 0,
+    range_reads: 0,
+    evictions: 0,
+    expired: 0
+  };
+
+  constructor(options: Partial<ResultStoreOptions> = {}) {
+    this.options = { ...DEFAULT_RESULT_STORE_OPTIONS, ...options };
+  }
+
+  /**
+   * 環境変数 FREEE_MCP_RESULT_STORE_MAX_BYTES で合計サイズの上限を調整した保存先を作成
+   */
+  static fromEnv(): ToolResultStore {
+    const maxBytes = Number(process.env.FREEE_MCP_RESULT_STORE_MAX_BYTES);
+    return new ToolResultStore({
+      maxTotalBytes: Number.isFinite(maxBytes) && maxBytes > 0
+        ? maxBytes
+        : DEFAULT_RESULT_STORE_OPTIONS.maxTotalBytes
+    });
+  }
+
+  /**
+   * 結果を保存して保存内容を返す
+   */
+  put(tool: string, value: unknown, bytes: number): StoredToolResult {
+    this.evictExpired();
+    const now = Date.now();
+    const entry: StoredToolResult = {
+      id: randomUUID(),
+      tool,
+      value,
+      bytes,
+      createdAt: now,
+      expiresAt: now + this.options.ttlMs
+    };
+
+    this.entries.set(entry.id, entry);
+    this.totalBytes += bytes;
+    this.stats.stored++;
+
+    // 保存したばかりの結果は残す
+    while (
+      this.entries.size > 1 &&
+      (this.entries.size > this.options.maxEntries || this.totalBytes > this.options.maxTotalBytes)
+    ) {
+      const oldest = this.entries.keys().next().value as string;
+      this.remove(oldest);
+      this.stats.evictions++;
+    }
+    return entry;
+  }
+
+  /**
+   * 結果の最上位セクション（オブジェクトのキー）の一覧
+   */
+  sections(entry: StoredToolResult): ResultSection[] {
+    const value = entry.value;
+    if (value === null || typeof value !== 'object' || Array.isArray(value)) return [];
+    return Object.entries(value).map(([name, section]) => ({
+      name,
+      uri: resultUri(entry.id, [name]),
+      ...(Array.isArray(section) && { rows: section.length })
+    }));
+  }
+
+  /**
+   * 保存中の結果の一覧（resources/list 用）
+   */
+  list(): StoredToolResult[] {
+    this.evictExpired();
+    return [...this.entries.values()];
+  }
+
+  /**
+   * URIが指すセクション・行範囲を読み出す
+   * 配列は offset / limit で範囲を切り出し、行数と次の範囲のURIを添えて返す
+   */
+  read(uri: string): unknown {
+    const { id, path, offset, limit } = parseResultUri(uri);
+    const entry = this.touch(id);
+
+    let target: any = entry.value;
+    for (const key of path) {
+      if (target === null || typeof target !== 'object' || !(key in target)) {
+        throw new ResourceNotFoundError(`${uri} にセクション ${path.join('/')} はありません`);
+      }
+      target = target[key];
+    }
+
+    this.stats.reads++;
+    if (!Array.isArray(target)) {
+      return target;
+    }
+
+    const start = offset ?? 0;
+    const pageLimit = Math.max(1, limit ?? this.options.defaultRowLimit);
+    const rows = target.slice(start, start + pageLimit);
+    const next = start + rows.length;
+    if (offset !== undefined || limit !== undefined) this.stats.range_reads++;
+
+    return {
+      path: path.join('/'),
+      offset: start,
+      count: rows.length,
+      total: target.length,
+      rows,
+      ...(next < target.length && { next_uri: resultUri(id, path, next, pageLimit) })
+    };
+  }
+
+  /**
+   * 結果の保存状況の統計情報を取得
+   */
+  getStats() {
+    this.evictExpired();
+    return {
+      ...this.stats,
+      entries: this.entries.size,
+      total_bytes: this.totalBytes,
+      options: this.options
+    };
+  }
+
+  // Private methods
+
+  private touch(id: string): StoredToolResult {
+    this.evictExpired();
+    const entry = this.entries.get(id);
+    if (!entry) {
+      throw new ResourceNotFoundError(`結果 ${id} は存在しないか期限切れです。ツールを再実行してください`);
+    }
+    // 読まれた結果は期限を延長して末尾（最近使った側）へ移動
+    entry.expiresAt = Date.now() + this.options.ttlMs;
+    this.entries.delete(id);
+    this.entries.set(id, entry);
+    return entry;
+  }
+
+  private remove(id: string): void {
+    const entry = this.entries.get(id);
+    if (!entry) return;
+    this.entries.delete(id);
+    this.totalBytes -= entry.bytes;
+  }
+
+  private evictExpired(): void {
+    const now = Date.now();
+    for (const [id, entry] of this.entries) {
+      if (entry.expiresAt <= now) {
+        this.remove(id);
+        this.stats.expired++;
+      }
+    }
+  }
+}
+
+/**
+ * 結果・セクション・行範囲を指すURIを作成
+ */
+export function resultUri(id: string, path: string[] = [], offset?: number, limit?: number): string {
+  const base = [`${RESULT_URI_SCHEME}://${id}`, ...path.map(encodeURIComponent)].join('/');
+  const query = new URLSearchParams();
+  if (offset !== undefined) query.set('offset', String(offset));
+  if (limit !== undefined) query.set('limit', String(limit));
+  const search = query.toString();
+  return search ? `${base}?${search}` : base;
+}
+
+/**
+ * URIを結果ID・セクションのパス・行範囲に分解
+ */
+export function parseResultUri(uri: string): { id: string; path: string[]; offset?: number; limit?: number } {
+  const prefix = `${RESULT_URI_SCHEME}://`;
+  if (!uri.startsWith(prefix)) {
+    throw new ResourceNotFoundError(`${uri} は ${prefix} で始まるURIではありません`);
+  }
+
+  const [location, search = ''] = uri.slice(prefix.length).split('?');
+  const [id, ...path] = location.split('/').filter(Boolean).map(decodeURIComponent);
+  if (!id) {
+    throw new ResourceNotFoundError(`${uri} に結果IDがありません`);
+  }
+
+  const query = new URLSearchParams(search);
+  const toRowNumber = (name: string) => {
+    const text = query.get(name);
+    if (text === null) return undefined;
+    const value = Number(text);
+    if (!Number.isInteger(value) || value < 0) {
+      throw new ResourceNotFoundError(`${uri} の ${name} は0以上の整数で指定してください`);
+    }
+    return value;
+  };
+
+  return { id, path, offset: toRowNumber('offset'), limit: toRowNumber('limit') };
+}
@@ -0,0 +1,357 @@
+/**
+ * freeeデータのローカルミラー（SQLite）
+ * 取引・振替伝票・請求書・取引先を事業所ごとに保存し、同期状態（ウォーターマーク・前回の統計）を管理する
+ *
+ * 保存先: ~/.cache/freee-mcp/sync.db（FREEE_SYNC_DB で変更可能）
+ */
+
+import path from 'path';
+import os from 'os';
+import fs from 'fs';
+import { createHash } from 'crypto';
+import type BetterSqlite3 from 'better-sqlite3';
+
+export type SyncResource = 'deals' | 'manual_journals' | 'invoices' | 'partners';
+
+export const SYNC_RESOURCES: SyncResource[] = ['deals', 'manual_journals', 'invoices', 'partners'];
+
+export interface SyncRunStats {
+  mode: 'incremental' | 'full';
+  started_at: string;
+  duration_ms: number;
+  fetched: number;
+  inserted: number;
+  updated: number;
+  unchanged: number;
+  deleted: number;
+}
+
+export interface SyncState {
+  company_id: string;
+  resource: SyncResource;
+  watermark: string | null;       // 次回の増分取得の起点（更新日）
+  last_full_sync_at: string | null;
+  last_run_at: string | null;
+  last_run: SyncRunStats | null;
+  record_count: number;
+}
+
+// deal_lines を導入したスキーマのバージョン（古いDBは開いたときに明細行を再構築）
+const SCHEMA_VERSION = 1;
+
+// 明細行を持つリソースと deal_lines.source の対応
+const LINE_SOURCES: Partial<Record<SyncResource, string>> = {
+  deals: 'deal',
+  manual_journals: 'manual_journal'
+};
+
+const SCHEMA = `
+  CREATE TABLE IF NOT EXISTS records (
+    company_id TEXT NOT NULL,
+    resource TEXT NOT NULL,
+    id TEXT NOT NULL,
+    issue_date TEXT,
+    updated_at TEXT,
+    hash TEXT NOT NULL,
+    data TEXT NOT NULL,
+    synced_at TEXT NOT NULL,
+    PRIMARY KEY (company_id, resource, id)
+  );
+  CREATE INDEX IF NOT EXISTS records_issue_date ON records (company_id, resource, issue_date);
+
+  -- 取引・振替伝票の明細行（ローカル集計用）
+  CREATE TABLE IF NOT EXISTS deal_lines (
+    company_id TEXT NOT NULL,
+    source TEXT NOT NULL,
+    record_id TEXT NOT NULL,
+    line_no INTEGER NOT NULL,
+    issue_date TEXT,
+    month TEXT,
+    entry_side TEXT,
+    account_item_id INTEGER,
+    partner_id INTEGER,
+    item_id INTEGER,
+    section_id INTEGER,
+    tax_code INTEGER,
+    amount REAL NOT NULL DEFAULT 0,
+    vat REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (company_id, source, record_id, line_no)
+  );
+  CREATE INDEX IF NOT EXISTS deal_lines_date ON deal_lines (company_id, issue_date);
+  CREATE INDEX IF NOT EXISTS deal_lines_account ON deal_lines (company_id, account_item_id, issue_date);
+  CREATE INDEX IF NOT EXISTS deal_lines_partner ON deal_lines (company_id, partner_id, issue_date);
+  CREATE INDEX IF NOT EXISTS deal_lines_section ON deal_lines (company_id, section_id, issue_date);
+  CREATE INDEX IF NOT EXISTS deal_lines_item ON deal_lines (company_id, item_id, issue_date);
+  CREATE INDEX IF NOT EXISTS deal_lines_tax ON deal_lines (company_id, tax_code, issue_date);
+
+  CREATE TABLE IF NOT EXISTS sync_state (
+    company_id TEXT NOT NULL,
+    resource TEXT NOT NULL,
+    watermark TEXT,
+    last_full_sync_at TEXT,
+    last_run_at TEXT,
+    last_run TEXT,
+    PRIMARY KEY (company_id, resource)
+  );
+`;
+
+export class SyncStore {
+  readonly path: string;
+  private db: BetterSqlite3.Database;
+  private deleteLines!: BetterSqlite3.Statement;
+  private insertLine!: BetterSqlite3.Statement;
+
+  private constructor(dbPath: string, db: BetterSqlite3.Database) {
+    this.path = dbPath;
+    this.db = db;
+    this.db.pragma('journal_mode = WAL');
+    this.db.pragma('synchronous = NORMAL');
+    this.db.exec(SCHEMA);
+    this.prepareLineStatements();
+    this.migrate();
+  }
+
+  /**
+   * データベースを開く（better-sqlite3はネイティブモジュールのため、同期機能を使うときだけ読み込む）
+   */
+  static async open(dbPath: string = SyncStore.defaultPath()): Promise<SyncStore> {
+    let Database: typeof BetterSqlite3;
+    try {
+      Database = (await import('better-sqlite3')).default;
+    } catch (error) {
+      throw new Error(`better-sqlite3 を読み込めません。npm install を実行してください: ${error}`);
+    }
+
+    fs.mkdirSync(path.dirname(dbPath), { recursive: true });
+    return new SyncStore(dbPath, new Database(dbPath));
+  }
+
+  static defaultPath(): string {
+    return process.env.FREEE_SYNC_DB ||
+      path.join(os.homedir(), '.cache', 'freee-mcp', 'sync.db');
+  }
+
+  /**
+   * レコードを一括保存（内容が変わっていないレコードは書き込まない）
+   */
+  upsertMany(companyId: string, resource: SyncResource, rows: any[]): { inserted: number; updated: number; unchanged: number } {
+    const select = this.db.prepare(
+      'SELECT hash FROM records WHERE company_id = ? AND resource = ? AND id = ?'
+    );
+    const upsert = this.db.prepare(`
+      INSERT INTO records (company_id, resource, id, issue_date, updated_at, hash, data, synced_at)
+      VALUES (@company_id, @resource, @id, @issue_date, @updated_at, @hash, @data, @synced_at)
+      ON CONFLICT (company_id, resource, id) DO UPDATE SET
+        issue_date = excluded.issue_date,
+        updated_at = excluded.updated_at,
+        hash = excluded.hash,
+        data = excluded.data,
+        synced_at = excluded.synced_at
+    `);
+
+    const counts = { inserted: 0, updated: 0, unchanged: 0 };
+    const syncedAt = new Date().toISOString();
+
+    this.db.transaction(() => {
+      for (const row of rows) {
+        const id = String(row.id);
+        const data = JSON.stringify(row);
+        const hash = createHash('sha1').update(data).digest('hex');
+        const existing = select.get(companyId, resource, id) as { hash: string } | undefined;
+
+        if (existing?.hash === hash) {
+          counts.unchanged++;
+          continue;
+        }
+
+        upsert.run({
+          company_id: companyId,
+          resource,
+          id,
+          issue_date: row.issue_date ?? null,
+          updated_at: row.updated_at ?? null,
+          hash,
+          data,
+          synced_at: syncedAt
+        });
+        this.replaceLines(companyId, resource, id, row);
+        if (existing) {
+          counts.updated++;
+        } else {
+          counts.inserted++;
+        }
+      }
+    })();
+
+    return counts;
+  }
+
+  /**
+   * 全件取得で見つからなかったレコード（freee側で削除済み）を削除
+   */
+  deleteMissing(companyId: string, resource: SyncResource, seenIds: Set<string>): number {
+    const ids = this.db.prepare(
+      'SELECT id FROM records WHERE company_id = ? AND resource = ?'
+    ).pluck().all(companyId, resource) as string[];
+    const remove = this.db.prepare(
+      'DELETE FROM records WHERE company_id = ? AND resource = ? AND id = ?'
+    );
+
+    let deleted = 0;
+    this.db.transaction(() => {
+      for (const id of ids) {
+        if (!seenIds.has(id)) {
+          remove.run(companyId, resource, id);
+          this.replaceLines(companyId, resource, id, null);
+          deleted++;
+        }
+      }
+    })();
+    return deleted;
+  }
+
+  /**
+   * 同期状態を取得
+   */
+  getState(companyId: string, resource: SyncResource): SyncState {
+    const row = this.db.prepare(
+      'SELECT * FROM sync_state WHERE company_id = ? AND resource = ?'
+    ).get(companyId, resource) as any;
+
+    return {
+      company_id: companyId,
+      resource,
+      watermark: row?.watermark ?? null,
+      last_full_sync_at: row?.last_full_sync_at ?? null,
+      last_run_at: row?.last_run_at ?? null,
+      last_run: row?.last_run ? JSON.parse(row.last_run) : null,
+      record_count: this.count(companyId, resource)
+    };
+  }
+
+  /**
+   * 同期結果を記録
+   */
+  saveRun(companyId: string, resource: SyncResource, run: SyncRunStats, watermark: string | null): void {
+    const previous = this.getState(companyId, resource);
+    this.db.prepare(`
+      INSERT INTO sync_state (company_id, resource, watermark, last_full_sync_at, last_run_at, last_run)
+      VALUES (?, ?, ?, ?, ?, ?)
+      ON CONFLICT (company_id, resource) DO UPDATE SET
+        watermark = excluded.watermark,
+        last_full_sync_at = excluded.last_full_sync_at,
+        last_run_at = excluded.last_run_at,
+        last_run = excluded.last_run
+    `).run(
+      companyId,
+      resource,
+      watermark,
+      run.mode === 'full' ? run.started_at : previous.last_full_sync_at,
+      run.started_at,
+      JSON.stringify(run)
+    );
+  }
+
+  /**
+   * 同期済みの事業所ID一覧
+   */
+  listCompanies(): string[] {
+    return this.db.prepare('SELECT DISTINCT company_id FROM sync_state ORDER BY company_id')
+      .pluck().all() as string[];
+  }
+
+  count(companyId: string, resource: SyncResource): number {
+    return this.db.prepare(
+      'SELECT COUNT(*) FROM records WHERE company_id = ? AND resource = ?'
+    ).pluck().get(companyId, resource) as number;
+  }
+
+  /**
+   * 読み取り専用のSQLを実行（ローカル集計用）
+   */
+  query<T = any>(sql: string, params: Record<string, unknown> = {}): T[] {
+    return this.db.prepare(sql).all(params) as T[];
+  }
+
+  close(): void {
+    this.db.close();
+  }
+
+  // Private methods
+
+  private prepareLineStatements(): void {
+    this.deleteLines = this.db.prepare(
+      'DELETE FROM deal_lines WHERE company_id = ? AND source = ? AND record_id = ?'
+    );
+    this.insertLine = this.db.prepare(`
+      INSERT INTO deal_lines (company_id, source, record_id, line_no, issue_date, month, entry_side,
+        account_item_id, partner_id, item_id, section_id, tax_code, amount, vat)
+      VALUES (@company_id, @source, @record_id, @line_no, @issue_date, @month, @entry_side,
+        @account_item_id, @partner_id, @item_id, @section_id, @tax_code, @amount, @vat)
+    `);
+  }
+
+  private migrate(): void {
+    const version = this.db.pragma('user_version', { simple: true }) as number;
+    if (version >= SCHEMA_VERSION) return;
+
+    // 明細行テーブル導入前に同期したレコードから明細行を作り直す
+    const rows = this.db.prepare(
+      "SELECT company_id, resource, id, data FROM records WHERE resource IN ('deals', 'manual_journals')"
+    ).all() as Array<{ company_id: string; resource: SyncResource; id: string; data: string }>;
+
+    this.db.transaction(() => {
+      for (const row of rows) {
+        this.replaceLines(row.company_id, row.resource, row.id, JSON.parse(row.data));
+      }
+      this.db.pragma(`user_version = ${SCHEMA_VERSION}`);
+    })();
+  }
+
+  /**
+   * 取引・振替伝票の明細行を置き換え（recordがnullなら削除のみ）
+   */
+  private replaceLines(companyId: string, resource: SyncResource, recordId: string, record: any | null): void {
+    const source = LINE_SOURCES[resource];
+    if (!source) return;
+
+    this.deleteLines.run(companyId, source, recordId);
+    if (!record) return;
+
+    const issueDate: string | null = record.issue_date ?? null;
+    (record.details || []).forEach((detail: any, index: number) => {
+      this.insertLine.run({
+        company_id: companyId,
+        source,
+        record_id: recordId,
+        line_no: index,
+        issue_date: issueDate,
+        month: issueDate ? issueDate.slice(0, 7) : null,
+        // 取引の明細に貸借がなければ収入=貸方、支出=借方
+        entry_side: detail.entry_side ?? (record.type === 'income' ? 'credit' : 'debit'),
+        account_item_id: detail.account_item_id ?? null,
+        partner_id: detail.partner_id ?? record.partner_id ?? null,
+        item_id: detail.item_id ?? null,
+        section_id: detail.section_id ?? null,
+        tax_code: detail.tax_code ?? null,
+        amount: detail.amount ?? 0,
+        vat: detail.vat ?? 0
+      });
+    });
+  }
+}
+
+let sharedSyncStore: Promise<SyncStore> | null = null;
+
+/**
+ * プロセス全体で共有する同期ストアを取得
+ */
+export function getSharedSyncStore(): Promise<SyncStore> {
+  if (!sharedSyncStore) {
+    sharedSyncStore = SyncStore.open().catch((error) => {
+      sharedSyncStore = null;
+      throw error;
+    });
+  }
+  return sharedSyncStore;
+}
@@ -0,0 +1,116 @@
+/**
+ * 依存関係付きタスクの並列実行
+ * 依存するタスクがすべて完了した時点で各タスクを開始し、依存関係のないタスクは同時に実行する
+ */
+
+export interface TaskTiming {
+  name: string;
+  status: 'done' | 'failed' | 'skipped';
+  started_ms: number;   // 実行開始からの経過時間
+  duration_ms: number;
+}
+
+interface TaskDefinition {
+  name: string;
+  dependsOn: string[];
+  run: (inputs: Record<string, any>) => Promise<any>;
+}
+
+export class TaskGraph {
+  private tasks = new Map<string, TaskDefinition>();
+
+  /**
+   * タスクを追加（run には依存タスクの結果が名前をキーに渡される）
+   */
+  add<T>(name: string, dependsOn: string[], run: (inputs: Record<string, any>) => Promise<T>): this {
+    if (this.tasks.has(name)) {
+      throw new Error(`タスク ${name} は既に登録されています`);
+    }
+    this.tasks.set(name, { name, dependsOn, run });
+    return this;
+  }
+
+  has(name: string): boolean {
+    return this.tasks.has(name);
+  }
+
+  /**
+   * 全タスクを実行
+   * 失敗したタスクに依存するタスクは実行せず、全タスクの終了後に最初のエラーを投げる
+   */
+  async run(): Promise<{ results: Record<string, any>; timings: TaskTiming[]; total_ms: number }> {
+    this.validate();
+
+    const startedAt = Date.now();
+    const results: Record<string, any> = {};
+    const timings = new Map<string, TaskTiming>();
+    const running = new Map<string, Promise<void>>();
+    let firstError: unknown = null;
+
+    const start = (task: TaskDefinition): Promise<void> => {
+      let promise = running.get(task.name);
+      if (promise) return promise;
+
+      promise = (async () => {
+        await Promise.all(task.dependsOn.map(name => start(this.tasks.get(name)!)));
+
+        const taskStart = Date.now();
+        const failedDependency = task.dependsOn.some(name => timings.get(name)?.status !== 'done');
+        if (failedDependency) {
+          timings.set(task.name, { name: task.name, status: 'skipped', started_ms: taskStart - startedAt, duration_ms: 0 });
+          return;
+        }
+
+        const inputs = Object.fromEntries(task.dependsOn.map(name => [name, results[name]]));
+        try {
+          results[task.name] = await task.run(inputs);
+          timings.set(task.name, timing(task.name, 'done', startedAt, taskStart));
+        } catch (error) {
+          firstError ??= error;
+          timings.set(task.name, timing(task.name, 'failed', startedAt, taskStart));
+        }
+      })();
+      running.set(task.name, promise);
+      return promise;
+    };
+
+    await Promise.all(Array.from(this.tasks.values(), start));
+
+    if (firstError) throw firstError;
+
+    return {
+      results,
+      timings: Array.from(this.tasks.keys(), name => timings.get(name)!),
+      total_ms: Date.now() - startedAt
+    };
+  }
+
+  // Private methods
+
+  /**
+   * 未登録の依存先・循環依存を検出
+   */
+  private validate(): void {
+    const state = new Map<string, 'visiting' | 'visited'>();
+
+    const visit = (name: string, path: string[]) => {
+      const task = this.tasks.get(name);
+      if (!task) {
+        throw new Error(`タスク ${path[path.length - 1]} の依存先 ${name} が登録されていません`);
+      }
+      if (state.get(name) === 'visited') return;
+      if (state.get(name) === 'visiting') {
+        throw new Error(`タスクの依存関係が循環しています: ${[...path, name].join(' → ')}`);
+      }
+      state.set(name, 'visiting');
+      for (const dependency of task.dependsOn) visit(dependency, [...path, name]);
+      state.set(name, 'visited');
+    };
+
+    for (const name of this.tasks.keys()) visit(name, []);
+  }
+}
+
+function timing(name: string, status: TaskTiming['status'], startedAt: number, taskStart: number): TaskTiming {
+  return { name, status, started_ms: taskStart - startedAt, duration_ms: Date.now() - taskStart };
+}
@@ -0,0 +1,398 @@
+/**
+ * MCPツール結果の出力整形
+ * 大きな結果でもレスポンスサイズと直列化・転送・再パースの時間が一定以内に収まるようにする
+ *
+ * - 直列化形式: compact（改行・インデントなし）/ pretty
+ * - fields: ドット区切りのパスで結果の項目を絞り込む（配列は各要素に適用）
+ * - ページ分割: 結果中の最大の配列を page_size 件ずつ返し、続きは cursor で取得
+ * - サイズ上限: 上限を超える応答は打ち切り、続きを cursor で取得
+ *
+ * 続きのページは最初の呼び出し時の結果を一定時間保持して返すため、ツールを再実行しない
+ *
+ * 結果保存先（ToolResultStore）を渡した場合、しきい値を超える結果は本文を返さずに保存し、
+ * MCPリソースのURIとセクション一覧を返す（inline または page_size 指定時を除く）
+ */
+
+import { randomUUID } from 'crypto';
+import { z } from 'zod';
+import { StoredToolResult, ToolResultStore, resultUri } from './result-store.js';
+
+export type ResponseFormat = 'compact' | 'pretty';
+
+export const ToolOutputOptionsSchema = z.object({
+  response_format: z.enum(['compact', 'pretty']).optional().describe('結果JSONの形式（compact: 改行・インデントなし）'),
+  fields: z.array(z.string()).optional().describe('結果に含める項目（ドット区切りのパス、配列は各要素に適用。例: ["deals.id", "deals.amount"]）'),
+  page_size: z.number().int().min(1).optional().describe('結果中の最大の配列を何件ずつ返すか'),
+  cursor: z.string().optional().describe('前回の結果の _page.next_cursor（指定するとツールを再実行せず続きを返す）'),
+  inline: z.boolean().optional().describe('大きな結果もリソースに保存せず、このレスポンスで返す')
+});
+
+export type ToolOutputOptions = z.infer<typeof ToolOutputOptionsSchema>;
+
+export interface ToolOutputSettings {
+  defaultFormat: ResponseFormat;
+  maxResponseBytes: number;
+  resourceThresholdBytes: number; // これを超える結果はリソースに保存（0で無効）
+  maxStoredResults: number;
+  ttlMs: number;
+}
+
+export const DEFAULT_TOOL_OUTPUT_SETTINGS: ToolOutputSettings = {
+  defaultFormat: 'pretty',
+  maxResponseBytes: 512 * 1024,
+  resourceThresholdBytes: 128 * 1024,
+  maxStoredResults: 20,
+  ttlMs: 10 * 60 * 1000
+};
+
+// _page などのメタデータ用に空けておくバイト数
+const PAGE_METADATA_BYTES = 512;
+
+// リソースに保存した結果のうち、このサイズ以下のセクションはプレビューとして直接返す
+const PREVIEW_SECTION_BYTES = 2 * 1024;
+
+/**
+ * 期限切れ・存在しないカーソル
+ */
+export class InvalidCursorError extends Error {
+  constructor(message: string) {
+    super(message);
+    this.name = 'InvalidCursorError';
+  }
+}
+
+interface StoredResult {
+  tool: string;
+  format: ResponseFormat;
+  expiresAt: number;
+  // 配列のページ分割
+  value?: unknown;
+  path?: string[];
+  // 直列化済みテキストの分割（配列で分割できない場合）
+  bytes?: Buffer;
+  pageSize: number; // 配列の件数、またはテキストのバイト数
+}
+
+export class ToolOutputFormatter {
+  private settings: ToolOutputSettings;
+  private resultStore?: ToolResultStore;
+  private results = new Map<string, StoredResult>(); // 挿入順 = 古い順
+  private stats = {
+    responses: 0,
+    paged_responses: 0,
+    offloaded_responses: 0,
+    truncated_responses: 0,
+    continuation_reads: 0,
+    bytes_sent: 0
+  };
+
+  constructor(settings: Partial<ToolOutputSettings> = {}, resultStore?: ToolResultStore) {
+    this.settings = { ...DEFAULT_TOOL_OUTPUT_SETTINGS, ...settings };
+    this.resultStore = resultStore;
+  }
+
+  /**
+   * 環境変数 FREEE_MCP_RESPONSE_FORMAT（compact / pretty）、FREEE_MCP_MAX_RESPONSE_BYTES、
+   * FREEE_MCP_RESOURCE_THRESHOLD_BYTES で既定値を調整した整形器を作成
+   */
+  static fromEnv(resultStore?: ToolResultStore): ToolOutputFormatter {
+    const format = process.env.FREEE_MCP_RESPONSE_FORMAT;
+    const maxBytes = Number(process.env.FREEE_MCP_MAX_RESPONSE_BYTES);
+    const threshold = Number(process.env.FREEE_MCP_RESOURCE_THRESHOLD_BYTES);
+    return new ToolOutputFormatter({
+      defaultFormat: format === 'compact' || format === 'pretty'
+        ? format
+        : DEFAULT_TOOL_OUTPUT_SETTINGS.defaultFormat,
+      maxResponseBytes: Number.isFinite(maxBytes) && maxBytes > PAGE_METADATA_BYTES * 2
+        ? maxBytes
+        : DEFAULT_TOOL_OUTPUT_SETTINGS.maxResponseBytes,
+      resourceThresholdBytes: Number.isFinite(threshold) && threshold >= 0 && process.env.FREEE_MCP_RESOURCE_THRESHOLD_BYTES
+        ? threshold
+        : DEFAULT_TOOL_OUTPUT_SETTINGS.resourceThresholdBytes
+    }, resultStore);
+  }
+
+  /**
+   * ツールの結果をレスポンス用のテキストに整形
+   */
+  format(tool: string, result: unknown, options: ToolOutputOptions = {}): string {
+    const format = options.response_format || this.settings.defaultFormat;
+    const value = options.fields && options.fields.length > 0
+      ? projectFields(result, options.fields)
+      : result;
+    let text: string;
+
+    if (this.canOffload(options)) {
+      // 保存するかは compact のサイズで判定し、保存する結果を pretty で直列化しない
+      const compact = serialize(value, 'compact');
+      const compactBytes = byteLength(compact);
+      if (compactBytes > this.settings.resourceThresholdBytes) {
+        const entry = this.resultStore!.put(tool, value, compactBytes);
+        this.stats.offloaded_responses++;
+        return this.send(serialize(this.resourceSummary(entry), format));
+      }
+      text = format === 'compact' ? compact : serialize(value, format);
+    } else {
+      text = serialize(value, format);
+    }
+
+    const path = findLargestArray(value);
+    if (path && (options.page_size || byteLength(text) > this.settings.maxResponseBytes)) {
+      const array = getAt(value, path) as unknown[];
+      const pageSize = options.page_size ?? this.estimatePageSize(array, byteLength(text), format);
+      if (pageSize && array.length > pageSize) {
+        const id = this.store({ tool, format, value, path, pageSize });
+        text = serialize(this.arrayPage(id, 0), format);
+        this.stats.paged_responses++;
+      }
+    }
+
+    return this.finish(tool, text, format);
+  }
+
+  /**
+   * カーソルが指す続きのページを返す
+   */
+  continue(tool: string, cursor: string): string {
+    const [id, offsetText] = cursor.split(':');
+    const offset = Number(offsetText);
+    const entry = this.results.get(id);
+
+    if (!entry || entry.expiresAt <= Date.now() || !Number.isInteger(offset) || offset < 0) {
+      if (entry) this.results.delete(id);
+      throw new InvalidCursorError(`カーソル ${cursor} は無効か期限切れです。ツールを再実行してください`);
+    }
+    if (entry.tool !== tool) {
+      throw new InvalidCursorError(`カーソル ${cursor} は ${entry.tool} の結果です`);
+    }
+
+    this.stats.continuation_reads++;
+    if (entry.bytes) {
+      return this.send(serialize(this.textPage(id, offset), entry.format));
+    }
+    return this.finish(tool, serialize(this.arrayPage(id, offset), entry.format), entry.format);
+  }
+
+  /**
+   * 出力整形の統計情報を取得
+   */
+  getStats() {
+    this.evictExpired();
+    return {
+      ...this.stats,
+      stored_results: this.results.size,
+      settings: this.settings
+    };
+  }
+
+  // Private methods
+
+  private canOffload(options: ToolOutputOptions): boolean {
+    return Boolean(this.resultStore) &&
+      this.settings.resourceThresholdBytes > 0 &&
+      !options.inline &&
+      !options.page_size;
+  }
+
+  /**
+   * リソースに保存した結果の代わりに返す概要（URI・セクション一覧・小さなセクションのプレビュー）
+   */
+  private resourceSummary(entry: StoredToolResult) {
+    const value = entry.value;
+    const preview: Record<string, unknown> = {};
+    if (value !== null && typeof value === 'object' && !Array.isArray(value)) {
+      for (const [key, section] of Object.entries(value)) {
+        if (!Array.isArray(section) && byteLength(serialize(section, 'compact')) <= PREVIEW_SECTION_BYTES) {
+          preview[key] = section;
+        }
+      }
+    }
+
+    return {
+      _resource: {
+        uri: resultUri(entry.id),
+        tool: entry.tool,
+        size_bytes: entry.bytes,
+        expires_at: new Date(entry.expiresAt).toISOString(),
+        ...(Array.isArray(value)
+          ? { rows: value.length }
+          : { sections: this.resultStore!.sections(entry) }),
+        usage: 'resources/read でURIを読み出してください。配列は ?offset=0&limit=100 のように行範囲を指定できます'
+      },
+      ...(Object.keys(preview).length > 0 && { preview })
+    };
+  }
+
+  /**
+   * サイズ上限を超えていればテキストを分割して最初の部分を返す
+   */
+  private finish(tool: string, text: string, format: ResponseFormat): string {
+    if (byteLength(text) <= this.settings.maxResponseBytes) {
+      return this.send(text);
+    }
+
+    const id = this.store({
+      tool,
+      format,
+      bytes: Buffer.from(text, 'utf8'),
+      // 文字列として埋め込むと引用符・改行のエスケープで膨らむため、上限の半分ずつ区切る
+      pageSize: Math.floor((this.settings.maxResponseBytes - PAGE_METADATA_BYTES) / 2)
+    });
+    this.stats.truncated_responses++;
+    return this.send(serialize(this.textPage(id, 0), format));
+  }
+
+  private send(text: string): string {
+    this.stats.responses++;
+    this.stats.bytes_sent += byteLength(text);
+    return text;
+  }
+
+  /**
+   * 配列の1ページ分を差し込んだ結果を作成
+   */
+  private arrayPage(id: string, offset: number) {
+    const entry = this.results.get(id)!;
+    const array = getAt(entry.value, entry.path!) as unknown[];
+    const items = array.slice(offset, offset + entry.pageSize);
+    const next = offset + items.length;
+
+    const page = {
+      path: entry.path!.join('.'),
+      offset,
+      count: items.length,
+      total: array.length,
+      ...(next < array.length && { next_cursor: `${id}:${next}` })
+    };
+
+    if (entry.path!.length === 0) {
+      return { items, _page: page };
+    }
+    return { ...(replaceAt(entry.value, entry.path!, items) as object), _page: page };
+  }
+
+  /**
+   * 直列化済みテキストの1ページ分（UTF-8の文字境界で区切る）
+   */
+  private textPage(id: string, offset: number) {
+    const entry = this.results.get(id)!;
+    const bytes = entry.bytes!;
+    let end = Math.min(offset + entry.pageSize, bytes.length);
+    while (end < bytes.length && (bytes[end] & 0xc0) === 0x80) end--;
+
+    return {
+      partial_json: bytes.subarray(offset, end).toString('utf8'),
+      _page: {
+        offset,
+        length: end - offset,
+        total_length: bytes.length,
+        ...(end < bytes.length && { next_cursor: `${id}:${end}` })
+      }
+    };
+  }
+
+  /**
+   * 1ページがサイズ上限に収まる件数を見積もる（配列以外の部分で上限を超える場合は 0）
+   */
+  private estimatePageSize(array: unknown[], totalBytes: number, format: ResponseFormat): number {
+    const arrayBytes = byteLength(serialize(array, format));
+    const budget = this.settings.maxResponseBytes - (totalBytes - arrayBytes) - PAGE_METADATA_BYTES;
+    if (budget <= 0 || arrayBytes === 0) return 0;
+    return Math.max(1, Math.floor(array.length * budget / arrayBytes));
+  }
+
+  private store(entry: Omit<StoredResult, 'expiresAt'>): string {
+    this.evictExpired();
+    const id = randomUUID();
+    this.results.set(id, { ...entry, expiresAt: Date.now() + this.settings.ttlMs });
+
+    while (this.results.size > this.settings.maxStoredResults) {
+      const oldest = this.results.keys().next().value as string;
+      this.results.delete(oldest);
+    }
+    return id;
+  }
+
+  private evictExpired(): void {
+    const now = Date.now();
+    for (const [id, entry] of this.results) {
+      if (entry.expiresAt <= now) this.results.delete(id);
+    }
+  }
+}
+
+/**
+ * ドット区切りのパスで指定した項目だけを残す（配列は各要素に同じ指定を適用）
+ */
+export function projectFields(value: unknown, fields: string[]): unknown {
+  const tree: FieldTree = {};
+  for (const field of fields) {
+    let node = tree;
+    const parts = field.split('.').filter(Boolean);
+    for (let i = 0; i < parts.length; i++) {
+      const part = parts[i];
+      if (node[part] === true) break; // 親の項目が丸ごと含まれている
+      if (i === parts.length - 1) {
+        node[part] = true;
+      } else {
+        node = (node[part] ||= {}) as FieldTree;
+      }
+    }
+  }
+  return project(value, tree);
+}
+
+type FieldTree = { [key: string]: FieldTree | true };
+
+function project(value: unknown, tree: FieldTree | true): unknown {
+  if (tree === true || value === null || typeof value !== 'object') return value;
+  if (Array.isArray(value)) return value.map(item => project(item, tree));
+
+  const source = value as Record<string, unknown>;
+  const result: Record<string, unknown> = {};
+  for (const [key, subtree] of Object.entries(tree)) {
+    if (key in source) result[key] = project(source[key], subtree);
+  }
+  return result;
+}
+
+/**
+ * 結果中で最も要素数の多い配列のパスを探す（配列の中までは探さない）
+ */
+function findLargestArray(value: unknown, maxDepth = 4): string[] | undefined {
+  let best: { path: string[]; length: number } | undefined;
+
+  const visit = (node: unknown, path: string[]) => {
+    if (Array.isArray(node)) {
+      if (!best || node.length > best.length) best = { path, length: node.length };
+      return;
+    }
+    if (node === null || typeof node !== 'object' || path.length >= maxDepth) return;
+    for (const [key, child] of Object.entries(node)) {
+      visit(child, [...path, key]);
+    }
+  };
+
+  visit(value, []);
+  return best && best.length > 1 ? best.path : undefined;
+}
+
+function getAt(value: unknown, path: string[]): unknown {
+  return path.reduce((node: any, key) => node?.[key], value);
+}
+
+function replaceAt(value: unknown, path: string[], replacement: unknown): unknown {
+  if (path.length === 0) return replacement;
+  const [head, ...rest] = path;
+  const source = value as Record<string, unknown>;
+  return { ...source, [head]: replaceAt(source[head], rest, replacement) };
+}
+
+function serialize(value: unknown, format: ResponseFormat): string {
+  const text = format === 'compact' ? JSON.stringify(value) : JSON.stringify(value, null, 2);
+  return text ?? 'null';
+}
+
+function byteLength(text: string): number {
+  return Buffer.byteLength(text, 'utf8');
+}
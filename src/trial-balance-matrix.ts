@@ -0,0 +1,200 @@
+/**
+ * 試算表の列指向マトリクス
+ * 勘定科目のインデックスと、勘定科目 × 期間 の数値配列（Float64Array）で試算表を保持する
+ *
+ * 試算表レスポンスの残高行はオブジェクトとして保持せず、必要な数値だけを取り込む。
+ * 取引先別の内訳（breakdown_display_type: 'partner'）は、取り込みを指定した場合のみ保持する。
+ */
+
+export interface PartnerSeries {
+  partner_id: number;
+  partner_name: string;
+  periods: Record<string, number>;
+}
+
+// 勘定科目数の初期容量（足りなくなれば倍に拡張）
+const INITIAL_CAPACITY = 64;
+
+// 1レスポンス内の行位置の上限（初出順の比較キー用）
+const POSITION_RANGE = 1_000_000;
+
+export class TrialBalanceMatrix {
+  readonly periods: readonly string[];
+  private readonly periodIndex: Map<string, number>;
+  private readonly rowById = new Map<number, number>();
+  // 同じIDで名前の異なる行（期間中の名称変更）
+  private readonly renamedRows = new Map<string, number>();
+
+  private accountIds: number[] = [];
+  private accountNames: string[] = [];
+  private firstSeen: number[] = [];
+  private capacity: number;
+  private values: Float64Array;
+  private present: Uint8Array;
+  // 行番号 → 取引先ID → 取引先別の期間値
+  private partnerDetails = new Map<number, Map<number, { name: string; values: Map<string, number> }>>();
+
+  constructor(periods: readonly string[], initialCapacity: number = INITIAL_CAPACITY) {
+    this.periods = periods;
+    this.periodIndex = new Map(periods.map((period, index) => [period, index]));
+    this.capacity = Math.max(1, initialCapacity);
+    this.values = new Float64Array(this.capacity * periods.length);
+    this.present = new Uint8Array(this.capacity * periods.length);
+  }
+
+  get accountCount(): number {
+    return this.accountIds.length;
+  }
+
+  /**
+   * 1期間分の残高行を取り込む（合計行・勘定科目名のない行は除外）
+   * withPartners を指定すると、残高行の partners（取引先別内訳）も同じ計算式で取り込む
+   */
+  addBalances(
+    period: string,
+    balances: any[] | undefined,
+    valueOf: (balance: any) => number,
+    withPartners: boolean = false
+  ): void {
+    const column = this.periodIndex.get(period);
+    if (column === undefined) {
+      throw new Error(`期間 ${period} はマトリクスに含まれていません`);
+    }
+
+    (balances || []).forEach((balance, position) => {
+      if (balance.total_line || !balance.account_item_name) return;
+
+      const row = this.rowFor(balance.account_item_id, balance.account_item_name, column * POSITION_RANGE + position);
+      const offset = row * this.periods.length + column;
+      this.values[offset] = valueOf(balance);
+      this.present[offset] = 1;
+
+      if (withPartners && balance.partners) {
+        this.addPartners(row, period, balance.partners, valueOf);
+      }
+    });
+  }
+
+  accountId(row: number): number {
+    return this.accountIds[row];
+  }
+
+  accountName(row: number): string {
+    return this.accountNames[row];
+  }
+
+  /**
+   * 勘定科目が最初に現れた位置（期間順 → レスポンス内の行順）の比較キー
+   */
+  firstSeenOrder(row: number): number {
+    return this.firstSeen[row];
+  }
+
+  /**
+   * 勘定科目の期間別の値（値のある期間のみ、期間順）
+   */
+  rowPeriods(row: number): Record<string, number> {
+    const result: Record<string, number> = {};
+    const base = row * this.periods.length;
+    for (let column = 0; column < this.periods.length; column++) {
+      if (this.present[base + column]) {
+        result[this.periods[column]] = this.values[base + column];
+      }
+    }
+    return result;
+  }
+
+  /**
+   * 勘定科目の取引先別内訳（内訳を取り込んでいない場合は空配列）
+   */
+  rowPartners(row: number): PartnerSeries[] {
+    const details = this.partnerDetails.get(row);
+    if (!details) return [];
+
+    return Array.from(details, ([partnerId, { name, values }]) => {
+      const periods: Record<string, number> = {};
+      for (const period of this.periods) {
+        const value = values.get(period);
+        if (value !== undefined) periods[period] = value;
+      }
+      return { partner_id: partnerId, partner_name: name, periods };
+    });
+  }
+
+  /**
+   * 勘定科目の値を期間別の合計配列に加算（値のない期間は0）
+   */
+  accumulate(row: number, totals: Float64Array, absolute: boolean = false): void {
+    const base = row * this.periods.length;
+    for (let column = 0; column < this.periods.length; column++) {
+      const value = this.values[base + column];
+      totals[column] += absolute ? Math.abs(value) : value;
+    }
+  }
+
+  /**
+   * いずれかの勘定科目に値のある期間を記録
+   */
+  markActivePeriods(active: Uint8Array): void {
+    const columns = this.periods.length;
+    for (let row = 0; row < this.accountIds.length; row++) {
+      const base = row * columns;
+      for (let column = 0; column < columns; column++) {
+        active[column] |= this.present[base + column];
+      }
+    }
+  }
+
+  // Private methods
+
+  private rowFor(accountId: number, accountName: string, seen: number): number {
+    let row = this.rowById.get(accountId);
+    if (row !== undefined && this.accountNames[row] !== accountName) {
+      row = this.renamedRows.get(`${accountId}\u0000${accountName}`);
+    }
+    if (row !== undefined) {
+      // 期間は取得完了順に取り込まれるため、最も早い出現位置を残す
+      if (seen < this.firstSeen[row]) this.firstSeen[row] = seen;
+      return row;
+    }
+
+    row = this.accountIds.length;
+    if (row === this.capacity) this.grow();
+
+    this.accountIds.push(accountId);
+    this.accountNames.push(accountName);
+    this.firstSeen.push(seen);
+    if (this.rowById.has(accountId)) {
+      this.renamedRows.set(`${accountId}\u0000${accountName}`, row);
+    } else {
+      this.rowById.set(accountId, row);
+    }
+    return row;
+  }
+
+  private addPartners(row: number, period: string, partners: any[], valueOf: (balance: any) => number): void {
+    let details = this.partnerDetails.get(row);
+    if (!details) {
+      details = new Map();
+      this.partnerDetails.set(row, details);
+    }
+    for (const partner of partners) {
+      let series = details.get(partner.id);
+      if (!series) {
+        series = { name: partner.name, values: new Map() };
+        details.set(partner.id, series);
+      }
+      series.values.set(period, valueOf(partner));
+    }
+  }
+
+  private grow(): void {
+    this.capacity *= 2;
+    const values = new Float64Array(this.capacity * this.periods.length);
+    const present = new Uint8Array(this.capacity * this.periods.length);
+    values.set(this.values);
+    present.set(this.present);
+    this.values = values;
+    this.present = present;
+  }
+}
@@ -0,0 +1,264 @@
+/**
+ * 締め済み月の試算表ディスクキャッシュ
+ * 月末から猶予日数が過ぎた月の試算表（trial_pl / trial_bs）は変わらないものとして永続保存し、
+ * 未確定の月と明示的に無効化した月だけをAPIから取得する
+ *
+ * 保存先: ~/.cache/freee-mcp/trial-balances/<事業所ID>/<YYYY-MM>/<pl|bs>-<内訳種別>.json
+ */
+
+import fs from 'fs/promises';
+import path from 'path';
+import os from 'os';
+import { MonthRange, getMonthRange } from './periods.js';
+
+export type TrialBalanceStatement = 'pl' | 'bs';
+
+export interface TrialBalanceStoreOptions {
+  directory: string;
+  graceDays: number; // 月末から何日経過したら締め済みとみなすか
+  enabled: boolean;
+}
+
+interface StoredTrialBalance {
+  company_id: string;
+  month: string;
+  statement: TrialBalanceStatement;
+  breakdown_display_type: string | null;
+  fetched_at: string;
+  response: unknown;
+}
+
+const DAY = 24 * 60 * 60 * 1000;
+
+export const DEFAULT_TRIAL_BALANCE_STORE_OPTIONS: TrialBalanceStoreOptions = {
+  directory: path.join(os.homedir(), '.cache', 'freee-mcp', 'trial-balances'),
+  graceDays: 30,
+  enabled: true
+};
+
+export class TrialBalanceStore {
+  readonly options: TrialBalanceStoreOptions;
+  private stats = {
+    hits: 0,
+    misses: 0,
+    writes: 0,
+    skipped_open_months: 0,
+    invalidated_files: 0,
+    stale_writes_skipped: 0
+  };
+  // 事業所ごとの無効化の世代（読み込み中に無効化されたら、その結果は保存しない）
+  private generations = new Map<string, number>();
+
+  constructor(options: Partial<TrialBalanceStoreOptions> = {}) {
+    this.options = { ...DEFAULT_TRIAL_BALANCE_STORE_OPTIONS, ...options };
+  }
+
+  /**
+   * 期間が1か月ちょうどならその月を返す（それ以外はキャッシュ対象外）
+   */
+  static toSingleMonth(startDate: string, endDate: string): MonthRange | undefined {
+    const match = startDate.match(/^(\d{4})-(\d{2})-01$/);
+    if (!match) return undefined;
+
+    const range = getMonthRange(Number(match[1]), Number(match[2]));
+    return range.end_date === endDate ? range : undefined;
+  }
+
+  /**
+   * 締め済みの月か（月末 + 猶予日数が過去）
+   */
+  isClosed(range: MonthRange, now = new Date()): boolean {
+    const monthEnd = new Date(range.year, range.month, 0, 23, 59, 59, 999).getTime();
+    return monthEnd + this.options.graceDays * DAY < now.getTime();
+  }
+
+  /**
+   * 締め済みの月はディスクから、それ以外はloadで取得（締め済みなら保存）
+   */
+  async getOrLoad<T>(
+    companyId: string,
+    statement: TrialBalanceStatement,
+    range: MonthRange,
+    breakdownDisplayType: string | undefined,
+    load: () => Promise<T>,
+    options: { bypassCache?: boolean } = {}
+  ): Promise<T> {
+    if (!this.options.enabled) {
+      return load();
+    }
+    if (!this.isClosed(range)) {
+      this.stats.skipped_open_months++;
+      return load();
+    }
+
+    const file = this.filePath(companyId, statement, range, breakdownDisplayType);
+
+    if (!options.bypassCache) {
+      const stored = await this.read(file);
+      if (stored) {
+        this.stats.hits++;
+        return stored.response as T;
+      }
+    }
+
+    this.stats.misses++;
+    const generation = this.generation(companyId);
+    const response = await load();
+    await this.write(companyId, generation, file, {
+      company_id: companyId,
+      month: monthKey(range),
+      statement,
+      breakdown_display_type: breakdownDisplayType ?? null,
+      fetched_at: new Date().toISOString(),
+      response
+    });
+    return response;
+  }
+
+  /**
+   * 保存済みの試算表を削除（年・月を省略するとその事業所の全期間）
+   */
+  async invalidate(companyId: string, year?: number, month?: number): Promise<number> {
+    this.bumpGeneration(companyId);
+    return this.removeMonths(companyId, dir => {
+      const [dirYear, dirMonth] = dir.split('-').map(Number);
+      return (year === undefined || dirYear === year) && (month === undefined || dirMonth === month);
+    });
+  }
+
+  /**
+   * 指定日を含む月以降の試算表を削除
+   * 過去日付の取引を登録するとその月のPLと以降の月のBS残高が変わるため
+   */
+  async invalidateFrom(companyId: string, date: string): Promise<number> {
+    const fromMonth = date.slice(0, 7);
+    this.bumpGeneration(companyId);
+    return this.removeMonths(companyId, dir => dir >= fromMonth);
+  }
+
+  /**
+   * キャッシュの統計情報を取得
+   */
+  getStats() {
+    return {
+      ...this.stats,
+      options: this.options
+    };
+  }
+
+  // Private methods
+
+  private generation(companyId: string): number {
+    return this.generations.get(companyId) ?? 0;
+  }
+
+  private bumpGeneration(companyId: string): void {
+    this.generations.set(companyId, this.generation(companyId) + 1);
+  }
+
+  private async removeMonths(companyId: string, match: (monthDir: string) => boolean): Promise<number> {
+    const companyDir = path.join(this.options.directory, sanitize(companyId));
+    let removed = 0;
+
+    let monthDirs: string[];
+    try {
+      monthDirs = await fs.readdir(companyDir);
+    } catch {
+      return 0;
+    }
+
+    for (const dir of monthDirs) {
+      if (!match(dir)) continue;
+
+      const monthDir = path.join(companyDir, dir);
+      const files = await fs.readdir(monthDir).catch(() => [] as string[]);
+      removed += files.filter(file => file.endsWith('.json')).length;
+      await fs.rm(monthDir, { recursive: true, force: true });
+    }
+
+    this.stats.invalidated_files += removed;
+    return removed;
+  }
+
+  private filePath(
+    companyId: string,
+    statement: TrialBalanceStatement,
+    range: MonthRange,
+    breakdownDisplayType: string | undefined
+  ): string {
+    return path.join(
+      this.options.directory,
+      sanitize(companyId),
+      monthKey(range),
+      `${statement}-${breakdownDisplayType || 'none'}.json`
+    );
+  }
+
+  private async read(file: string): Promise<StoredTrialBalance | null> {
+    try {
+      return JSON.parse(await fs.readFile(file, 'utf8')) as StoredTrialBalance;
+    } catch {
+      // 未保存または壊れたファイルはAPIから取得し直す
+      return null;
+    }
+  }
+
+  private async write(
+    companyId: string,
+    generation: number,
+    file: string,
+    data: StoredTrialBalance
+  ): Promise<void> {
+    // 取得中に過去日付の書き込みで無効化された場合、書き込み前の試算表を永続化しない
+    if (this.generation(companyId) !== generation) {
+      this.stats.stale_writes_skipped++;
+      return;
+    }
+
+    // 一時ファイルに書いてからrenameし、読み込み途中のファイルを見せない
+    const tmp = `${file}.${process.pid}.tmp`;
+    try {
+      await fs.mkdir(path.dirname(file), { recursive: true });
+      await fs.writeFile(tmp, JSON.stringify(data), 'utf8');
+      if (this.generation(companyId) !== generation) {
+        this.stats.stale_writes_skipped++;
+        await fs.rm(tmp, { force: true });
+        return;
+      }
+      await fs.rename(tmp, file);
+      this.stats.writes++;
+    } catch (error) {
+      console.error(`試算表キャッシュの保存に失敗しました (${file}):`, error);
+      await fs.rm(tmp, { force: true }).catch(() => undefined);
+    }
+  }
+}
+
+let sharedTrialBalanceStore: TrialBalanceStore | null = null;
+
+/**
+ * プロセス全体で共有する試算表キャッシュを取得
+ * 環境変数 FREEE_TRIAL_BALANCE_CACHE_DIR / FREEE_TRIAL_BALANCE_GRACE_DAYS /
+ * FREEE_TRIAL_BALANCE_CACHE（0で無効）で調整可能
+ */
+export function getSharedTrialBalanceStore(): TrialBalanceStore {
+  if (!sharedTrialBalanceStore) {
+    const graceDays = Number(process.env.FREEE_TRIAL_BALANCE_GRACE_DAYS);
+    sharedTrialBalanceStore = new TrialBalanceStore({
+      directory: process.env.FREEE_TRIAL_BALANCE_CACHE_DIR || DEFAULT_TRIAL_BALANCE_STORE_OPTIONS.directory,
+      graceDays: process.env.FREEE_TRIAL_BALANCE_GRACE_DAYS && Number.isFinite(graceDays) && graceDays >= 0
+        ? graceDays
+        : DEFAULT_TRIAL_BALANCE_STORE_OPTIONS.graceDays,
+      enabled: process.env.FREEE_TRIAL_BALANCE_CACHE !== '0'
+    });
+  }
+  return sharedTrialBalanceStore;
+}
+
+function monthKey(range: MonthRange): string {
+  return `${range.year}-${range.month.toString().padStart(2, '0')}`;
+}
+
+function sanitize(value: string): string {
+  return value.replace(/[^A-Za-z0-9_-]/g, '_');
+}
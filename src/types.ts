@@ -156,11 +156,16 @@ export const DealsResponseSchema = ApiResponseSchema.extend({
 });
 
 // MCP Tool Definition
+export interface ToolContext {
+  // クライアントが progressToken を指定した場合のみ設定される
+  reportProgress?: (progress: number, total?: number, message?: string) => void;
+}
+
 export interface MCPTool {
   name: string;
   description: string;
   inputSchema: z.ZodSchema;
-  handler: (params: any) => Promise<any>;
+  handler: (params: any, context?: ToolContext) => Promise<any>;
 }
 
 // Error Types